@@ -0,0 +1,186 @@
+"""
+throughput and latency benchmarks for DataCiteREST against the local
+MockDataCiteServer, no network or credentials required
+
+    python -m benchmarks.bench_client --latency 0.002 --json results.json
+"""
+from typing import Any, Callable, Dict, List
+import argparse
+import copy
+import json
+import statistics
+import time
+import tracemalloc
+
+from datacite_rest import DataCiteREST
+from datacite_rest.mock_server import MockDataCiteServer
+from datacite_rest.models import Schema43Model
+from datacite_rest.throttle import RetryPolicy
+
+PREFIX = '10.5438'
+
+DRAFT = {'data': {'type': 'dois', 'attributes': {'prefix': PREFIX}}}
+
+RECORD = {
+    'data': {
+        'type': 'dois',
+        'attributes': {
+            'identifiers': [],
+            'creators': [{'name': 'benchmark'}],
+            'titles': [{'title': 'benchmark'}],
+            'publisher': 'benchmark',
+            'publication_year': time.gmtime().tm_year,
+            'types': {'resource_type_general': 'Dataset'},
+            'prefix': PREFIX,
+            'url': 'https://example.com/benchmark'
+        }
+    }
+}
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return values[index]
+
+
+def _latency_stats(latencies: List[float], elapsed: float) -> Dict:
+    return {
+        'requests': len(latencies),
+        'requests_per_second': len(latencies) / elapsed,
+        'p50_ms': _percentile(latencies, 50) * 1000,
+        'p99_ms': _percentile(latencies, 99) * 1000,
+        'mean_ms': statistics.mean(latencies) * 1000
+    }
+
+
+def _measure_memory(fn: Callable[[], Any]) -> float:
+    """ peak python heap in MiB while fn runs """
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1] / 2 ** 20
+    finally:
+        tracemalloc.stop()
+
+
+def bench_single(client: DataCiteREST, n: int) -> Dict:
+    """ sequential create + retrieve, one request at a time """
+    latencies = []
+    dois = []
+    start = time.perf_counter()
+    for _ in range(n):
+        t = time.perf_counter()
+        dois.append(client.create(copy.deepcopy(DRAFT), draft=True)
+                    ['data']['id'])
+        latencies.append(time.perf_counter() - t)
+    for doi in dois:
+        t = time.perf_counter()
+        client.retrieve(doi)
+        latencies.append(time.perf_counter() - t)
+    return _latency_stats(latencies, time.perf_counter() - start)
+
+
+def bench_bulk(client: DataCiteREST, n: int, workers: int) -> Dict:
+    def consume():
+        run = client.create_many(
+            (copy.deepcopy(RECORD) for _ in range(n)), max_workers=workers
+        )
+        for _ in run:
+            pass
+        return run.summary
+
+    summary = consume()
+    return {
+        'items': summary.total,
+        'items_per_second': summary.items_per_second,
+        'failed': summary.failed,
+        # tracing slows the run down, so memory gets a pass of its own
+        'peak_mib': _measure_memory(consume)
+    }
+
+
+def bench_paginated(client: DataCiteREST, page_size: int) -> Dict:
+    def consume():
+        count = 0
+        for _ in client.iter_list('dois', {}, page_size=page_size):
+            count += 1
+        return count
+
+    start = time.perf_counter()
+    count = consume()
+    elapsed = time.perf_counter() - start
+    return {
+        'records': count,
+        'records_per_second': count / elapsed,
+        'peak_mib': _measure_memory(consume)
+    }
+
+
+def bench_validation(n: int) -> Dict:
+    """ per record cost of validating and serializing a full payload """
+    client = DataCiteREST('bench', 'bench', 'https://example.com', PREFIX)
+    start = time.perf_counter()
+    for _ in range(n):
+        client._create_args(RECORD)
+    validate = (time.perf_counter() - start) / n
+
+    model = Schema43Model(**RECORD)
+    start = time.perf_counter()
+    for _ in range(n):
+        client._create_args(model)
+    prevalidated = (time.perf_counter() - start) / n
+    return {
+        'validate_and_serialize_us': validate * 1e6,
+        'prevalidated_serialize_us': prevalidated * 1e6
+    }
+
+
+def run(args: argparse.Namespace) -> Dict:
+    results = {'validation': bench_validation(args.validation_records)}
+    server = MockDataCiteServer(
+        latency=args.latency,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate
+    )
+    with server, DataCiteREST(
+        'bench',
+        'bench',
+        server.url,
+        PREFIX,
+        pool_maxsize=args.workers,
+        retry=RetryPolicy(max_retries=10, backoff_factor=0.01)
+    ) as client:
+        results['single'] = bench_single(client, args.requests)
+        results['bulk'] = bench_bulk(client, args.bulk, args.workers)
+        results['paginated'] = bench_paginated(client, args.page_size)
+        results['retries'] = client.retry_stats.snapshot()
+    return results
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--bulk', type=int, default=1000)
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--page-size', type=int, default=100)
+    parser.add_argument('--validation-records', type=int, default=2000)
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0)
+    parser.add_argument('--json', help='write results to this path')
+    args = parser.parse_args(argv)
+
+    results = run(args)
+    for name, values in results.items():
+        print(name)
+        for k, v in values.items():
+            print(f'  {k:<28}{v:>12.2f}' if isinstance(v, float)
+                  else f'  {k:<28}{v:>12}')
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""
+cold start cost of datacite_rest, each sample is a fresh interpreter
+
+    python -m benchmarks.bench_import --runs 20 --json results.json
+"""
+from typing import Dict, List
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from datacite_rest.mock_server import MockDataCiteServer
+
+# timed inside the child so interpreter startup is excluded
+_SCRIPTS = {
+    'import': 'import datacite_rest',
+    'import_client': 'from datacite_rest import DataCiteREST',
+    'import_client_retrieve': (
+        'from datacite_rest import DataCiteREST\n'
+        "x = DataCiteREST('abc123', 'secret', URL, '10.5438')\n"
+        "x.retrieve(DOI)"
+    )
+}
+
+_TEMPLATE = '''
+import time
+start = time.perf_counter()
+{script}
+print(time.perf_counter() - start)
+'''
+
+
+def _sample(script: str, env: Dict[str, str]) -> float:
+    out = subprocess.run(
+        [sys.executable, '-c', _TEMPLATE.format(script=script)],
+        env=env,
+        check=True,
+        stdout=subprocess.PIPE,
+        universal_newlines=True
+    ).stdout
+    return float(out.strip().splitlines()[-1])
+
+
+def run(args: argparse.Namespace) -> Dict[str, Dict]:
+    results = {}
+    with MockDataCiteServer() as server:
+        record = server.store.create({'prefix': '10.5438'})
+        env = dict(os.environ)
+        for name, script in _SCRIPTS.items():
+            script = (
+                f'URL = {server.url!r}\nDOI = {record["doi"]!r}\n{script}'
+            )
+            _sample(script, env)  # warm the filesystem cache
+            samples: List[float] = [
+                _sample(script, env) for _ in range(args.runs)
+            ]
+            results[name] = {
+                'runs': args.runs,
+                'median_ms': statistics.median(samples) * 1000,
+                'min_ms': min(samples) * 1000,
+                'max_ms': max(samples) * 1000
+            }
+    return results
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--json', help='write results to this path')
+    args = parser.parse_args(argv)
+
+    results = run(args)
+    for name, values in results.items():
+        print(name)
+        for k, v in values.items():
+            print(f'  {k:<28}{v:>12.2f}' if isinstance(v, float)
+                  else f'  {k:<28}{v:>12}')
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -6,8 +6,25 @@ __author_email__ = 'g.burgmann@griffith.edu.au'
 __description__ = 'a package for managing dois'
 __license__ = 'MIT'
 
-try:
-    from .datacite_rest import DataCiteREST  # noqa
-except Exception:
-    # preserve import here but stops setup.py breaking due to dependencies
-    pass
+__all__ = ['DataCiteREST', 'AsyncDataCiteREST']
+
+# name -> submodule, imported on first attribute access (PEP 562) so that
+# `import datacite_rest` stays cheap and setup.py can read the metadata
+# above without any dependencies installed
+_lazy = {
+    'DataCiteREST': 'datacite_rest',
+    'AsyncDataCiteREST': 'async_datacite_rest'  # requires the aiohttp extra
+}
+
+
+def __getattr__(name: str):
+    if name not in _lazy:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    from importlib import import_module
+    value = getattr(import_module(f'.{_lazy[name]}', __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
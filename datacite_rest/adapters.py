@@ -0,0 +1,56 @@
+import threading
+import time
+
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+_timings = threading.local()
+
+
+def pop_connect_time() -> float:
+    """ seconds this thread spent opening connections since the last pop """
+    elapsed = getattr(_timings, 'connect', 0.0)
+    _timings.connect = 0.0
+    return elapsed
+
+
+class _TimedConnectMixin:
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            _timings.connect = (
+                getattr(_timings, 'connect', 0.0)
+                + time.perf_counter() - start
+            )
+
+
+class TimedHTTPConnection(_TimedConnectMixin, HTTPConnection):
+    pass
+
+
+class TimedHTTPSConnection(_TimedConnectMixin, HTTPSConnection):
+    pass
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+class TimingHTTPAdapter(HTTPAdapter):
+    """
+    HTTPAdapter whose connections record dns + connect (+ tls) time,
+    read back per request with pop_connect_time()
+    """
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': TimedHTTPConnectionPool,
+            'https': TimedHTTPSConnectionPool
+        }
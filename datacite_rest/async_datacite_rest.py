@@ -0,0 +1,435 @@
+from typing import (
+    Awaitable,
+    Callable,
+    Optional,
+    Union,
+    List,
+    Dict,
+    Tuple,
+    Mapping,
+    Iterable
+)
+from types import SimpleNamespace
+import asyncio
+import json
+import logging
+import time
+
+import aiohttp
+from pydantic import BaseModel
+
+from .authentication import RespositoryAuth
+from .cache import BaseCache
+from .datacite_rest import DataCiteRESTBase, Timeout
+from .diff import UpdateResult
+from .exceptions import DataCiteRESTError
+from .hooks import RequestHook, RequestInfo
+from .models import DataCiteQueryParamsModel
+from .responses import Facets
+from .singleflight import AsyncSingleFlight
+from .throttle import HedgePolicy, RateLimiter, RetryPolicy
+
+log = logging.getLogger(__name__)
+
+
+class AsyncDataCiteREST(DataCiteRESTBase):
+    """
+    asyncio variant of DataCiteREST, requires the optional aiohttp extra
+
+    concurrency bounds the number of requests in flight across all tasks
+    sharing this client, limit_per_host bounds open connections per host
+    (0 is unlimited).
+    """
+    _session = None
+    _owns_session = False
+    _semaphore = None
+    _singleflight_class = AsyncSingleFlight
+
+    def __init__(
+        self,
+        id_: Optional[str] = None,
+        password: Optional[str] = None,
+        url: Optional[str] = None,
+        prefix: Optional[str] = None,
+        concurrency: int = 100,
+        limit_per_host: int = 0,
+        session: Optional[aiohttp.ClientSession] = None,
+        rate_limit: Optional[Union[float, RateLimiter]] = None,
+        retry: Optional[RetryPolicy] = None,
+        cache: Optional[BaseCache] = None,
+        hooks: Optional[List[RequestHook]] = None,
+        log_body: Union[bool, int] = False,
+        coalesce: bool = False,
+        auth: Optional[RespositoryAuth] = None,
+        timeout: Optional[Timeout] = (10.0, 60.0),
+        deadline: Optional[float] = None,
+        hedge: Optional[HedgePolicy] = None
+    ):
+        """ pass through kwargs for RespositoryAuth, see DataCiteRESTBase """
+        super().__init__(
+            id_,
+            password,
+            url,
+            prefix,
+            rate_limit=rate_limit,
+            retry=retry,
+            cache=cache,
+            hooks=hooks,
+            log_body=log_body,
+            coalesce=coalesce,
+            auth=auth,
+            timeout=timeout,
+            deadline=deadline,
+            hedge=hedge
+        )
+        self._concurrency = concurrency
+        self._limit_per_host = limit_per_host
+        if session is not None:
+            self._session = session
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """ sessions must be created inside a running loop """
+        if self._session is None:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=self._concurrency,
+                    limit_per_host=self._limit_per_host
+                ),
+                trace_configs=[self._trace_config()]
+            )
+            self._owns_session = True
+        return self._session
+
+    @staticmethod
+    def _trace_config() -> aiohttp.TraceConfig:
+        """ time new connections into the per-request RequestInfo """
+        async def on_start(session, ctx, params):
+            ctx.connect_start = time.perf_counter()
+
+        async def on_end(session, ctx, params):
+            info = getattr(ctx.trace_request_ctx, 'info', None)
+            if info is not None:
+                info.connect = time.perf_counter() - ctx.connect_start
+
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_connection_create_start.append(on_start)
+        trace_config.on_connection_create_end.append(on_end)
+        return trace_config
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        """ created lazily so it binds to the loop that uses it """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self._concurrency)
+        return self._semaphore
+
+    async def close(self) -> None:
+        """ release pooled connections if the session is ours """
+        if self._owns_session and self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+    async def request(
+        self,
+        url_path: str,
+        method: str = 'GET',
+        params: Optional[Dict] = None,
+        json_: Optional[Union[List, Dict, bytes]] = None,
+        headers: Optional[Dict] = None,
+        timeout: Optional[Timeout] = None,
+        deadline: Optional[float] = None
+    ) -> dict:
+        """ proxy session.request to add auth, throttling and retries """
+        expires = self._expires(deadline)
+
+        async def send() -> Dict:
+            _, _, value = await self._send(
+                url_path, method, params, json_, headers,
+                timeout=timeout, expires=expires
+            )
+            return value
+
+        delay = self._hedge_delay(method, url_path, json_, headers)
+
+        async def fetch() -> Dict:
+            if delay is None:
+                return await send()
+            return await self._hedged(url_path, send, delay)
+
+        key = self._flight_key(method, url_path, params, json_, headers)
+        if key is None:
+            return await fetch()
+        return await self._singleflight.do(key, fetch)
+
+    async def _hedged(
+        self,
+        url_path: str,
+        send: Callable[[], Awaitable[Dict]],
+        delay: float
+    ) -> Dict:
+        """ see DataCiteREST._hedged, here the loser is cancelled """
+        first = asyncio.ensure_future(send())
+        done, _ = await asyncio.wait({first}, timeout=delay)
+        if done:
+            return first.result()
+        self._count('hedged_requests', url_path)
+        second = asyncio.ensure_future(send())
+        pending = {first, second}
+        error = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        if task is second:
+                            self._count('hedge_wins', url_path)
+                        return task.result()
+                    error = error or task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _send(
+        self,
+        url_path: str,
+        method: str = 'GET',
+        params: Optional[Dict] = None,
+        json_: Optional[Union[List, Dict, bytes]] = None,
+        headers: Optional[Dict] = None,
+        timeout: Optional[Timeout] = None,
+        expires: Optional[float] = None
+    ) -> Tuple[int, Mapping, Optional[Dict]]:
+        """ status, headers and decoded body, the body is None for 304 """
+        session = self._get_session()
+        data = self._encode_body(json_)
+        headers = self._merge_headers(headers, data is not None)
+        if expires is None:
+            expires = self._expires()
+        attempt = 0
+        while True:
+            connect, read = self._attempt_timeout(
+                method, url_path, timeout, expires
+            ) or (None, None)
+            client_timeout = aiohttp.ClientTimeout(
+                total=expires - time.monotonic() if expires else None,
+                sock_connect=connect,
+                sock_read=read
+            )
+            if self._rate_limiter is not None:
+                self.retry_stats.record_throttle(
+                    await self._rate_limiter.acquire_async()
+                )
+            info = RequestInfo(
+                method, url_path, params, attempt, len(data) if data else 0
+            )
+            info.connect = 0.0
+            self._run_hooks('before_request', info)
+            start = None
+            try:
+                async with self._get_semaphore():
+                    start = time.perf_counter()
+                    async with session.request(
+                        method=method,
+                        url=f'{self._url_base}/{url_path}',
+                        params=params,
+                        data=data,
+                        headers=headers,
+                        timeout=client_timeout,
+                        trace_request_ctx=SimpleNamespace(info=info)
+                    ) as res:
+                        info.ttfb = time.perf_counter() - start
+                        body = await res.read()
+                        info.total = time.perf_counter() - start
+                        info.status_code = res.status
+                        info.bytes_received = len(body)
+                        self._run_hooks('after_response', info)
+                        self._log_response(
+                            info, lambda: body.decode('utf-8', 'replace')
+                        )
+                        res.raise_for_status()
+                        value = None
+                        if res.status != 304 and body:
+                            value = json.loads(body)
+                        return res.status, res.headers, value
+            except aiohttp.ClientResponseError as e:
+                self._run_hooks('on_error', info, e)
+                delay = self._retry_delay(
+                    method, e.status, e.headers or {}, attempt, expires
+                )
+                if delay is not None:
+                    await asyncio.sleep(delay)
+                    attempt += 1
+                    continue
+                log.error(f'{self}.request - Exception: {e}')
+                raise DataCiteRESTError(
+                    f'{e}: {self._error_body(json_)}', status_code=e.status
+                )
+            except Exception as e:
+                if info.total is None and start is not None:
+                    info.total = time.perf_counter() - start
+                self._run_hooks('on_error', info, e)
+                log.error(f'{self}.request - Exception: {e}')
+                raise DataCiteRESTError(f'{e}: {self._error_body(json_)}')
+
+    async def list(
+        self,
+        resource: Optional[str] = None,
+        params: Optional[Union[Dict, DataCiteQueryParamsModel]] = None,
+        timeout: Optional[Timeout] = None,
+        deadline: Optional[float] = None
+    ) -> Dict:
+        """ https://support.datacite.org/docs/api-get-lists """
+        url_path, params = self._list_args(resource, params)
+        return await self.request(
+            url_path, params=params, timeout=timeout, deadline=deadline
+        )
+
+    async def facets(
+        self,
+        resource: Optional[str] = None,
+        params: Optional[Union[Dict, DataCiteQueryParamsModel]] = None
+    ) -> Facets:
+        """ see DataCiteREST.facets """
+        url_path, params = self._facets_args(resource, params)
+        return Facets.from_response(
+            await self.request(url_path, params=params)
+        )
+
+    async def count(
+        self,
+        resource: Optional[str] = None,
+        params: Optional[Union[Dict, DataCiteQueryParamsModel]] = None
+    ) -> int:
+        return (await self.facets(resource, params)).total
+
+    async def retrieve_many(
+        self,
+        dois: Iterable[str]
+    ) -> Dict[str, Optional[Dict]]:
+        """
+        see DataCiteREST.retrieve_many, the queries share the concurrency
+        limit of this client
+        """
+        dois = list(dois)
+        pages = await asyncio.gather(*(
+            self.list('dois', self._lookup_params(chunk))
+            for chunk in self._lookup_chunks(dois)
+        ))
+        return self._lookup_result(dois, pages)
+
+    async def exists_many(self, dois: Iterable[str]) -> Dict[str, bool]:
+        found = await self.retrieve_many(dois)
+        return {doi: record is not None for doi, record in found.items()}
+
+    async def create(
+        self,
+        json_body: Union[Dict, BaseModel, bytes],
+        draft=False,
+        timeout: Optional[Timeout] = None,
+        deadline: Optional[float] = None
+    ) -> Dict:
+        """ https://support.datacite.org/docs/api-get-lists """
+        url_path, json_ = self._create_args(json_body, draft)
+        return await self.request(
+            url_path,
+            method='POST',
+            json_=json_,
+            timeout=timeout,
+            deadline=deadline
+        )
+
+    async def retrieve(
+        self,
+        doi: str,
+        timeout: Optional[Timeout] = None,
+        deadline: Optional[float] = None
+    ) -> Dict:
+        """ https://support.datacite.org/docs/api-get-doi """
+        url_path = self._retrieve_path(doi)
+        if self._cache is None:
+            return await self.request(
+                url_path, timeout=timeout, deadline=deadline
+            )
+        key, entry = self._cache_get(doi)
+        if entry is not None and entry.fresh:
+            return entry.value
+
+        async def fetch() -> Dict:
+            status, headers, value = await self._send(
+                url_path,
+                headers=self._conditional_headers(entry),
+                timeout=timeout,
+                expires=self._expires(deadline)
+            )
+            return self._cache_put(key, entry, status, headers, value)
+
+        flight = self._flight_key('GET', url_path)
+        if flight is None:
+            return await fetch()
+        return await self._singleflight.do(flight, fetch)
+
+    async def update(
+        self,
+        doi: str,
+        json_body: Union[Dict, BaseModel, bytes],
+        partial=True,
+        timeout: Optional[Timeout] = None,
+        deadline: Optional[float] = None
+    ) -> Dict:
+        """
+        https://support.datacite.org/docs/updating-metadata-with-the-rest-api
+        """
+        url_path, json_ = self._update_args(doi, json_body, partial)
+        res = await self.request(
+            url_path,
+            method='PUT',
+            json_=json_,
+            timeout=timeout,
+            deadline=deadline
+        )
+        self._cache_invalidate(doi)
+        return res
+
+    async def update_diff(
+        self,
+        doi: str,
+        json_body: Union[Dict, BaseModel],
+        current: Optional[Dict] = None,
+        dry_run=False
+    ) -> UpdateResult:
+        """ see DataCiteREST.update_diff """
+        desired = self._diff_args(json_body)
+        if current is None:
+            current = await self.retrieve(doi)
+        json_, result = self._plan_diff(doi, desired, current, dry_run)
+        if json_ is None:
+            return result
+        res = await self.request(
+            self._retrieve_path(doi), method='PUT', json_=json_
+        )
+        self._cache_invalidate(doi)
+        return result._replace(response=res)
+
+    async def activities(
+        self,
+        doi: str,
+        timeout: Optional[Timeout] = None,
+        deadline: Optional[float] = None
+    ) -> Dict:
+        """
+        https://support.datacite.org/reference/dois-2#get_dois-id-activities
+        """
+        return await self.request(
+            self._activities_path(doi),
+            method='GET',
+            timeout=timeout,
+            deadline=deadline
+        )
@@ -1,4 +1,5 @@
 import os
+import base64
 import logging
 from typing import Optional
 
@@ -9,6 +10,7 @@ log = logging.getLogger(__name__)
 
 class RespositoryAuth:
     _auth = None
+    _authorization = None
     _model = RespositoryAuthModel
 
     def __init__(
@@ -35,6 +37,13 @@ class RespositoryAuth:
             prefix=prefix
         )
 
+    @classmethod
+    def from_model(cls, model: RespositoryAuthModel) -> 'RespositoryAuth':
+        """ from validated credentials, without the env var fallback """
+        auth = cls.__new__(cls)
+        auth._auth = model
+        return auth
+
     @property
     def id(self):
         return self._auth.id
@@ -50,3 +59,13 @@ class RespositoryAuth:
     @property
     def prefix(self):
         return self._auth.prefix
+
+    @property
+    def authorization(self) -> str:
+        """ basic auth header value, encoded once and reused per request """
+        if self._authorization is None:
+            token = f'{self.id}:{self.password}'.encode('latin1')
+            self._authorization = (
+                f"Basic {base64.b64encode(token).decode('ascii')}"
+            )
+        return self._authorization
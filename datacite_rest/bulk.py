@@ -0,0 +1,171 @@
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    NamedTuple,
+    Optional
+)
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import logging
+import time
+
+from .exceptions import InvalidTransitionError
+
+log = logging.getLogger(__name__)
+
+
+class BulkItemError(NamedTuple):
+    """ kind is 'validation' (never sent) or 'request' """
+    kind: str
+    message: str
+    status_code: Optional[int] = None
+
+
+class BulkItemResult(NamedTuple):
+    index: int
+    key: Optional[str]
+    ok: bool
+    data: Optional[Dict] = None
+    error: Optional[BulkItemError] = None
+
+
+class BulkSummary(NamedTuple):
+    total: int
+    succeeded: int
+    failed: int
+    elapsed: float
+    items_per_second: float
+    errors: Dict[str, int]
+
+
+class BulkRun:
+    """
+    lazily validate and send items on a bounded thread pool
+
+    iterate to stream a BulkItemResult per item, in input order when
+    ordered=True or as they complete otherwise. at most max_in_flight items
+    are submitted at once, so arbitrarily large iterables use flat memory.
+    a failing item is reported in its result and never aborts the batch.
+    summary is populated once iteration finishes. progress, if given, is
+    called with the running (completed, failed) counts after every item.
+    """
+    summary = None
+
+    def __init__(
+        self,
+        items: Iterable[Any],
+        prepare: Callable[[Any], Any],
+        send: Callable[[Any], Dict],
+        key: Optional[Callable[[Any], Optional[str]]] = None,
+        max_workers: int = 8,
+        ordered: bool = True,
+        max_in_flight: Optional[int] = None,
+        progress: Optional[Callable[[int, int], None]] = None
+    ):
+        self._items = items
+        self._prepare = prepare
+        self._send = send
+        self._key = key
+        self._max_workers = max_workers
+        self._ordered = ordered
+        self._max_in_flight = max_in_flight or max_workers * 2
+        self._progress = progress
+        self._consumed = False
+
+    def _error(self, e: Exception, kind: str) -> BulkItemError:
+        return BulkItemError(kind, str(e), getattr(e, 'status_code', None))
+
+    def _call(self, index: int, key: Optional[str], args: Any):
+        try:
+            return BulkItemResult(index, key, True, data=self._send(args))
+        except InvalidTransitionError as e:
+            # checked against the current state, nothing was sent
+            return BulkItemResult(
+                index, key, False, error=self._error(e, 'validation')
+            )
+        except Exception as e:
+            return BulkItemResult(
+                index, key, False, error=self._error(e, 'request')
+            )
+
+    def __iter__(self) -> Iterator[BulkItemResult]:
+        assert not self._consumed, 'BulkRun can only be iterated once'
+        self._consumed = True
+        succeeded = 0
+        completed = 0
+        errors = Counter()
+        total = 0
+        start = time.perf_counter()
+
+        def record(result: BulkItemResult) -> BulkItemResult:
+            nonlocal succeeded, completed
+            completed += 1
+            if result.ok:
+                succeeded += 1
+            else:
+                code = result.error.status_code
+                errors[f'{result.error.kind}:{code}' if code else
+                       result.error.kind] += 1
+            if self._progress is not None:
+                self._progress(completed, completed - succeeded)
+            return result
+
+        pending = deque()  # futures or finished results, input order
+        with ThreadPoolExecutor(max_workers=self._max_workers) as executor:
+            for index, item in enumerate(self._items):
+                total += 1
+                key = self._key(item) if self._key else None
+                try:
+                    args = self._prepare(item)
+                except Exception as e:
+                    result = BulkItemResult(
+                        index, key, False, error=self._error(e, 'validation')
+                    )
+                    if self._ordered and pending:
+                        pending.append(result)
+                    else:
+                        yield record(result)
+                    continue
+
+                pending.append(executor.submit(self._call, index, key, args))
+                while len(pending) >= self._max_in_flight:
+                    yield from map(record, self._drain(pending, block=True))
+                yield from map(record, self._drain(pending, block=False))
+
+            while pending:
+                yield from map(record, self._drain(pending, block=True))
+
+        elapsed = time.perf_counter() - start
+        self.summary = BulkSummary(
+            total=total,
+            succeeded=succeeded,
+            failed=total - succeeded,
+            elapsed=elapsed,
+            items_per_second=total / elapsed if elapsed else 0.0,
+            errors=dict(errors)
+        )
+        log.info(f'{self}.summary - {self.summary}')
+
+    def _drain(self, pending: deque, block: bool) -> Iterator[BulkItemResult]:
+        """ pop whatever is ready, waiting for at least one if block """
+        if self._ordered:
+            while pending:
+                head = pending[0]
+                if isinstance(head, BulkItemResult):
+                    yield pending.popleft()
+                elif head.done() or block:
+                    yield pending.popleft().result()
+                    block = False
+                else:
+                    return
+            return
+
+        futures = [f for f in pending if not isinstance(f, BulkItemResult)]
+        if block and futures:
+            wait(futures, return_when=FIRST_COMPLETED)
+        for f in [f for f in futures if f.done()]:
+            pending.remove(f)
+            yield f.result()
@@ -0,0 +1,185 @@
+from typing import Optional, Dict, NamedTuple
+from collections import OrderedDict
+import json
+import threading
+import time
+
+
+class CacheEntry(NamedTuple):
+    value: Dict
+    expires: float
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+    @property
+    def fresh(self) -> bool:
+        return time.time() < self.expires
+
+
+class CacheStats:
+    """ thread-safe hit/miss/eviction counters """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.evictions = 0
+
+    def record(self, counter: str, n: int = 1) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + n)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'revalidations': self.revalidations,
+                'evictions': self.evictions
+            }
+
+
+class BaseCache:
+    """
+    pluggable response cache used by DataCiteREST.retrieve
+
+    entries outlive their ttl while they carry validators, so a stale entry
+    can be revalidated with If-None-Match/If-Modified-Since instead of
+    being downloaded again. backends bound their own size and count
+    evictions.
+    """
+    def __init__(self, ttl: float = 300):
+        self.ttl = ttl
+        self.stats = CacheStats()
+
+    def entry(
+        self,
+        value: Dict,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None
+    ) -> CacheEntry:
+        return CacheEntry(value, time.time() + self.ttl, etag, last_modified)
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        raise NotImplementedError
+
+    def set(self, key: str, entry: CacheEntry) -> None:
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+
+class MemoryCache(BaseCache):
+    """ in-memory LRU with ttl, the default backend """
+    def __init__(self, maxsize: int = 10000, ttl: float = 300):
+        super().__init__(ttl)
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                self._data.move_to_end(key)
+            return entry
+
+    def set(self, key: str, entry: CacheEntry) -> None:
+        evicted = 0
+        with self._lock:
+            self._data[key] = entry
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                evicted += 1
+        if evicted:
+            self.stats.record('evictions', evicted)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+class DiskCache(BaseCache):
+    """ sqlite backed cache that survives restarts and is shared by workers """
+    _schema = (
+        'CREATE TABLE IF NOT EXISTS cache ('
+        'key TEXT PRIMARY KEY, value TEXT NOT NULL, expires REAL NOT NULL, '
+        'etag TEXT, last_modified TEXT, accessed REAL NOT NULL)'
+    )
+
+    def __init__(self, path: str, maxsize: int = 100000, ttl: float = 300):
+        super().__init__(ttl)
+        self.maxsize = maxsize
+        import sqlite3  # not loaded unless a disk cache is used
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute(self._schema)
+            self._conn.execute(
+                'CREATE INDEX IF NOT EXISTS cache_accessed ON cache(accessed)'
+            )
+
+    def __len__(self) -> int:
+        with self._lock:
+            row = self._conn.execute('SELECT COUNT(*) FROM cache').fetchone()
+        return row[0]
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                'SELECT value, expires, etag, last_modified FROM cache '
+                'WHERE key = ?',
+                (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                'UPDATE cache SET accessed = ? WHERE key = ?',
+                (time.time(), key)
+            )
+        return CacheEntry(json.loads(row[0]), row[1], row[2], row[3])
+
+    def set(self, key: str, entry: CacheEntry) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?, ?, ?)',
+                (
+                    key,
+                    json.dumps(entry.value),
+                    entry.expires,
+                    entry.etag,
+                    entry.last_modified,
+                    time.time()
+                )
+            )
+            evicted = self._conn.execute(
+                'DELETE FROM cache WHERE key IN (SELECT key FROM cache '
+                'ORDER BY accessed DESC LIMIT -1 OFFSET ?)',
+                (self.maxsize,)
+            ).rowcount
+        if evicted > 0:
+            self.stats.record('evictions', evicted)
+
+    def delete(self, key: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM cache WHERE key = ?', (key,))
+
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM cache')
+
+    def close(self) -> None:
+        self._conn.close()
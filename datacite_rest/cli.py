@@ -0,0 +1,207 @@
+"""
+command line entry point, credentials come from the DATACITE_REPOSITORY_*
+env vars as for DataCiteREST()
+
+    datacite-rest export ./snapshot --shard-by created --years 2015-2024
+    datacite-rest mirror-sync ./dois.sqlite
+    datacite-rest validate ./deposit --workers 8
+    datacite-rest transition publish dois.txt --workers 16
+"""
+from typing import List, Optional, Tuple
+import argparse
+import datetime
+import logging
+import sys
+
+
+def _year_range(value: str) -> Tuple[int, int]:
+    start, _, end = value.partition('-')
+    return int(start), int(end or start)
+
+
+def export(args: argparse.Namespace) -> None:
+    from .datacite_rest import DataCiteREST
+    from .exceptions import ExportCoverageError
+    from .export import DOIExporter, shards_by_resource_type, shards_by_year
+
+    if args.shard_by == 'resource-type':
+        shards = shards_by_resource_type(args.resource_types.split(','))
+    else:
+        shards = shards_by_year(*args.years, field=args.shard_by)
+    with DataCiteREST(pool_maxsize=args.workers) as client:
+        params = {'client_id': args.client_id or client._auth.id.lower()}
+        if args.query:
+            params['query'] = args.query
+        exporter = DOIExporter(
+            client,
+            args.output_dir,
+            shards,
+            params=params,
+            page_size=args.page_size,
+            max_workers=args.workers,
+            check_coverage=not args.partial
+        )
+        try:
+            summary = exporter.run()
+        except ExportCoverageError as e:
+            print(f'{e}, widen the shards or pass --partial', file=sys.stderr)
+            raise SystemExit(1)
+    total = sum(summary.records.values())
+    print(
+        f'exported {total} records in {summary.elapsed:.1f}s '
+        f'({summary.records_per_second:.0f}/s)'
+    )
+
+
+def mirror_sync(args: argparse.Namespace) -> None:
+    from .datacite_rest import DataCiteREST
+    from .mirror import DOIMirror
+
+    with DataCiteREST() as client, DOIMirror(args.database, client) as mirror:
+        params = {'client_id': args.client_id or client._auth.id.lower()}
+        result = mirror.sync(params, page_size=args.page_size, full=args.full)
+        total = mirror.count()
+    print(
+        f'synced {result.fetched} records in {result.elapsed:.1f}s, '
+        f'{total} mirrored, updated up to {result.high_water_mark}'
+    )
+
+
+def validate(args: argparse.Namespace) -> None:
+    from .validate import ValidationRun
+
+    run = ValidationRun(
+        args.paths,
+        draft=args.draft,
+        max_workers=args.workers,
+        batch_size=args.batch_size
+    )
+    for error in run:
+        print(f'{error.source}:{error.record}: {error.path}: {error.message}')
+    summary = run.summary
+    print(
+        f'{summary.invalid} of {summary.records} records invalid, '
+        f'{summary.elapsed:.1f}s ({summary.records_per_second:.0f}/s)'
+    )
+    if summary.invalid:
+        raise SystemExit(1)
+
+
+def transition(args: argparse.Namespace) -> None:
+    from .datacite_rest import DataCiteREST
+
+    def progress(completed: int, failed: int) -> None:
+        if completed % 1000 == 0:
+            print(f'{completed} done, {failed} failed', file=sys.stderr)
+
+    with open(args.dois, 'r', encoding='utf-8') as f:
+        dois = [line.strip() for line in f if line.strip()]
+    with DataCiteREST(pool_maxsize=args.workers) as client:
+        run = client.transition_many(
+            dois,
+            args.event,
+            dry_run=args.dry_run,
+            max_workers=args.workers,
+            ordered=False,
+            progress=progress
+        )
+        for result in run:
+            if not result.ok:
+                print(f'{result.key}: {result.error.message}')
+    summary = run.summary
+    print(
+        f'{summary.succeeded} of {summary.total} dois, '
+        f'{summary.elapsed:.1f}s ({summary.items_per_second:.0f}/s)'
+    )
+    if summary.failed:
+        raise SystemExit(1)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='datacite-rest')
+    parser.add_argument('-v', '--verbose', action='store_true')
+    commands = parser.add_subparsers(dest='command')
+    commands.required = True
+
+    cmd = commands.add_parser(
+        'export', help='resumable parallel export of dois to ndjson.gz'
+    )
+    cmd.add_argument('output_dir')
+    cmd.add_argument(
+        '--shard-by',
+        choices=['created', 'registered', 'resource-type'],
+        default='created'
+    )
+    cmd.add_argument(
+        '--years',
+        type=_year_range,
+        default=(2010, datetime.date.today().year),
+        help='inclusive range for year shards, e.g. 2015-2024'
+    )
+    cmd.add_argument(
+        '--resource-types',
+        default=(
+            'audiovisual,collection,data-paper,dataset,event,image,'
+            'interactive-resource,model,physical-object,service,software,'
+            'sound,text,workflow,other'
+        ),
+        help='comma separated resource-type-ids for resource-type shards'
+    )
+    cmd.add_argument(
+        '--partial',
+        action='store_true',
+        help='export even if the shards miss some of the matching records'
+    )
+    cmd.add_argument('--client-id', help='defaults to the repository id')
+    cmd.add_argument('--query')
+    cmd.add_argument('--page-size', type=int, default=1000)
+    cmd.add_argument('--workers', type=int, default=4)
+    cmd.set_defaults(func=export)
+
+    cmd = commands.add_parser(
+        'mirror-sync', help='incremental sync of a local sqlite mirror'
+    )
+    cmd.add_argument('database')
+    cmd.add_argument('--client-id', help='defaults to the repository id')
+    cmd.add_argument('--page-size', type=int, default=1000)
+    cmd.add_argument(
+        '--full', action='store_true', help='ignore the high-water mark'
+    )
+    cmd.set_defaults(func=mirror_sync)
+
+    cmd = commands.add_parser(
+        'validate', help='offline validation of json and ndjson payloads'
+    )
+    cmd.add_argument('paths', nargs='+', help='files or directories')
+    cmd.add_argument(
+        '--draft', action='store_true', help='validate as draft payloads'
+    )
+    cmd.add_argument(
+        '--workers', type=int, help='processes, defaults to every core'
+    )
+    cmd.add_argument('--batch-size', type=int, default=1000)
+    cmd.set_defaults(func=validate)
+
+    cmd = commands.add_parser(
+        'transition', help='send publish, register or hide to many dois'
+    )
+    cmd.add_argument('event', choices=['publish', 'register', 'hide'])
+    cmd.add_argument('dois', help='file of dois, one per line')
+    cmd.add_argument('--workers', type=int, default=8)
+    cmd.add_argument(
+        '--dry-run', action='store_true', help='check states, send nothing'
+    )
+    cmd.set_defaults(func=transition)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(
+        level=logging.INFO if args.verbose else logging.WARNING
+    )
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main()
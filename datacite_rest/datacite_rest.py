@@ -1,16 +1,94 @@
-from typing import Optional, Union, List, Dict
+from typing import (
+    Optional,
+    Union,
+    List,
+    Dict,
+    Tuple,
+    Iterable,
+    Iterator,
+    Type,
+    Callable
+)
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ThreadPoolExecutor,
+    wait
+)
+from contextlib import nullcontext
+from functools import lru_cache
+from urllib.parse import urlparse, parse_qs, quote_plus
 import logging
+import threading
+import time
 
+from pydantic import BaseModel
 import requests
 
+from .adapters import TimingHTTPAdapter, pop_connect_time
 from .authentication import RespositoryAuth
-from .models import Schema43Model, Schema43BaseModel
-from .utils import to_kebab
+from .bulk import BulkRun
+from .cache import BaseCache, CacheEntry
+from .diff import (
+    UpdateResult,
+    UpdateStatus,
+    attribute_changes,
+    desired_attributes
+)
+from .exceptions import DataCiteRESTError, DeadlineExceededError
+from .hooks import MetricsCollector, RequestHook, RequestInfo, endpoint_name
+from .models import DataCiteQueryParamsModel
+from .responses import DOIRecord, Facets
+from .singleflight import SingleFlight
+from .streaming import JSONArrayStream
+from .throttle import HedgePolicy, RateLimiter, RetryPolicy, RetryStats
+from .utils import to_kebab, dumps
 
 log = logging.getLogger(__name__)
 
+_unbounded = nullcontext()
+Timeout = Union[float, Tuple[float, float]]
 
-class DataCiteREST:
+
+class _PrecomputedAuth(requests.auth.AuthBase):
+    """
+    leaves the precomputed Authorization header alone, requests only falls
+    back to ~/.netrc (replacing the header) when no auth is passed
+    """
+    def __call__(self, r: requests.PreparedRequest):
+        return r
+
+
+_precomputed_auth = _PrecomputedAuth()
+
+
+@lru_cache(maxsize=None)
+def _payload_models(
+    draft: bool
+) -> Tuple[Type[BaseModel], Tuple[Type[BaseModel], ...]]:
+    """
+    (model, accepted model instances) for a payload, the schema models are
+    only built on first use. a full payload is also a valid draft.
+    """
+    from .models import Schema43BaseModel, Schema43Model
+    if draft:
+        return Schema43BaseModel, (Schema43BaseModel, Schema43Model)
+    return Schema43Model, (Schema43Model,)
+
+
+def __getattr__(name: str):
+    # the schema models used to be imported here eagerly, keep the names
+    if name in ('Schema43BaseModel', 'Schema43Model'):
+        from . import models
+        return getattr(models, name)
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
+class DataCiteRESTBase:
+    """
+    transport independent path building and payload validation, shared by
+    the blocking and asyncio clients
+    """
     _auth = None
     # https://support.datacite.org/docs/api-get-lists
     # #what-kinds-of-lists-can-i-ask-for
@@ -23,45 +101,287 @@ class DataCiteREST:
         'reports'
     ]
     _base_path = _resources[1]  # default dois
+    # retrieve_many packs dois into list queries, the encoded query is kept
+    # well under the ~8KB url limit of common proxies and page[size] caps
+    # the dois per query
+    _lookup_max_length = 6000
+    _lookup_max_dois = 1000
+    _rate_limiter = None
+    _cache = None
+    _singleflight = None
+    _singleflight_class = SingleFlight
+    _hooks = ()
+    _log_body = False
+    _timeout = None
+    _deadline = None
+    _hedge = None
+    _metrics = None
 
     def __init__(
         self,
         id_: Optional[str] = None,
         password: Optional[str] = None,
         url: Optional[str] = None,
-        prefix: Optional[str] = None
+        prefix: Optional[str] = None,
+        rate_limit: Optional[Union[float, RateLimiter]] = None,
+        retry: Optional[RetryPolicy] = None,
+        cache: Optional[BaseCache] = None,
+        hooks: Optional[List[RequestHook]] = None,
+        log_body: Union[bool, int] = False,
+        coalesce: bool = False,
+        auth: Optional[RespositoryAuth] = None,
+        timeout: Optional[Timeout] = (10.0, 60.0),
+        deadline: Optional[float] = None,
+        hedge: Optional[HedgePolicy] = None
     ):
-        """ pass through kwargs for RespositoryAuth"""
-        self._auth = RespositoryAuth(id_, password, url, prefix)
+        """
+        pass through kwargs for RespositoryAuth, or an already validated
+        auth (the other credential arguments are then ignored)
 
-    def request(
+        rate_limit is requests per second or a RateLimiter shared with other
+        clients, retry defaults to RetryPolicy(), pass max_retries=0 to
+        disable retries. cache enables caching of retrieve() responses, e.g.
+        cache.MemoryCache() or cache.DiskCache(path).
+
+        hooks receive a RequestInfo per attempt, e.g. hooks.MetricsCollector.
+        response bodies are only logged (at debug) when log_body is True, or
+        truncated to log_body characters when it is an int.
+
+        with coalesce, concurrent identical GETs share one in-flight request
+        and every caller gets the same response object, so treat responses
+        as read-only. see the coalesced counter.
+
+        timeout is the default (connect, read) seconds per attempt, or one
+        value for both, None waits forever. deadline caps the seconds a
+        call may take in all, retries and their backoff included, and
+        raises DeadlineExceededError. both can also be given per call.
+
+        with hedge (a HedgePolicy) a GET that is slower than usual is sent
+        again and whichever copy answers first is used. hedged_requests
+        and hedge_wins are counted by the MetricsCollector in hooks.
+        """
+        if auth is None:
+            auth = RespositoryAuth(id_, password, url, prefix)
+        self._auth = auth
+        self._url_base = self._auth.url.rstrip('/')  # support trailing slash
+        # auth is sent per request so a shared session can serve many repos
+        self._headers = {'Authorization': self._auth.authorization}
+        self._json_headers = {
+            **self._headers,
+            'Content-Type': 'application/json'
+        }
+        if rate_limit is not None and not isinstance(rate_limit, RateLimiter):
+            rate_limit = RateLimiter(rate_limit)
+        self._rate_limiter = rate_limit
+        self._retry = retry if retry is not None else RetryPolicy()
+        self.retry_stats = RetryStats()
+        self._cache = cache
+        self._hooks = tuple(hooks or ())
+        self._log_body = log_body
+        if coalesce:
+            self._singleflight = self._singleflight_class()
+        self._timeout = self._timeout_pair(timeout)
+        self._deadline = deadline
+        self._metrics = next(
+            (h for h in self._hooks if isinstance(h, MetricsCollector)), None
+        )
+        if hedge is not None and hedge.delay is None and self._metrics is None:
+            raise ValueError(
+                'hedging on latency quantiles needs a MetricsCollector hook'
+            )
+        self._hedge = hedge
+
+    @property
+    def coalesced(self) -> int:
+        """ requests that were served by sharing another in-flight one """
+        return self._singleflight.coalesced if self._singleflight else 0
+
+    def _flight_key(
         self,
+        method: str,
         url_path: str,
-        method: str = 'GET',
         params: Optional[Dict] = None,
-        json_: Optional[Union[List, Dict]] = None,
+        json_=None,
+        headers: Optional[Dict] = None
+    ) -> Optional[Tuple]:
+        """ None when the request must not be coalesced """
+        if (
+            self._singleflight is None or method != 'GET'
+            or json_ is not None or headers
+        ):
+            return None
+        return (
+            url_path.strip('/'),
+            tuple(sorted((k, str(v)) for k, v in (params or {}).items()))
+        )
+
+    @staticmethod
+    def _timeout_pair(
+        timeout: Optional[Timeout]
+    ) -> Optional[Tuple[float, float]]:
+        if timeout is None or isinstance(timeout, tuple):
+            return timeout
+        return timeout, timeout
+
+    def _expires(self, deadline: Optional[float] = None) -> Optional[float]:
+        """ the monotonic time a call must finish by, if any """
+        deadline = self._deadline if deadline is None else deadline
+        return time.monotonic() + deadline if deadline else None
+
+    def _attempt_timeout(
+        self,
+        method: str,
+        url_path: str,
+        timeout: Optional[Timeout] = None,
+        expires: Optional[float] = None
+    ) -> Optional[Tuple[float, float]]:
+        """ (connect, read) for the next attempt, cut to the deadline """
+        pair = self._timeout if timeout is None else self._timeout_pair(
+            timeout
+        )
+        if expires is None:
+            return pair
+        remaining = expires - time.monotonic()
+        if remaining <= 0:
+            raise DeadlineExceededError(
+                f'deadline exceeded: {method} {url_path}'
+            )
+        if pair is None:
+            return remaining, remaining
+        return min(pair[0], remaining), min(pair[1], remaining)
+
+    def _hedge_delay(
+        self,
+        method: str,
+        url_path: str,
+        json_=None,
+        headers: Optional[Dict] = None
+    ) -> Optional[float]:
+        """ None when the request must not be hedged """
+        if (
+            self._hedge is None or method != 'GET'
+            or json_ is not None or headers
+        ):
+            return None
+        return self._hedge.hedge_delay(endpoint_name(url_path), self._metrics)
+
+    def _count(self, name: str, url_path: str) -> None:
+        if self._metrics is not None:
+            self._metrics.increment(name, endpoint_name(url_path))
+
+    def _merge_headers(
+        self,
         headers: Optional[Dict] = None,
-    ) -> dict:
-        """ proxy requests.request to add auth """
-        url_base = self._auth.url.rstrip('/')  # support trailing slash
-        try:
-            res = requests.request(
-                method=method,
-                url=f'{url_base}/{url_path}',
-                params=params,
-                json=json_,
-                headers=headers,
-                auth=requests.auth.HTTPBasicAuth(
-                    self._auth.id,
-                    self._auth.password
-                )
+        has_body: bool = False
+    ) -> Dict:
+        base = self._json_headers if has_body else self._headers
+        if not headers:
+            return base
+        return {**base, **headers}
+
+    def _encode_body(
+        self,
+        json_: Optional[Union[List, Dict, bytes]]
+    ) -> Optional[bytes]:
+        """ encode once with the fast encoder, bytes pass straight through """
+        if json_ is None or isinstance(json_, bytes):
+            return json_
+        return dumps(json_)
+
+    def _error_body(self, json_: Optional[Union[List, Dict, bytes]]):
+        if isinstance(json_, bytes):
+            return json_.decode('utf-8', 'replace')
+        return json_
+
+    def _run_hooks(self, name: str, *args) -> None:
+        for hook in self._hooks:
+            try:
+                getattr(hook, name)(*args)
+            except Exception as e:
+                log.warning(f'{self}.{name} - {hook} raised {e!r}')
+
+    def _log_response(self, info: RequestInfo, text: Callable[[], str]):
+        """ one cheap summary line, bodies only when asked for """
+        if log.isEnabledFor(logging.INFO):
+            log.info(
+                f'{self}.request - {info.method} {info.url_path} '
+                f'{info.status_code} {info.bytes_received}B '
+                f'{info.total * 1000:.1f}ms'
             )
-            res.raise_for_status()
-            log.info(f'{self}.request - res.text: {res.text}')
-            return res.json()
-        except Exception as e:
-            log.error(f'{self}.request - Exception: {e}')
-            raise Exception(f'{e}: {json_}')
+        if self._log_body and log.isEnabledFor(logging.DEBUG):
+            body = text()
+            if self._log_body is not True:
+                body = body[:self._log_body]
+            log.debug(f'{self}.request - res.text: {body}')
+
+    def _retry_delay(
+        self,
+        method: str,
+        status_code: Optional[int],
+        headers: Dict,
+        attempt: int,
+        expires: Optional[float] = None
+    ) -> Optional[float]:
+        """
+        seconds to wait before retrying, None if we should raise, including
+        when the wait would run past the deadline
+        """
+        if not self._retry.should_retry(method, status_code, attempt):
+            return None
+        delay = self._retry.delay(attempt, headers.get('Retry-After'))
+        if expires is not None and time.monotonic() + delay >= expires:
+            log.warning(f'{self}.request - {status_code}, no time to retry')
+            return None
+        self.retry_stats.record_retry(delay)
+        log.warning(
+            f'{self}.request - {status_code}, retry {attempt + 1} '
+            f'in {delay:.2f}s'
+        )
+        return delay
+
+    def _cache_key(self, doi: str) -> str:
+        """ dois are case insensitive """
+        return self._retrieve_path(doi).lower()
+
+    def _cache_get(self, doi: str) -> Tuple[str, Optional[CacheEntry]]:
+        key = self._cache_key(doi)
+        entry = self._cache.get(key)
+        if entry is not None and entry.fresh:
+            self._cache.stats.record('hits')
+        return key, entry
+
+    def _conditional_headers(self, entry: Optional[CacheEntry]) -> Dict:
+        headers = {}
+        if entry is not None and entry.etag:
+            headers['If-None-Match'] = entry.etag
+        if entry is not None and entry.last_modified:
+            headers['If-Modified-Since'] = entry.last_modified
+        return headers
+
+    def _cache_put(
+        self,
+        key: str,
+        entry: Optional[CacheEntry],
+        status_code: int,
+        headers: Dict,
+        value: Optional[Dict]
+    ) -> Dict:
+        """ store a fresh response, or extend the ttl after a 304 """
+        etag = headers.get('ETag')
+        last_modified = headers.get('Last-Modified')
+        if status_code == 304 and entry is not None:
+            self._cache.stats.record('revalidations')
+            value = entry.value
+            etag = etag or entry.etag
+            last_modified = last_modified or entry.last_modified
+        else:
+            self._cache.stats.record('misses')
+        self._cache.set(key, self._cache.entry(value, etag, last_modified))
+        return value
+
+    def _cache_invalidate(self, doi: str) -> None:
+        if self._cache is not None:
+            self._cache.delete(self._cache_key(doi))
 
     def _append_slash_to_path(self, url_path: str) -> str:
         """
@@ -71,65 +391,866 @@ class DataCiteREST:
         """
         return f"{url_path.rstrip('/')}/"
 
-    def list(
+    def _list_args(
         self,
         resource: Optional[str] = None,
-        params: Optional[Dict] = None
-    ) -> Dict:
-        """ https://support.datacite.org/docs/api-get-lists """
+        params: Optional[Union[Dict, DataCiteQueryParamsModel]] = None
+    ) -> Tuple[str, Dict]:
         url_path = resource if resource else self._base_path
         assert url_path in self._resources, f'{self._resources}'
+        if isinstance(params, DataCiteQueryParamsModel):
+            return self._append_slash_to_path(url_path), params.params()
         assert type(params) == dict, type(params)
         # datacite expects kebab-case params
         params = {to_kebab(k): v for k, v in params.items()}
-        return self.request(
-            self._append_slash_to_path(url_path),
-            params=params
+        return self._append_slash_to_path(url_path), params
+
+    def _facets_args(
+        self,
+        resource: Optional[str] = None,
+        params: Optional[Union[Dict, DataCiteQueryParamsModel]] = None
+    ) -> Tuple[str, Dict]:
+        """ an empty page, only the meta (total and facets) is wanted """
+        url_path, params = self._list_args(resource, params or {})
+        params.pop('disable-facets', None)
+        return url_path, {**params, 'page[size]': 0}
+
+    def _next_cursor(self, page: Dict) -> Optional[str]:
+        """ pull page[cursor] from links.next, None on the last page """
+        next_url = (page.get('links') or {}).get('next')
+        if not next_url or not page.get('data'):
+            return None
+        cursor = parse_qs(urlparse(next_url).query).get('page[cursor]')
+        return cursor[0] if cursor else None
+
+    def _lookup_chunks(self, dois: List[str]) -> List[List[str]]:
+        """ lowercased, deduplicated dois packed under the query limits """
+        separator = len(quote_plus(' OR '))
+        chunks = []
+        chunk = []
+        length = len(quote_plus('doi:()'))
+        for doi in dict.fromkeys(doi.lower() for doi in dois):
+            term = len(quote_plus(self._lookup_term(doi))) + separator
+            if chunk and (
+                length + term > self._lookup_max_length
+                or len(chunk) >= self._lookup_max_dois
+            ):
+                chunks.append(chunk)
+                chunk = []
+                length = len(quote_plus('doi:()'))
+            chunk.append(doi)
+            length += term
+        if chunk:
+            chunks.append(chunk)
+        return chunks
+
+    def _lookup_term(self, doi: str) -> str:
+        escaped = doi.replace('\\', '\\\\').replace('"', '\\"')
+        return f'"{escaped}"'
+
+    def _lookup_params(self, chunk: List[str]) -> Dict:
+        terms = ' OR '.join(self._lookup_term(doi) for doi in chunk)
+        return {'query': f'doi:({terms})', 'page[size]': len(chunk)}
+
+    def _lookup_result(
+        self,
+        dois: List[str],
+        pages: Iterable[Dict]
+    ) -> Dict[str, Optional[Dict]]:
+        """ map each requested doi, as given, to its record or None """
+        found = {}
+        for page in pages:
+            for record in page.get('data') or []:
+                found[record['id'].lower()] = record
+        return {doi: found.get(doi.lower()) for doi in dois}
+
+    def _serialize(
+        self,
+        json_body: Union[Dict, BaseModel, bytes],
+        draft: bool,
+        by_alias: bool
+    ) -> bytes:
+        """
+        validate and encode a payload
+
+        bytes are assumed to be serialized by the caller and are sent as-is,
+        instances of the accepted models are already validated.
+        """
+        if isinstance(json_body, (bytes, bytearray)):
+            return bytes(json_body)
+        model, accepted = _payload_models(draft)
+        if not isinstance(json_body, accepted):
+            try:
+                json_body = model(**json_body)
+            except Exception as e:
+                raise Exception(e)
+        return dumps(json_body.dict(by_alias=by_alias))
+
+    def _create_args(
+        self,
+        json_body: Union[Dict, BaseModel, bytes],
+        draft=False
+    ) -> Tuple[str, bytes]:
+        url_path = self._append_slash_to_path(self._base_path)
+        return url_path, self._serialize(json_body, draft is True, True)
+
+    def _retrieve_path(self, doi: str) -> str:
+        return f'{self._base_path}/{doi}'
+
+    def _update_args(
+        self,
+        doi: str,
+        json_body: Union[Dict, BaseModel, bytes],
+        partial=True
+    ) -> Tuple[str, bytes]:
+        url_path = f'{self._base_path}/{doi}'
+        # TODO: find a better way to validate partial update data
+        return url_path, self._serialize(json_body, partial is True, False)
+
+    def _diff_args(
+        self,
+        json_body: Union[Dict, BaseModel]
+    ) -> Dict:
+        """ validate a partial payload, returning the attributes it sets """
+        model, accepted = _payload_models(True)
+        if not isinstance(json_body, accepted):
+            try:
+                json_body = model(**json_body)
+            except Exception as e:
+                raise Exception(e)
+        return desired_attributes(json_body)
+
+    def _plan_diff(
+        self,
+        doi: str,
+        desired: Dict,
+        current: Dict,
+        dry_run: bool
+    ) -> Tuple[Optional[bytes], UpdateResult]:
+        """
+        the put body (None when nothing is to be sent) and the result,
+        current is a retrieve response or just its attributes
+        """
+        if 'data' in current:
+            current = current['data'].get('attributes') or {}
+        changes = attribute_changes(desired, current, doi)
+        if not changes:
+            return None, UpdateResult(doi, UpdateStatus.unchanged, changes)
+        if dry_run:
+            return None, UpdateResult(doi, UpdateStatus.skipped, changes)
+        body = dumps({'data': {'type': 'dois', 'attributes': changes}})
+        return body, UpdateResult(doi, UpdateStatus.changed, changes)
+
+    def _activities_path(self, doi: str) -> str:
+        return f'{self._base_path}/{doi}/activities'
+
+
+class DataCiteREST(DataCiteRESTBase):
+    _session = None
+    _owns_session = False
+    _semaphore = None
+    _hedge_executor = None
+    _hedge_slots = None
+    _hedge_futures = None
+
+    def __init__(
+        self,
+        id_: Optional[str] = None,
+        password: Optional[str] = None,
+        url: Optional[str] = None,
+        prefix: Optional[str] = None,
+        pool_connections: int = 10,
+        pool_maxsize: int = 10,
+        pool_block: bool = False,
+        session: Optional[requests.Session] = None,
+        rate_limit: Optional[Union[float, RateLimiter]] = None,
+        retry: Optional[RetryPolicy] = None,
+        cache: Optional[BaseCache] = None,
+        hooks: Optional[List[RequestHook]] = None,
+        log_body: Union[bool, int] = False,
+        coalesce: bool = False,
+        auth: Optional[RespositoryAuth] = None,
+        concurrency: Optional[int] = None,
+        timeout: Optional[Timeout] = (10.0, 60.0),
+        deadline: Optional[float] = None,
+        hedge: Optional[HedgePolicy] = None
+    ):
+        """
+        pass through kwargs for RespositoryAuth, see DataCiteRESTBase
+
+        pool_connections is the number of per-host pools to keep,
+        pool_maxsize the number of keep-alive connections per host and
+        pool_block caps concurrent connections per host at pool_maxsize.
+        an existing session can be shared, in which case it is not closed
+        by this client. concurrency bounds the requests this client has in
+        flight across threads, independently of a shared session's pool.
+        """
+        super().__init__(
+            id_,
+            password,
+            url,
+            prefix,
+            rate_limit=rate_limit,
+            retry=retry,
+            cache=cache,
+            hooks=hooks,
+            log_body=log_body,
+            coalesce=coalesce,
+            auth=auth,
+            timeout=timeout,
+            deadline=deadline,
+            hedge=hedge
+        )
+        if concurrency is not None:
+            self._semaphore = threading.BoundedSemaphore(concurrency)
+        if hedge is not None:
+            # both copies of a hedged request run here while a worker is
+            # idle, the slots keep anything from queueing for one
+            self._hedge_executor = ThreadPoolExecutor(
+                max_workers=pool_maxsize * 2
+            )
+            self._hedge_slots = threading.BoundedSemaphore(pool_maxsize * 2)
+            self._hedge_futures = set()
+        if session is None:
+            session = self._create_session(
+                pool_connections,
+                pool_maxsize,
+                pool_block
+            )
+            self._owns_session = True
+        self._session = session
+
+    @staticmethod
+    def _create_session(
+        pool_connections: int = 10,
+        pool_maxsize: int = 10,
+        pool_block: bool = False
+    ) -> requests.Session:
+        """ keep-alive session backed by a thread-safe urllib3 pool """
+        session = requests.Session()
+        adapter = TimingHTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block
+        )
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+
+    def close(self) -> None:
+        """ release pooled connections if the session is ours """
+        if self._hedge_executor is not None:
+            self._hedge_executor.shutdown(wait=False)
+            for future in list(self._hedge_futures):
+                future.cancel()
+        if self._owns_session and self._session is not None:
+            self._session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def request(
+        self,
+        url_path: str,
+        method: str = 'GET',
+        params: Optional[Dict] = None,
+        json_: Optional[Union[List, Dict, bytes]] = None,
+        headers: Optional[Dict] = None,
+        timeout: Optional[Timeout] = None,
+        deadline: Optional[float] = None
+    ) -> dict:
+        """
+        proxy session.request to add auth, throttling and retries
+
+        json_ may be pre-serialized bytes, which are sent unchanged.
+        timeout and deadline override the client defaults for this call.
+        """
+        expires = self._expires(deadline)
+
+        def send() -> Dict:
+            return self._send(
+                url_path, method, params, json_, headers,
+                timeout=timeout, expires=expires
+            ).json()
+
+        delay = self._hedge_delay(method, url_path, json_, headers)
+        fetch = send if delay is None else (
+            lambda: self._hedged(url_path, send, delay)
         )
+        key = self._flight_key(method, url_path, params, json_, headers)
+        if key is None:
+            return fetch()
+        return self._singleflight.do(key, fetch)
+
+    def _hedge_submit(self, send: Callable[[], Dict]) -> Optional[Future]:
+        """ send on an idle hedge worker, None if there is none """
+        if not self._hedge_slots.acquire(blocking=False):
+            return None
+
+        def run() -> Dict:
+            try:
+                return send()
+            finally:
+                self._hedge_slots.release()
+
+        try:
+            future = self._hedge_executor.submit(run)
+        except RuntimeError:
+            # closed
+            self._hedge_slots.release()
+            return None
+        self._hedge_futures.add(future)
+        future.add_done_callback(self._hedge_futures.discard)
+        return future
+
+    def _hedged(
+        self,
+        url_path: str,
+        send: Callable[[], Dict],
+        delay: float
+    ) -> Dict:
+        """
+        send, and again if the first has not answered after delay, the
+        first success wins. the loser cannot be cancelled and finishes in
+        the background.
+
+        copies only start on an idle worker, so the delay never includes
+        time queued behind other callers. without one the first attempt
+        runs on the calling thread, unhedged: a saturated client does not
+        add load.
+        """
+        first = self._hedge_submit(send)
+        if first is None:
+            return send()
+        if not wait([first], timeout=delay).not_done:
+            return first.result()
+        second = self._hedge_submit(send)
+        if second is None:
+            return first.result()
+        self._count('hedged_requests', url_path)
+        pending = {first, second}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is second:
+                        self._count('hedge_wins', url_path)
+                    return future.result()
+                error = error or future.exception()
+        raise error
+
+    def _send(
+        self,
+        url_path: str,
+        method: str = 'GET',
+        params: Optional[Dict] = None,
+        json_: Optional[Union[List, Dict, bytes]] = None,
+        headers: Optional[Dict] = None,
+        stream: bool = False,
+        timeout: Optional[Timeout] = None,
+        expires: Optional[float] = None
+    ) -> requests.Response:
+        """
+        with stream the body is left unread on success, timings stop at the
+        response headers and bytes_received is not known to hooks. expires
+        is the monotonic deadline, see _expires.
+        """
+        data = self._encode_body(json_)
+        headers = self._merge_headers(headers, data is not None)
+        if expires is None:
+            expires = self._expires()
+        attempt = 0
+        while True:
+            attempt_timeout = self._attempt_timeout(
+                method, url_path, timeout, expires
+            )
+            if self._rate_limiter is not None:
+                self.retry_stats.record_throttle(self._rate_limiter.acquire())
+            info = RequestInfo(
+                method, url_path, params, attempt, len(data) if data else 0
+            )
+            self._run_hooks('before_request', info)
+            pop_connect_time()
+            start = time.perf_counter()
+            try:
+                with self._semaphore or _unbounded:
+                    res = self._session.request(
+                        method=method,
+                        url=f'{self._url_base}/{url_path}',
+                        params=params,
+                        data=data,
+                        headers=headers,
+                        auth=_precomputed_auth,
+                        stream=stream,
+                        timeout=attempt_timeout
+                    )
+                    info.connect = pop_connect_time()
+                    info.ttfb = res.elapsed.total_seconds()
+                    info.status_code = res.status_code
+                    if not stream or res.status_code >= 400:
+                        info.bytes_received = len(res.content)
+                info.total = time.perf_counter() - start
+                self._run_hooks('after_response', info)
+                self._log_response(
+                    info, lambda: res.text if not stream else '<streamed>'
+                )
+                res.raise_for_status()
+                return res
+            except requests.HTTPError as e:
+                self._run_hooks('on_error', info, e)
+                delay = self._retry_delay(
+                    method,
+                    e.response.status_code,
+                    e.response.headers,
+                    attempt,
+                    expires
+                )
+                if delay is not None:
+                    time.sleep(delay)
+                    attempt += 1
+                    continue
+                log.error(f'{self}.request - Exception: {e}')
+                raise DataCiteRESTError(
+                    f'{e}: {self._error_body(json_)}',
+                    status_code=e.response.status_code,
+                    response_text=e.response.text
+                )
+            except Exception as e:
+                if info.total is None:
+                    info.total = time.perf_counter() - start
+                self._run_hooks('on_error', info, e)
+                log.error(f'{self}.request - Exception: {e}')
+                raise DataCiteRESTError(f'{e}: {self._error_body(json_)}')
 
-    def create(self, json_body: Dict, draft=False) -> Dict:
+    def list(
+        self,
+        resource: Optional[str] = None,
+        params: Optional[Union[Dict, DataCiteQueryParamsModel]] = None,
+        timeout: Optional[Timeout] = None,
+        deadline: Optional[float] = None
+    ) -> Dict:
         """ https://support.datacite.org/docs/api-get-lists """
-        url_path = self._append_slash_to_path(self._base_path)
-        payload = None
+        url_path, params = self._list_args(resource, params)
+        return self.request(
+            url_path, params=params, timeout=timeout, deadline=deadline
+        )
+
+    def facets(
+        self,
+        resource: Optional[str] = None,
+        params: Optional[Union[Dict, DataCiteQueryParamsModel]] = None
+    ) -> Facets:
+        """
+        counts by state, year, resource type etc. for the matching records
+        from a single request for a page of size 0
+        """
+        url_path, params = self._facets_args(resource, params)
+        return Facets.from_response(self.request(url_path, params=params))
 
+    def count(
+        self,
+        resource: Optional[str] = None,
+        params: Optional[Union[Dict, DataCiteQueryParamsModel]] = None
+    ) -> int:
+        """ the number of matching records, see facets """
+        return self.facets(resource, params).total
+
+    def stream_list(
+        self,
+        resource: Optional[str] = None,
+        params: Optional[Dict] = None,
+        key: str = 'data',
+        chunk_size: int = 64 * 1024
+    ) -> JSONArrayStream:
+        """
+        list() decoding the response incrementally from the socket
+
+        iterate the result to get the items of the key array (data, or e.g.
+        reports) one at a time, peak memory is bounded by a single record
+        rather than the page. meta and links are on .envelope once the
+        iteration is done.
+        """
+        url_path, params = self._list_args(resource, params)
+        res = self._send(url_path, params=params, stream=True)
+        return JSONArrayStream(
+            res.iter_content(chunk_size=chunk_size),
+            key=key,
+            close=res.close
+        )
+
+    def iter_pages(
+        self,
+        resource: Optional[str] = None,
+        params: Optional[Dict] = None,
+        page_size: Optional[int] = None,
+        prefetch: bool = True
+    ) -> Iterator[Dict]:
+        """
+        follow cursor pagination, yielding one page at a time
+
+        with prefetch the next page is requested on a background thread
+        while the caller works through the current one, so no more than two
+        pages are ever held.
+        https://support.datacite.org/docs/pagination#method-2-cursor
+        """
+        params = dict(params or {})
+        params.setdefault('page[cursor]', 1)
+        if page_size is not None:
+            params['page[size]'] = page_size
+
+        def fetch(cursor) -> Dict:
+            return self.list(resource, {**params, 'page[cursor]': cursor})
+
+        if not prefetch:
+            cursor = params['page[cursor]']
+            while cursor is not None:
+                page = fetch(cursor)
+                cursor = self._next_cursor(page)
+                yield page
+            return
+
+        executor = ThreadPoolExecutor(max_workers=1)
         try:
-            if draft is True:
-                payload = Schema43BaseModel(**json_body)
-            else:
-                payload = Schema43Model(**json_body)
-        except Exception as e:
-            raise Exception(e)
+            future = executor.submit(fetch, params['page[cursor]'])
+            while future is not None:
+                page = future.result()
+                cursor = self._next_cursor(page)
+                future = executor.submit(fetch, cursor) if cursor else None
+                yield page
+        finally:
+            if future is not None:
+                future.cancel()
+            executor.shutdown(wait=False)
 
-        json_ = payload.dict(by_alias=True)
+    def iter_list(
+        self,
+        resource: Optional[str] = None,
+        params: Optional[Dict] = None,
+        page_size: Optional[int] = None,
+        prefetch: bool = True,
+        stream: bool = False
+    ) -> Iterator[Dict]:
+        """
+        lazily yield every record of a list, see iter_pages
 
-        return self.request(url_path, method='POST', json_=json_)
+        with stream each page is decoded incrementally (see stream_list)
+        instead of being prefetched, trading overlap for memory.
+        """
+        if not stream:
+            for page in self.iter_pages(resource, params, page_size, prefetch):
+                yield from page.get('data') or []
+            return
 
-    def retrieve(self, doi: str) -> Dict:
-        """ https://support.datacite.org/docs/api-get-doi """
-        url_path = f'{self._base_path}/{doi}'
-        return self.request(url_path)
+        params = dict(params or {})
+        params.setdefault('page[cursor]', 1)
+        if page_size is not None:
+            params['page[size]'] = page_size
+        cursor = params['page[cursor]']
+        while cursor is not None:
+            page = self.stream_list(
+                resource, {**params, 'page[cursor]': cursor}
+            )
+            seen = False
+            for record in page:
+                seen = True
+                yield record
+            envelope = page.envelope or {}
+            # _next_cursor wants to know the page was not empty
+            cursor = self._next_cursor({**envelope, 'data': seen})
+
+    def iter_records(
+        self,
+        params: Optional[Dict] = None,
+        page_size: Optional[int] = None,
+        prefetch: bool = True,
+        stream: bool = False
+    ) -> Iterator[DOIRecord]:
+        """ iter_list() of dois as compact DOIRecords, see responses """
+        records = self.iter_list('dois', params, page_size, prefetch, stream)
+        for record in records:
+            yield DOIRecord.from_json(record)
+
+    def retrieve_many(
+        self,
+        dois: Iterable[str],
+        max_workers: int = 8
+    ) -> Dict[str, Optional[Dict]]:
+        """
+        look up many dois with as few list queries as the url allows, run in
+        parallel, returning {doi: record or None if missing}
 
-    def update(self, doi: str, json_body: Dict, partial=True) -> Dict:
+        records are list items ({'id', 'type', 'attributes'}). only dois
+        visible to these credentials in the search index are found, and the
+        index can lag writes by a few seconds.
+        """
+        dois = list(dois)
+        chunks = self._lookup_chunks(dois)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pages = executor.map(
+                lambda chunk: self.list('dois', self._lookup_params(chunk)),
+                chunks
+            )
+            return self._lookup_result(dois, pages)
+
+    def exists_many(
+        self,
+        dois: Iterable[str],
+        max_workers: int = 8
+    ) -> Dict[str, bool]:
+        """ {doi: exists}, see retrieve_many """
+        return {
+            doi: record is not None
+            for doi, record in self.retrieve_many(dois, max_workers).items()
+        }
+
+    def create(
+        self,
+        json_body: Union[Dict, BaseModel, bytes],
+        draft=False,
+        timeout: Optional[Timeout] = None,
+        deadline: Optional[float] = None
+    ) -> Dict:
+        """
+        https://support.datacite.org/docs/api-get-lists
+
+        json_body may also be a validated Schema43Model/Schema43BaseModel or
+        pre-serialized bytes, both skip validation
+        """
+        url_path, json_ = self._create_args(json_body, draft)
+        return self.request(
+            url_path,
+            method='POST',
+            json_=json_,
+            timeout=timeout,
+            deadline=deadline
+        )
+
+    def retrieve(
+        self,
+        doi: str,
+        timeout: Optional[Timeout] = None,
+        deadline: Optional[float] = None
+    ) -> Dict:
+        """
+        https://support.datacite.org/docs/api-get-doi
+
+        with a cache, revalidations are conditional and not hedged
+        """
+        url_path = self._retrieve_path(doi)
+        if self._cache is None:
+            return self.request(url_path, timeout=timeout, deadline=deadline)
+        key, entry = self._cache_get(doi)
+        if entry is not None and entry.fresh:
+            return entry.value
+
+        def fetch() -> Dict:
+            res = self._send(
+                url_path,
+                headers=self._conditional_headers(entry),
+                timeout=timeout,
+                expires=self._expires(deadline)
+            )
+            value = None if res.status_code == 304 else res.json()
+            return self._cache_put(
+                key, entry, res.status_code, res.headers, value
+            )
+
+        flight = self._flight_key('GET', url_path)
+        if flight is None:
+            return fetch()
+        return self._singleflight.do(flight, fetch)
+
+    def update(
+        self,
+        doi: str,
+        json_body: Union[Dict, BaseModel, bytes],
+        partial=True,
+        timeout: Optional[Timeout] = None,
+        deadline: Optional[float] = None
+    ) -> Dict:
         """
         https://support.datacite.org/docs/updating-metadata-with-the-rest-api
+
+        accepts the same fast-path json_body types as create
         """
-        url_path = f'{self._base_path}/{doi}'
-        payload = None
-        try:
-            # TODO: find a better way to validate partial update data
-            if partial is True:
-                payload = Schema43BaseModel(**json_body)
-            else:
-                payload = Schema43Model(**json_body)
-        except Exception as e:
-            raise Exception(e)
+        url_path, json_ = self._update_args(doi, json_body, partial)
+        res = self.request(
+            url_path,
+            method='PUT',
+            json_=json_,
+            timeout=timeout,
+            deadline=deadline
+        )
+        self._cache_invalidate(doi)
+        return res
+
+    def update_diff(
+        self,
+        doi: str,
+        json_body: Union[Dict, BaseModel],
+        current: Optional[Dict] = None,
+        dry_run=False
+    ) -> UpdateResult:
+        """
+        put only the attributes of json_body that differ from current,
+        sending nothing when there is no difference
+
+        current defaults to retrieve(doi), so a configured cache is used.
+        with dry_run the changes are reported but never sent.
+        """
+        desired = self._diff_args(json_body)
+        return self._update_diff(doi, desired, current, dry_run)
 
-        json_ = payload.dict()
-        return self.request(url_path, method='PUT', json_=json_)
+    def _update_diff(
+        self,
+        doi: str,
+        desired: Dict,
+        current: Optional[Dict],
+        dry_run: bool
+    ) -> UpdateResult:
+        if current is None:
+            current = self.retrieve(doi)
+        json_, result = self._plan_diff(doi, desired, current, dry_run)
+        if json_ is None:
+            return result
+        res = self.request(
+            self._retrieve_path(doi), method='PUT', json_=json_
+        )
+        self._cache_invalidate(doi)
+        return result._replace(response=res)
 
-    def activities(self, doi: str) -> Dict:
+    def activities(
+        self,
+        doi: str,
+        timeout: Optional[Timeout] = None,
+        deadline: Optional[float] = None
+    ) -> Dict:
         """
         https://support.datacite.org/reference/dois-2#get_dois-id-activities
         """
-        url_path = f'{self._base_path}/{doi}/activities'
-        return self.request(url_path, method='GET')
+        return self.request(
+            self._activities_path(doi),
+            method='GET',
+            timeout=timeout,
+            deadline=deadline
+        )
+
+    def create_many(
+        self,
+        json_bodies: Iterable[Dict],
+        draft=False,
+        max_workers: int = 8,
+        ordered: bool = True
+    ) -> BulkRun:
+        """
+        validate and create many dois in parallel, see BulkRun
+
+        max_workers should not exceed the pool_maxsize of this client
+        """
+        def send(args: Tuple[str, bytes]) -> Dict:
+            url_path, json_ = args
+            return self.request(url_path, method='POST', json_=json_)
+
+        return BulkRun(
+            json_bodies,
+            prepare=lambda json_body: self._create_args(json_body, draft),
+            send=send,
+            max_workers=max_workers,
+            ordered=ordered
+        )
+
+    def update_many(
+        self,
+        items: Iterable[Tuple[str, Dict]],
+        partial=True,
+        max_workers: int = 8,
+        ordered: bool = True
+    ) -> BulkRun:
+        """ validate and update many (doi, json_body) pairs in parallel """
+        def prepare(item: Tuple[str, Dict]) -> Tuple[str, str, bytes]:
+            doi, json_body = item
+            return (doi, *self._update_args(doi, json_body, partial))
+
+        def send(args: Tuple[str, str, bytes]) -> Dict:
+            doi, url_path, json_ = args
+            res = self.request(url_path, method='PUT', json_=json_)
+            self._cache_invalidate(doi)
+            return res
+
+        return BulkRun(
+            items,
+            prepare=prepare,
+            send=send,
+            key=lambda item: item[0],
+            max_workers=max_workers,
+            ordered=ordered
+        )
+
+    def update_diff_many(
+        self,
+        items: Iterable[Tuple[str, Dict]],
+        current: Optional[Callable[[str], Optional[Dict]]] = None,
+        dry_run=False,
+        max_workers: int = 8,
+        ordered: bool = True
+    ) -> BulkRun:
+        """
+        update_diff many (doi, json_body) pairs in parallel, the data of
+        each result is an UpdateResult
+
+        current looks up the known state of a doi (e.g. DOIMirror.get),
+        dois it returns None for are retrieved
+        """
+        def send(args: Tuple[str, Dict]) -> UpdateResult:
+            doi, desired = args
+            known = current(doi) if current is not None else None
+            return self._update_diff(doi, desired, known, dry_run)
+
+        return BulkRun(
+            items,
+            prepare=lambda item: (item[0], self._diff_args(item[1])),
+            send=send,
+            key=lambda item: item[0],
+            max_workers=max_workers,
+            ordered=ordered
+        )
+
+    def transition_many(
+        self,
+        dois: Iterable[str],
+        event: str,
+        current: Optional[Callable[[str], Optional[Dict]]] = None,
+        dry_run=False,
+        max_workers: int = 8,
+        ordered: bool = True,
+        progress: Optional[Callable[[int, int], None]] = None
+    ) -> BulkRun:
+        """
+        send an event (publish, register or hide) to many dois in parallel,
+        the data of each result is an UpdateResult
+
+        the put body is just the event, with no model validation. dois
+        already in the target state are unchanged and those it cannot move
+        from fail with an InvalidTransitionError before anything is sent.
+        current is as for update_diff_many.
+        """
+        from .models import EventEnum
+        desired = {'event': EventEnum(event).value}
+
+        def send(doi: str) -> UpdateResult:
+            known = current(doi) if current is not None else None
+            return self._update_diff(doi, desired, known, dry_run)
+
+        return BulkRun(
+            dois,
+            prepare=lambda doi: doi,
+            send=send,
+            key=lambda doi: doi,
+            max_workers=max_workers,
+            ordered=ordered,
+            progress=progress
+        )
@@ -0,0 +1,119 @@
+"""
+attribute level diffs between desired and current doi metadata
+
+DataCite replaces each attribute sent in a PUT as a whole, so the minimal
+update is the set of top level attributes whose values differ. the api
+enriches what it returns (e.g. types gains ris/bibtex, creators gain empty
+affiliation lists), so desired values are compared as a subset of current.
+"""
+from typing import Any, Dict, NamedTuple, Optional
+from enum import Enum
+import json
+
+from .exceptions import InvalidTransitionError
+from .utils import dumps, to_camel
+
+# https://support.datacite.org/docs/doi-states
+EVENT_STATES = {
+    'publish': 'findable',
+    'register': 'registered',
+    'hide': 'registered'
+}
+# the states each event can move a doi from, see EventEnum
+EVENT_TRANSITIONS = {
+    'publish': ('draft', 'registered'),
+    'register': ('draft',),
+    'hide': ('findable',)
+}
+
+
+class UpdateStatus(str, Enum):
+    changed = 'changed'  # a put with only the changed attributes was sent
+    unchanged = 'unchanged'  # nothing differs, no request was made
+    skipped = 'skipped'  # differs but dry_run, no request was made
+
+
+class UpdateResult(NamedTuple):
+    doi: str
+    status: UpdateStatus
+    changes: Dict[str, Any]
+    response: Optional[Dict] = None
+
+
+def api_names(value: Any) -> Any:
+    """ dict keys camelCased through nested dicts and lists """
+    if isinstance(value, dict):
+        return {to_camel(k): api_names(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [api_names(v) for v in value]
+    return value
+
+
+def desired_attributes(payload) -> Dict[str, Any]:
+    """
+    attributes explicitly set on a validated payload model, as plain json
+    types under their api (camelCase) names. extra attributes are kept as
+    given by the model, so their keys are converted here too
+    """
+    data = payload.dict(by_alias=True, exclude_unset=True)['data']
+    return api_names(json.loads(dumps(data.get('attributes') or {})))
+
+
+def check_transition(doi: str, state: Optional[str], event: str) -> None:
+    """ raise InvalidTransitionError, an unknown state is let through """
+    if state is not None and state not in EVENT_TRANSITIONS.get(event, ()):
+        raise InvalidTransitionError(doi, state, event)
+
+
+_EMPTY = (None, '', [], {})
+
+
+def contains(current: Any, desired: Any) -> bool:
+    """
+    desired is a subset of current: every dict key desired sets matches
+    (a missing key matches an empty value), lists match element-wise
+    """
+    if isinstance(desired, dict):
+        if not isinstance(current, dict):
+            return current in _EMPTY and not any(
+                v not in _EMPTY for v in desired.values()
+            )
+        return all(
+            contains(current.get(key), value)
+            for key, value in desired.items()
+        )
+    if isinstance(desired, list):
+        if current is None:
+            return not desired
+        return isinstance(current, list) and len(current) == len(desired) and (
+            all(contains(c, d) for c, d in zip(current, desired))
+        )
+    if current is None:
+        return desired in _EMPTY
+    return current == desired
+
+
+def attribute_changes(
+    desired: Dict,
+    current: Dict,
+    doi: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    desired attributes that current does not contain, the doi is compared
+    case insensitively. an event only counts when the doi is not already in
+    the state it leads to (and raises InvalidTransitionError when it cannot
+    move from the current state, naming doi or else current's doi)
+    """
+    changes = {}
+    for key, value in desired.items():
+        if key == 'event':
+            state = current.get('state')
+            if state != EVENT_STATES.get(value):
+                check_transition(doi or current.get('doi'), state, value)
+                changes[key] = value
+        elif key == 'doi' and isinstance(value, str):
+            if (current.get(key) or '').lower() != value.lower():
+                changes[key] = value
+        elif not contains(current.get(key), value):
+            changes[key] = value
+    return changes
@@ -0,0 +1,41 @@
+from typing import Optional
+
+
+class DataCiteRESTError(Exception):
+    """
+    raised for failed requests, keeps the http status (None for transport
+    errors) so callers can tell a 404 from a 5xx without parsing messages
+    """
+    def __init__(
+        self,
+        message: str,
+        status_code: Optional[int] = None,
+        response_text: Optional[str] = None
+    ):
+        super().__init__(message)
+        self.status_code = status_code
+        self.response_text = response_text
+
+
+class InvalidTransitionError(ValueError):
+    """ an event that cannot apply to the doi's current state, never sent """
+    def __init__(self, doi: str, state: Optional[str], event: str):
+        super().__init__(f'{doi}: cannot {event} a {state} doi')
+        self.doi = doi
+        self.state = state
+        self.event = event
+
+
+class ExportCoverageError(ValueError):
+    """ export shards that do not add up to the records matching params """
+    def __init__(self, total: int, covered: int):
+        super().__init__(
+            f'shards cover {covered} of {total} matching records, '
+            f'records outside every shard would not be exported'
+        )
+        self.total = total
+        self.covered = covered
+
+
+class DeadlineExceededError(DataCiteRESTError):
+    """ the deadline of a call ran out, including time spent on retries """
@@ -0,0 +1,200 @@
+"""
+resumable, sharded bulk export of dois to gzipped ndjson
+
+the keyspace is split into shards (list filters such as created year or
+resource type) which are paged through in parallel. every page is appended
+to its shard file as its own gzip member and the checkpoint records the
+file offset and next cursor after each page, so an interrupted export
+truncates any partial write and continues from the last completed page.
+before exporting the shard counts are checked against the count for params,
+so a record outside every shard fails the export instead of going missing.
+"""
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+import gzip
+import json
+import logging
+import os
+import threading
+import time
+
+from .exceptions import ExportCoverageError
+from .utils import dumps
+
+log = logging.getLogger(__name__)
+
+
+class ExportShard(NamedTuple):
+    name: str
+    params: Dict
+
+
+class ExportSummary(NamedTuple):
+    records: Dict[str, int]
+    elapsed: float
+    records_per_second: float
+
+
+def shards_by_year(
+    start: int,
+    end: int,
+    field: str = 'created'
+) -> List[ExportShard]:
+    """ one shard per year, field is created or registered """
+    assert field in ('created', 'registered'), field
+    return [
+        ExportShard(f'{field}-{year}', {field: year})
+        for year in range(start, end + 1)
+    ]
+
+
+def shards_by_resource_type(types: Iterable[str]) -> List[ExportShard]:
+    """ one shard per resource-type-id, e.g. dataset, text """
+    return [
+        ExportShard(f'resource-type-{t}', {'resource_type_id': t})
+        for t in types
+    ]
+
+
+class ExportCheckpoint:
+    """ json file of per shard progress, replaced atomically on save """
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._state = {}
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                self._state = json.load(f)
+
+    def get(self, shard: str) -> Dict:
+        with self._lock:
+            return dict(self._state.get(shard) or {
+                'cursor': 1,
+                'offset': 0,
+                'records': 0,
+                'done': False
+            })
+
+    def save(self, shard: str, state: Dict) -> None:
+        with self._lock:
+            self._state[shard] = dict(state)
+            tmp = f'{self.path}.tmp'
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(self._state, f, indent=2, sort_keys=True)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+
+
+class DOIExporter:
+    """
+    export every record matching params, split over shards
+
+    client is a DataCiteREST (max_workers should not exceed its
+    pool_maxsize). rerunning with the same output_dir resumes. with
+    check_coverage run() raises ExportCoverageError when the shards do not
+    add up to every matching record, before anything is exported.
+    """
+    def __init__(
+        self,
+        client,
+        output_dir: str,
+        shards: List[ExportShard],
+        params: Optional[Dict] = None,
+        resource: str = 'dois',
+        page_size: int = 1000,
+        max_workers: int = 4,
+        checkpoint_path: Optional[str] = None,
+        check_coverage: bool = True
+    ):
+        assert len({s.name for s in shards}) == len(shards), 'shard names'
+        self.client = client
+        self.output_dir = output_dir
+        self.shards = shards
+        self.params = params or {}
+        self.resource = resource
+        self.page_size = page_size
+        self.max_workers = max_workers
+        self.check_coverage = check_coverage
+        os.makedirs(output_dir, exist_ok=True)
+        self.checkpoint = ExportCheckpoint(
+            checkpoint_path or os.path.join(output_dir, 'checkpoint.json')
+        )
+
+    def shard_path(self, shard: ExportShard) -> str:
+        return os.path.join(self.output_dir, f'{shard.name}.ndjson.gz')
+
+    def export_shard(self, shard: ExportShard) -> int:
+        state = self.checkpoint.get(shard.name)
+        if state['done'] or state['cursor'] is None:
+            return state['records']
+        path = self.shard_path(shard)
+        params = {
+            **self.params,
+            **shard.params,
+            'page[cursor]': state['cursor']
+        }
+        mode = 'r+b' if os.path.exists(path) else 'wb'
+        with open(path, mode) as f:
+            # drop anything written after the last checkpoint
+            f.truncate(state['offset'])
+            f.seek(state['offset'])
+            pages = self.client.iter_pages(
+                self.resource, params, page_size=self.page_size
+            )
+            for page in pages:
+                records = page.get('data') or []
+                if records:
+                    f.write(gzip.compress(
+                        b''.join(dumps(r) + b'\n' for r in records)
+                    ))
+                    f.flush()
+                    os.fsync(f.fileno())
+                state['offset'] = f.tell()
+                state['records'] += len(records)
+                state['cursor'] = self.client._next_cursor(page)
+                # the last page and done land together, a crash in between
+                # must not resume from a None cursor
+                state['done'] = state['cursor'] is None
+                self.checkpoint.save(shard.name, state)
+        if not state['done']:
+            state['done'] = True
+            self.checkpoint.save(shard.name, state)
+        log.info(f'{self}.export_shard - {shard.name}: {state["records"]}')
+        return state['records']
+
+    def _count(self, shard: Optional[ExportShard] = None) -> int:
+        params = {**self.params, **(shard.params if shard else {})}
+        return self.client.count(self.resource, params)
+
+    def coverage(self) -> Tuple[int, int]:
+        """ (records matching params, sum of the shard counts) """
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            covered = sum(executor.map(self._count, self.shards))
+        return self._count(), covered
+
+    def run(self) -> ExportSummary:
+        start = time.perf_counter()
+        if self.check_coverage:
+            total, covered = self.coverage()
+            if covered != total:
+                raise ExportCoverageError(total, covered)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            counts = dict(zip(
+                (s.name for s in self.shards),
+                executor.map(self.export_shard, self.shards)
+            ))
+        elapsed = time.perf_counter() - start
+        total = sum(counts.values())
+        return ExportSummary(
+            records=counts,
+            elapsed=elapsed,
+            records_per_second=total / elapsed if elapsed else 0.0
+        )
+
+
+def read_export(path: str) -> Iterable[Dict]:
+    """ stream records back out of a shard file """
+    with gzip.open(path, 'rb') as f:
+        for line in f:
+            yield json.loads(line)
@@ -0,0 +1,247 @@
+from typing import Optional, Dict, List, Sequence, Tuple
+from bisect import bisect_left
+from collections import defaultdict
+import re
+import threading
+
+_DOI_PATH = re.compile(
+    r'^(?P<resource>[^/]+)/(?P<id>.+?)(?P<sub>/activities)?$'
+)
+
+
+def endpoint_name(url_path: str) -> str:
+    """
+    collapse ids so metrics have bounded cardinality
+
+    'dois/' -> 'dois', 'dois/10.5438/abc' -> 'dois/{id}',
+    'dois/10.5438/abc/activities' -> 'dois/{id}/activities'
+    """
+    url_path = url_path.strip('/')
+    match = _DOI_PATH.match(url_path)
+    if match is None:
+        return url_path
+    return f"{match.group('resource')}/{{id}}{match.group('sub') or ''}"
+
+
+class RequestInfo:
+    """
+    what hooks see for each attempt of a request
+
+    timings are seconds, connect covers dns, tcp and tls and is 0 when a
+    pooled connection was reused, ttfb runs until response headers arrive
+    and total includes reading the body.
+    """
+    __slots__ = (
+        'method',
+        'url_path',
+        'endpoint',
+        'params',
+        'attempt',
+        'status_code',
+        'bytes_sent',
+        'bytes_received',
+        'connect',
+        'ttfb',
+        'total'
+    )
+
+    def __init__(
+        self,
+        method: str,
+        url_path: str,
+        params: Optional[Dict] = None,
+        attempt: int = 0,
+        bytes_sent: int = 0
+    ):
+        self.method = method
+        self.url_path = url_path
+        self.endpoint = endpoint_name(url_path)
+        self.params = params
+        self.attempt = attempt
+        self.status_code = None
+        self.bytes_sent = bytes_sent
+        self.bytes_received = 0
+        self.connect = None
+        self.ttfb = None
+        self.total = None
+
+    def __repr__(self) -> str:
+        return (
+            f'RequestInfo({self.method} {self.url_path} '
+            f'{self.status_code} {self.total})'
+        )
+
+
+class RequestHook:
+    """
+    subclass and pass instances to the client's hooks argument
+
+    callbacks run on the request path, so keep them cheap. exceptions
+    raised by hooks are logged and swallowed.
+    """
+    def before_request(self, info: RequestInfo) -> None:
+        pass
+
+    def after_response(self, info: RequestInfo) -> None:
+        pass
+
+    def on_error(self, info: RequestInfo, exc: Exception) -> None:
+        pass
+
+
+class Histogram:
+    """ cumulative bucket counts in the prometheus style """
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        """ upper bound of the bucket holding the q-th observation """
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(self.buckets, self.counts):
+            seen += n
+            if seen >= rank:
+                return bound
+        return float('inf')
+
+    def snapshot(self) -> Dict:
+        return {
+            'buckets': dict(zip(self.buckets + (float('inf'),), self.counts)),
+            'sum': self.sum,
+            'count': self.count
+        }
+
+
+class MetricsCollector(RequestHook):
+    """
+    in-process counters and latency histograms per endpoint
+
+    pass an instance in the client's hooks, then scrape snapshot() or
+    render() (prometheus text format).
+    """
+    buckets = (
+        0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0
+    )
+
+    def __init__(self, buckets: Optional[Sequence[float]] = None):
+        if buckets is not None:
+            self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._requests = defaultdict(int)
+        self._errors = defaultdict(int)
+        self._bytes = defaultdict(int)
+        self._counters = defaultdict(int)
+        self._latency = {}
+        self._ttfb = {}
+        self._connect = {}
+
+    def _observe(self, histograms: Dict, key: str, value: float) -> None:
+        if value is None:
+            return
+        if key not in histograms:
+            histograms[key] = Histogram(self.buckets)
+        histograms[key].observe(value)
+
+    def after_response(self, info: RequestInfo) -> None:
+        with self._lock:
+            self._requests[(info.endpoint, info.method, info.status_code)] += 1
+            self._bytes[(info.endpoint, 'sent')] += info.bytes_sent
+            self._bytes[(info.endpoint, 'received')] += info.bytes_received
+            self._observe(self._latency, info.endpoint, info.total)
+            self._observe(self._ttfb, info.endpoint, info.ttfb)
+            if info.connect:
+                self._observe(self._connect, info.endpoint, info.connect)
+
+    def on_error(self, info: RequestInfo, exc: Exception) -> None:
+        status = info.status_code or exc.__class__.__name__
+        with self._lock:
+            self._errors[(info.endpoint, info.method, status)] += 1
+            if info.status_code is None:
+                # no response, so after_response did not see this attempt
+                self._observe(self._latency, info.endpoint, info.total)
+
+    def increment(self, name: str, endpoint: str, n: int = 1) -> None:
+        """ free-form counters, e.g. retries or hedged requests """
+        with self._lock:
+            self._counters[(name, endpoint)] += n
+
+    def latency_quantile(self, endpoint: str, q: float) -> Optional[float]:
+        with self._lock:
+            histogram = self._latency.get(endpoint)
+            return histogram.quantile(q) if histogram else None
+
+    def snapshot(self) -> Dict:
+        def keyed(counts: Dict) -> List[Tuple]:
+            return sorted(
+                ((*k, v) for k, v in counts.items()), key=lambda x: str(x)
+            )
+
+        with self._lock:
+            return {
+                'requests': keyed(self._requests),
+                'errors': keyed(self._errors),
+                'bytes': keyed(self._bytes),
+                'counters': keyed(self._counters),
+                'latency': {
+                    k: v.snapshot() for k, v in self._latency.items()
+                },
+                'ttfb': {k: v.snapshot() for k, v in self._ttfb.items()},
+                'connect': {
+                    k: v.snapshot() for k, v in self._connect.items()
+                }
+            }
+
+    def render(self, prefix: str = 'datacite_rest') -> str:
+        """ prometheus text exposition format """
+        snapshot = self.snapshot()
+        lines = []
+        for endpoint, method, status, n in snapshot['requests']:
+            lines.append(
+                f'{prefix}_requests_total{{endpoint="{endpoint}",'
+                f'method="{method}",status="{status}"}} {n}'
+            )
+        for endpoint, method, status, n in snapshot['errors']:
+            lines.append(
+                f'{prefix}_errors_total{{endpoint="{endpoint}",'
+                f'method="{method}",status="{status}"}} {n}'
+            )
+        for endpoint, direction, n in snapshot['bytes']:
+            lines.append(
+                f'{prefix}_bytes_{direction}_total'
+                f'{{endpoint="{endpoint}"}} {n}'
+            )
+        for name, endpoint, n in snapshot['counters']:
+            lines.append(
+                f'{prefix}_{name}_total{{endpoint="{endpoint}"}} {n}'
+            )
+        for metric in ('latency', 'ttfb', 'connect'):
+            for endpoint, histogram in sorted(snapshot[metric].items()):
+                name = f'{prefix}_{metric}_seconds'
+                cumulative = 0
+                for bound, n in histogram['buckets'].items():
+                    cumulative += n
+                    le = '+Inf' if bound == float('inf') else bound
+                    lines.append(
+                        f'{name}_bucket{{endpoint="{endpoint}",'
+                        f'le="{le}"}} {cumulative}'
+                    )
+                lines.append(
+                    f'{name}_sum{{endpoint="{endpoint}"}} {histogram["sum"]}'
+                )
+                lines.append(
+                    f'{name}_count{{endpoint="{endpoint}"}} '
+                    f'{histogram["count"]}'
+                )
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,291 @@
+"""
+durable journal for bulk minting, safe to kill and resume
+
+every payload is validated, given its doi and written to a sqlite journal
+as pending before anything is sent. a job is marked in_flight before its
+POST and done (or failed on a 4xx) after it, each change committed. on
+resume in_flight jobs, whose outcome is unknown, are settled by looking
+their doi up, so done dois are never sent again and nothing is minted
+twice.
+
+    with MintJournal('import.sqlite', client) as journal:
+        journal.add(payloads, key=lambda body: body['source'])
+        for result in journal.run():
+            ...
+"""
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union
+)
+from enum import Enum
+import copy
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+from pydantic import BaseModel
+
+from .bulk import BulkRun
+from .exceptions import DataCiteRESTError
+from .pool import random_suffix
+from .utils import dumps
+
+_SCHEMA = [
+    'CREATE TABLE IF NOT EXISTS jobs ('
+    'id INTEGER PRIMARY KEY, key TEXT UNIQUE, doi TEXT UNIQUE, '
+    'payload BLOB, state TEXT NOT NULL, attempts INTEGER NOT NULL, '
+    'status_code INTEGER, error TEXT, updated REAL NOT NULL)',
+    'CREATE INDEX IF NOT EXISTS jobs_state ON jobs(state, id)'
+]
+
+
+def payload_key(json_body: Union[Dict, BaseModel, bytes]) -> str:
+    """ sha256 of the payload as canonical json, the default add() key """
+    if isinstance(json_body, BaseModel):
+        json_body = json_body.dict(by_alias=True)
+    elif isinstance(json_body, (bytes, bytearray)):
+        try:
+            json_body = json.loads(json_body)
+        except ValueError:
+            return hashlib.sha256(json_body).hexdigest()
+    canonical = json.dumps(
+        json_body, sort_keys=True, separators=(',', ':'), default=str
+    )
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+class JobState(str, Enum):
+    pending = 'pending'
+    in_flight = 'in_flight'
+    done = 'done'
+    failed = 'failed'
+
+
+class Job(NamedTuple):
+    id: int
+    key: Optional[str]
+    doi: Optional[str]
+    state: JobState
+    attempts: int
+    status_code: Optional[int] = None
+    error: Optional[str] = None
+
+
+class MintJournal:
+    """
+    sqlite journal of create() jobs
+
+    dois without a doi attribute get prefix/suffix() up front (see
+    random_suffix), which is what makes an interrupted POST checkable. a
+    key identifies a payload across re-runs of an import, adding a key (or
+    doi) that is already journaled is a no-op. without key() it is the
+    payload_key() of the payload as given and its occurrence within the
+    add() call, so re-adding the same payloads after a crash mints nothing
+    twice while identical payloads in one input are still separate jobs.
+    """
+    def __init__(
+        self,
+        path: str,
+        client=None,
+        suffix: Callable[[], str] = random_suffix
+    ):
+        self.path = path
+        self.client = client
+        self.suffix = suffix
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            for statement in _SCHEMA:
+                self._conn.execute(statement)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _payload(
+        self,
+        json_body: Union[Dict, BaseModel, bytes],
+        draft: bool
+    ) -> Tuple[str, bytes]:
+        """ (doi, serialized payload), assigning the doi if missing """
+        if isinstance(json_body, (bytes, bytearray)):
+            body, validated = json.loads(json_body), True
+        elif isinstance(json_body, BaseModel):
+            body, validated = json_body.dict(by_alias=True), True
+        else:
+            body, validated = copy.deepcopy(json_body), False
+        attributes = body['data']['attributes']
+        if not attributes.get('doi'):
+            prefix = attributes.get('prefix') or self.client._auth.prefix
+            attributes['doi'] = f'{prefix}/{self.suffix()}'
+        doi = attributes['doi'].lower()
+        if validated:
+            return doi, dumps(body)
+        return doi, self.client._create_args(body, draft)[1]
+
+    def add(
+        self,
+        json_bodies: Iterable[Union[Dict, BaseModel, bytes]],
+        draft=False,
+        key: Optional[Callable[[Any], str]] = None
+    ) -> int:
+        """
+        journal payloads as pending, returns the number added
+
+        payloads failing validation are journaled as failed and never sent.
+        """
+        added = 0
+        seen = {}
+        for json_body in json_bodies:
+            if key is not None:
+                job_key = key(json_body)
+            else:
+                digest = payload_key(json_body)
+                seen[digest] = seen.get(digest, -1) + 1
+                job_key = f'{digest}:{seen[digest]}'
+            try:
+                doi, payload = self._payload(json_body, draft)
+                row = (job_key, doi, payload, JobState.pending.value, None)
+            except Exception as e:
+                row = (job_key, None, None, JobState.failed.value, str(e))
+            with self._lock, self._conn:
+                added += self._conn.execute(
+                    'INSERT OR IGNORE INTO jobs '
+                    '(key, doi, payload, state, attempts, error, updated) '
+                    'VALUES (?, ?, ?, ?, 0, ?, ?)',
+                    (*row, time.time())
+                ).rowcount
+        return added
+
+    def _set_state(
+        self,
+        job_id: int,
+        state: JobState,
+        status_code: Optional[int] = None,
+        error: Optional[str] = None
+    ) -> None:
+        attempts = ', attempts = attempts + 1' if (
+            state is JobState.in_flight
+        ) else ''
+        with self._lock, self._conn:
+            self._conn.execute(
+                f'UPDATE jobs SET state = ?, status_code = ?, error = ?, '
+                f'updated = ?{attempts} WHERE id = ?',
+                (state.value, status_code, error, time.time(), job_id)
+            )
+
+    def counts(self) -> Dict[str, int]:
+        """ {state: jobs}, every state present """
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT state, COUNT(*) FROM jobs GROUP BY state'
+            ).fetchall()
+        return {**{s.value: 0 for s in JobState}, **dict(rows)}
+
+    def jobs(self, state: Optional[JobState] = None) -> Iterator[Job]:
+        sql, args = (
+            'SELECT id, key, doi, state, attempts, status_code, error '
+            'FROM jobs'
+        ), ()
+        if state is not None:
+            sql, args = f'{sql} WHERE state = ?', (JobState(state).value,)
+        with self._lock:
+            rows = self._conn.execute(f'{sql} ORDER BY id', args).fetchall()
+        for row in rows:
+            yield Job(row[0], row[1], row[2], JobState(row[3]), *row[4:])
+
+    def recover(self) -> int:
+        """
+        settle in_flight jobs left by an interrupted run, done if their doi
+        exists, pending otherwise. returns the number found done.
+        """
+        found = 0
+        for job in self.jobs(JobState.in_flight):
+            try:
+                self.client.retrieve(job.doi)
+            except DataCiteRESTError as e:
+                if e.status_code != 404:
+                    raise
+                self._set_state(job.id, JobState.pending)
+                continue
+            self._set_state(job.id, JobState.done)
+            found += 1
+        return found
+
+    def _runnable(self, retry_failed: bool) -> Iterator[Tuple[int, str]]:
+        """ (id, doi) of jobs to send, read in id order a page at a time """
+        states = [JobState.pending.value]
+        if retry_failed:
+            states.append(JobState.failed.value)
+        last = 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT id, doi FROM jobs WHERE id > ? AND state IN "
+                    f"({', '.join('?' * len(states))}) "
+                    f"AND payload IS NOT NULL ORDER BY id LIMIT 1000",
+                    (last, *states)
+                ).fetchall()
+            if not rows:
+                return
+            yield from rows
+            last = rows[-1][0]
+
+    def _start(self, job: Tuple[int, str]) -> Tuple[int, bytes]:
+        """ write ahead: in_flight is committed before the POST is sent """
+        job_id = job[0]
+        self._set_state(job_id, JobState.in_flight)
+        with self._lock:
+            payload = self._conn.execute(
+                'SELECT payload FROM jobs WHERE id = ?', (job_id,)
+            ).fetchone()[0]
+        return job_id, payload
+
+    def _send(self, args: Tuple[int, bytes]) -> Dict:
+        job_id, payload = args
+        url_path = self.client._create_args(payload)[0]
+        try:
+            res = self.client.request(url_path, method='POST', json_=payload)
+        except Exception as e:
+            status_code = getattr(e, 'status_code', None)
+            if status_code is not None and 400 <= status_code < 500:
+                self._set_state(job_id, JobState.failed, status_code, str(e))
+            # otherwise it may have been created, left in_flight for recover
+            raise
+        self._set_state(job_id, JobState.done)
+        return res
+
+    def run(
+        self,
+        max_workers: int = 8,
+        retry_failed=False,
+        ordered=False
+    ) -> BulkRun:
+        """
+        recover, then send every pending job (and failed ones with
+        retry_failed) in parallel, see BulkRun. results are keyed by doi.
+        """
+        self.recover()
+        return BulkRun(
+            self._runnable(retry_failed),
+            prepare=self._start,
+            send=self._send,
+            key=lambda job: job[1],
+            max_workers=max_workers,
+            ordered=ordered
+        )
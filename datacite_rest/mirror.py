@@ -0,0 +1,230 @@
+"""
+local sqlite mirror of doi metadata
+
+sync() pages through only the dois updated since the stored high-water
+mark, so repeat syncs cost the change rate. lookups by doi, url, state or
+creator are then answered from indexed local tables with no http.
+"""
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional
+import datetime
+import json
+import sqlite3
+import threading
+import time
+
+_SCHEMA = [
+    'CREATE TABLE IF NOT EXISTS dois ('
+    'doi TEXT PRIMARY KEY, prefix TEXT, url TEXT, state TEXT, '
+    'created TEXT, updated TEXT, attributes TEXT NOT NULL)',
+    'CREATE INDEX IF NOT EXISTS dois_url ON dois(url)',
+    'CREATE INDEX IF NOT EXISTS dois_state ON dois(state)',
+    'CREATE INDEX IF NOT EXISTS dois_updated ON dois(updated)',
+    'CREATE TABLE IF NOT EXISTS creators ('
+    'doi TEXT NOT NULL, name TEXT NOT NULL)',
+    'CREATE INDEX IF NOT EXISTS creators_name ON creators(name)',
+    'CREATE INDEX IF NOT EXISTS creators_doi ON creators(doi)',
+    'CREATE TABLE IF NOT EXISTS sync_state ('
+    'key TEXT PRIMARY KEY, value TEXT)'
+]
+_TIMESTAMP = '%Y-%m-%dT%H:%M:%SZ'
+
+
+def parse_timestamp(timestamp: str) -> datetime.datetime:
+    """ api timestamps, e.g. 2021-01-02T03:04:05Z or with .000Z """
+    value = timestamp.replace('Z', '+00:00')
+    if '.' in value:
+        # fromisoformat only takes 3 or 6 fractional digits, drop them
+        head, _, tail = value.partition('.')
+        value = head + tail[tail.find('+'):] if '+' in tail else head
+    return datetime.datetime.fromisoformat(value)
+
+
+def format_timestamp(value: datetime.datetime) -> str:
+    return value.astimezone(datetime.timezone.utc).strftime(_TIMESTAMP)
+
+
+def updated_since_query(timestamp: str) -> str:
+    """ elasticsearch range on updated, colons escaped for query_string """
+    return f"updated:[{timestamp.replace(':', chr(92) + ':')} TO *]"
+
+
+class SyncResult(NamedTuple):
+    fetched: int
+    high_water_mark: Optional[str]
+    elapsed: float
+
+
+class DOIMirror:
+    """
+    indexed sqlite store of doi attributes
+
+    client is only needed for sync(), queries work offline. records are
+    stored as returned by the api under their lowercased doi. overlap is
+    the seconds before the start of a sync that the next one re-fetches,
+    for records updated mid-sync and search index lag.
+    """
+    def __init__(self, path: str, client=None, overlap: float = 30.0):
+        self.path = path
+        self.client = client
+        self.overlap = datetime.timedelta(seconds=overlap)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            for statement in _SCHEMA:
+                self._conn.execute(statement)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    @property
+    def high_water_mark(self) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM sync_state WHERE key = 'updated'"
+            ).fetchone()
+        return row[0] if row else None
+
+    def _creator_names(self, attributes: Dict) -> List[str]:
+        names = []
+        for creator in attributes.get('creators') or []:
+            name = creator.get('name') or ' '.join(filter(None, (
+                creator.get('givenName'), creator.get('familyName')
+            )))
+            if name:
+                names.append(name.lower())
+        return names
+
+    def upsert(self, records: Iterable[Dict]) -> int:
+        """ store api records ({'id', 'attributes'}) in one transaction """
+        rows = []
+        creators = []
+        for record in records:
+            attributes = record.get('attributes') or {}
+            doi = (record.get('id') or attributes['doi']).lower()
+            rows.append((
+                doi,
+                doi.split('/', 1)[0],
+                attributes.get('url'),
+                attributes.get('state'),
+                attributes.get('created'),
+                attributes.get('updated'),
+                json.dumps(attributes)
+            ))
+            creators.extend(
+                (doi, name) for name in self._creator_names(attributes)
+            )
+        with self._lock, self._conn:
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO dois VALUES (?, ?, ?, ?, ?, ?, ?)',
+                rows
+            )
+            self._conn.executemany(
+                'DELETE FROM creators WHERE doi = ?', ((r[0],) for r in rows)
+            )
+            self._conn.executemany(
+                'INSERT INTO creators VALUES (?, ?)', creators
+            )
+        return len(rows)
+
+    def _set_high_water_mark(self, value: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sync_state VALUES ('updated', ?)",
+                (value,)
+            )
+
+    def sync(
+        self,
+        params: Optional[Dict] = None,
+        page_size: int = 1000,
+        full: bool = False
+    ) -> SyncResult:
+        """
+        fetch dois updated since the last sync (all of them the first time
+        or with full), the range is inclusive so boundary records are
+        refetched rather than missed
+
+        pages are not in updated order, so the mark is only saved once the
+        whole listing is through. an interrupted sync keeps the records it
+        stored and resumes from the previous mark. the mark is never later
+        than overlap before the sync started, a record updated after its
+        page was read is still in the next sync's range.
+        """
+        assert self.client is not None, 'sync needs a client'
+        start = time.perf_counter()
+        cutoff = datetime.datetime.now(datetime.timezone.utc) - self.overlap
+        params = dict(params or {})
+        mark = None if full else self.high_water_mark
+        if mark is not None:
+            since = updated_since_query(mark)
+            query = params.get('query')
+            params['query'] = f'({query}) AND {since}' if query else since
+
+        fetched = 0
+        newest = mark
+        for page in self.client.iter_pages('dois', params, page_size):
+            records = page.get('data') or []
+            self.upsert(records)
+            fetched += len(records)
+            for record in records:
+                updated = (record.get('attributes') or {}).get('updated')
+                if updated and (newest is None or parse_timestamp(
+                    updated
+                ) > parse_timestamp(newest)):
+                    newest = updated
+        if newest is not None:
+            if parse_timestamp(newest) > cutoff:
+                newest = format_timestamp(cutoff)
+            self._set_high_water_mark(newest)
+        return SyncResult(fetched, newest, time.perf_counter() - start)
+
+    def _rows(self, sql: str, args=()) -> Iterator[Dict]:
+        with self._lock:
+            rows = self._conn.execute(sql, args).fetchall()
+        for row in rows:
+            yield json.loads(row[0])
+
+    def get(self, doi: str) -> Optional[Dict]:
+        """ attributes for doi, None if not mirrored """
+        return next(self._rows(
+            'SELECT attributes FROM dois WHERE doi = ?', (doi.lower(),)
+        ), None)
+
+    def exists(self, doi: str) -> bool:
+        with self._lock:
+            return self._conn.execute(
+                'SELECT 1 FROM dois WHERE doi = ?', (doi.lower(),)
+            ).fetchone() is not None
+
+    def by_url(self, url: str) -> List[Dict]:
+        """ every doi pointing at a landing page """
+        return list(self._rows(
+            'SELECT attributes FROM dois WHERE url = ?', (url,)
+        ))
+
+    def by_state(self, state: str) -> List[Dict]:
+        return list(self._rows(
+            'SELECT attributes FROM dois WHERE state = ?', (state,)
+        ))
+
+    def by_creator(self, name: str) -> List[Dict]:
+        """ case insensitive exact creator name """
+        return list(self._rows(
+            'SELECT attributes FROM dois WHERE doi IN '
+            '(SELECT doi FROM creators WHERE name = ?)',
+            (name.lower(),)
+        ))
+
+    def count(self, state: Optional[str] = None) -> int:
+        sql, args = 'SELECT COUNT(*) FROM dois', ()
+        if state is not None:
+            sql, args = f'{sql} WHERE state = ?', (state,)
+        with self._lock:
+            return self._conn.execute(sql, args).fetchone()[0]
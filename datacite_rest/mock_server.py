@@ -0,0 +1,397 @@
+"""
+local stand-in for the DataCite REST API, for offline tests and benchmarks
+
+implements enough of /dois (list, create, retrieve, update, activities) to
+exercise DataCiteREST, with injectable latency, 5xx errors and 429s.
+
+    with MockDataCiteServer(latency=0.005) as server:
+        client = DataCiteREST('id', 'pw', server.url, '10.5438')
+"""
+from typing import Optional, Dict, Iterable, List, Tuple, Union
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+from urllib.parse import urlparse, parse_qs, unquote, urlencode
+import datetime
+import hashlib
+import json
+import random
+import re
+import string
+import threading
+import time
+
+# https://support.datacite.org/docs/doi-states
+_EVENT_STATES = {
+    'publish': 'findable',
+    'register': 'registered',
+    'hide': 'registered'
+}
+
+# the only query syntax supported: field:[from TO to] with \-escaped colons
+# and field:("a" OR "b")
+_QUERY_RANGE = re.compile(r'(\w+):\[(\S+) TO (\S+)\]')
+_QUERY_TERMS = re.compile(r'(\w+):\(((?:"(?:[^"\\]|\\.)*"(?: OR )?)+)\)')
+_QUERY_TERM = re.compile(r'"((?:[^"\\]|\\.)*)"')
+
+
+def _now() -> str:
+    return datetime.datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+class _ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+    request_queue_size = 128
+
+
+class MockDataCiteStore:
+    """ thread-safe in-memory doi records and activities """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.dois = {}
+        self.activities = {}
+
+    def _activity(self, doi: str, action: str, attributes: Dict) -> None:
+        self.activities.setdefault(doi, []).append({
+            'id': f'{doi}-{len(self.activities.get(doi, []))}',
+            'type': 'activities',
+            'attributes': {
+                'prov:wasGeneratedBy': None,
+                'prov:generatedAtTime': _now(),
+                'action': action,
+                'changes': attributes
+            }
+        })
+
+    def create(self, attributes: Dict) -> Dict:
+        doi = attributes.get('doi')
+        if not doi:
+            suffix = ''.join(
+                random.choices(string.ascii_lowercase + string.digits, k=8)
+            )
+            doi = f"{attributes.get('prefix')}/{suffix[:4]}-{suffix[4:]}"
+        doi = doi.lower()
+        attributes = {**attributes}
+        event = attributes.pop('event', None)
+        now = _now()
+        with self._lock:
+            if doi in self.dois:
+                raise KeyError(doi)
+            record = {
+                'publisher': None,
+                **attributes,
+                'doi': doi,
+                'state': _EVENT_STATES.get(event, 'draft'),
+                'created': now,
+                'registered': None if event is None else now,
+                'updated': now
+            }
+            self.dois[doi] = record
+            self._activity(doi, 'create', attributes)
+            return record
+
+    def update(self, doi: str, attributes: Dict) -> Dict:
+        doi = doi.lower()
+        attributes = {**attributes}
+        event = attributes.pop('event', None)
+        with self._lock:
+            record = self.dois[doi]
+            record.update(attributes)
+            if event is not None:
+                record['state'] = _EVENT_STATES[event]
+                record['registered'] = record['registered'] or _now()
+            record['updated'] = _now()
+            self._activity(doi, 'update', attributes)
+            return record
+
+    def get(self, doi: str) -> Dict:
+        with self._lock:
+            return self.dois[doi.lower()]
+
+    def list(self) -> List[Dict]:
+        with self._lock:
+            return sorted(self.dois.values(), key=lambda x: x['doi'])
+
+
+class MockDataCiteHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive, like the real api
+    server_version = 'MockDataCite/0.1'
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    @property
+    def mock(self) -> 'MockDataCiteServer':
+        return self.server.mock
+
+    def _send_json(
+        self,
+        status: int,
+        body: Optional[Union[Dict, List]] = None,
+        headers: Optional[Dict] = None
+    ) -> None:
+        payload = b'' if body is None else json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/vnd.api+json')
+        self.send_header('Content-Length', str(len(payload)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _error(self, status: int, title: str, headers=None) -> None:
+        self._send_json(
+            status, {'errors': [{'status': str(status), 'title': title}]},
+            headers
+        )
+
+    def _read_json(self) -> Dict:
+        return json.loads(self._body or b'{}')
+
+    def _route(self) -> Tuple[str, Optional[str], Dict]:
+        """ ('list'|'detail'|'activities', doi, query) """
+        url = urlparse(self.path)
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        path = unquote(url.path).strip('/')
+        assert path.split('/')[0] == 'dois', path
+        rest = path[len('dois'):].strip('/')
+        if not rest:
+            return 'list', None, query
+        if rest.endswith('/activities'):
+            return 'activities', rest[:-len('/activities')], query
+        return 'detail', rest, query
+
+    def _inject(self) -> bool:
+        """ apply latency and injected failures, True if handled """
+        self.mock.count('requests')
+        if self.mock.latency:
+            time.sleep(self.mock.latency)
+        if self.mock.rate_limit_rate and (
+            random.random() < self.mock.rate_limit_rate
+        ):
+            self.mock.count('injected_429')
+            self._error(429, 'Too Many Requests', {'Retry-After': '0'})
+            return True
+        if self.mock.error_rate and random.random() < self.mock.error_rate:
+            self.mock.count('injected_5xx')
+            self._error(503, 'Service Unavailable')
+            return True
+        return False
+
+    def _record(self, record: Dict) -> Dict:
+        return {'id': record['doi'], 'type': 'dois', 'attributes': record}
+
+    def _handle(self, method: str) -> None:
+        # always drain the body so keep-alive connections stay in sync
+        length = int(self.headers.get('Content-Length') or 0)
+        self._body = self.rfile.read(length)
+        try:
+            route, doi, query = self._route()
+        except AssertionError:
+            return self._error(404, 'Not Found')
+        if self._inject():
+            return
+        try:
+            handler = getattr(self, f'_{method}_{route}')
+        except AttributeError:
+            return self._error(405, 'Method Not Allowed')
+        try:
+            handler(doi, query)
+        except KeyError:
+            self._error(404, 'The resource you are looking for does not exist')
+        except (ValueError, TypeError) as e:
+            self._error(422, str(e))
+
+    def do_GET(self):
+        self._handle('get')
+
+    def do_POST(self):
+        self._handle('post')
+
+    def do_PUT(self):
+        self._handle('put')
+
+    def _get_list(self, doi: None, query: Dict) -> None:
+        records = self.mock.filter(self.mock.store.list(), query)
+        sort = query.get('sort')
+        if sort:
+            records.sort(
+                key=lambda r: r.get(sort.lstrip('-')) or '',
+                reverse=sort.startswith('-')
+            )
+        size = int(query.get('page[size]', 25))
+        cursor = query.get('page[cursor]')
+        if cursor is not None:
+            # 1 starts cursor pagination, later cursors are opaque offsets
+            start = int(cursor[1:]) if cursor.startswith('o') else 0
+        else:
+            start = (int(query.get('page[number]', 1)) - 1) * size
+        page = records[start:start + size]
+        links = {'self': self.path}
+        if size and start + size < len(records):
+            next_query = {**query}
+            if cursor is not None:
+                next_query['page[cursor]'] = f'o{start + size}'
+            else:
+                next_query['page[number]'] = str(start // size + 2)
+            links['next'] = f'{self.mock.url}/dois?{urlencode(next_query)}'
+        self._send_json(200, {
+            'data': [self._record(r) for r in page],
+            'meta': self.mock.meta(records, size),
+            'links': links
+        })
+
+    def _get_detail(self, doi: str, query: Dict) -> None:
+        body = {'data': self._record(self.mock.store.get(doi))}
+        etag = '"{}"'.format(
+            hashlib.md5(json.dumps(body, sort_keys=True).encode()).hexdigest()
+        )
+        if self.headers.get('If-None-Match') == etag:
+            return self._send_json(304, headers={'ETag': etag})
+        self._send_json(200, body, {'ETag': etag})
+
+    def _get_activities(self, doi: str, query: Dict) -> None:
+        self.mock.store.get(doi)
+        self._send_json(200, {
+            'data': self.mock.store.activities.get(doi.lower(), [])
+        })
+
+    def _post_list(self, doi: None, query: Dict) -> None:
+        attributes = self._read_json()['data']['attributes']
+        try:
+            record = self.mock.store.create(attributes)
+        except KeyError:
+            return self._error(422, 'This DOI has already been taken')
+        self._send_json(201, {'data': self._record(record)})
+
+    def _put_detail(self, doi: str, query: Dict) -> None:
+        attributes = self._read_json()['data'].get('attributes') or {}
+        record = self.mock.store.update(doi, attributes)
+        self._send_json(200, {'data': self._record(record)})
+
+
+class MockDataCiteServer:
+    """
+    threaded local server on an ephemeral port
+
+    latency is added to every request in seconds, error_rate and
+    rate_limit_rate are the fraction of requests answered with a 503 or a
+    429 (with Retry-After: 0).
+    """
+    def __init__(
+        self,
+        latency: float = 0,
+        error_rate: float = 0,
+        rate_limit_rate: float = 0,
+        host: str = '127.0.0.1',
+        port: int = 0
+    ):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.store = MockDataCiteStore()
+        self.requests = 0
+        self.injected_429 = 0
+        self.injected_5xx = 0
+        self._lock = threading.Lock()
+        self._httpd = _ThreadingHTTPServer((host, port), MockDataCiteHandler)
+        self._httpd.mock = self
+        self._thread = None
+
+    def count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def filter(self, records: List[Dict], query: Dict) -> List[Dict]:
+        """ subset of the list filters, client-id is ignored """
+        if query.get('prefix'):
+            records = [
+                r for r in records
+                if r['doi'].startswith(f"{query['prefix'].lower()}/")
+            ]
+        for field in ('created', 'registered'):
+            if query.get(field):
+                records = [
+                    r for r in records
+                    if (r[field] or '').startswith(query[field])
+                ]
+        if query.get('state'):
+            records = [r for r in records if r['state'] == query['state']]
+        if query.get('resource-type-id'):
+            records = [
+                r for r in records
+                if ((r.get('types') or {}).get('resourceTypeGeneral') or '')
+                .lower() == query['resource-type-id'].lower()
+            ]
+        if query.get('query'):
+            for field, low, high in _QUERY_RANGE.findall(query['query']):
+                low, high = low.replace('\\:', ':'), high.replace('\\:', ':')
+                records = [
+                    r for r in records
+                    if (low == '*' or (r.get(field) or '') >= low)
+                    and (high == '*' or (r.get(field) or '') <= high)
+                ]
+            for field, terms in _QUERY_TERMS.findall(query['query']):
+                values = {
+                    re.sub(r'\\(.)', r'\1', t).lower()
+                    for t in _QUERY_TERM.findall(terms)
+                }
+                records = [
+                    r for r in records
+                    if (r.get(field) or '').lower() in values
+                ]
+        return records
+
+    def _facet(self, values: Iterable[Optional[str]]) -> List[Dict]:
+        counts = Counter(v for v in values if v)
+        return [
+            {'id': k, 'title': k, 'count': n}
+            for k, n in counts.most_common()
+        ]
+
+    def meta(self, records: List[Dict], size: int) -> Dict:
+        """ total and a subset of the facets, ids as the real api """
+        return {
+            'total': len(records),
+            'totalPages': -(-len(records) // size) if size else 0,
+            'states': self._facet(r['state'] for r in records),
+            'resourceTypes': self._facet(
+                re.sub(r'(?<!^)(?=[A-Z])', '-', t).lower() for t in (
+                    (r.get('types') or {}).get('resourceTypeGeneral')
+                    for r in records
+                ) if t
+            ),
+            'created': self._facet((r['created'] or '')[:4] for r in records),
+            'registered': self._facet(
+                (r['registered'] or '')[:4] for r in records
+            ),
+            'prefixes': self._facet(r['doi'].split('/')[0] for r in records)
+        }
+
+    def start(self) -> 'MockDataCiteServer':
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever,
+            kwargs={'poll_interval': 0.05},
+            daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
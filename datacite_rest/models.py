@@ -1,9 +1,9 @@
-from typing import Optional, List
-import datetime
+from typing import Dict, Optional
 from enum import Enum
 
 from pydantic import (
     BaseModel,
+    Extra,
     HttpUrl,
     condecimal,
     conint,
@@ -11,7 +11,7 @@ from pydantic import (
     # root_validator
 )
 
-from .utils import to_camel
+from .utils import to_camel, to_kebab
 
 
 class PrefixValidationModel(BaseModel):
@@ -72,102 +72,6 @@ class DataCiteBaseModel(BaseModel):
         use_enum_values = True
 
 
-class DataCiteIdentifierModel(DataCiteBaseModel):
-    identifier: HttpUrl
-    identifier_type: str
-
-
-class DataCiteTitleModel(DataCiteBaseModel):
-    title: str
-    title_type: Optional[str]
-    lang: Optional[str]
-
-
-class DataCiteNameIdentifierModel(DataCiteBaseModel):
-    name_identifier: Optional[str]
-    name_identifier_scheme: Optional[str]
-    scheme_uri: Optional[HttpUrl]
-
-
-class DataCiteCreatorModel(DataCiteBaseModel):
-    name: Optional[str]
-    name_type: Optional[str]
-    given_name: Optional[str]
-    family_name: Optional[str]
-    affiliation: Optional[str]
-    name_identifiers: Optional[DataCiteNameIdentifierModel]
-
-
-class DataCiteTypeModel(DataCiteBaseModel):
-    resource_type: Optional[str]
-    resource_type_general: ResourceTypeGeneralEnum
-
-
-class DataCiteAttributesBaseModel(DataCiteBaseModel, BasePrefixModel):
-    """
-    this base class can be used for minting "state": "draft" dois.
-    https://support.datacite.org/docs/api-create-dois#create-a-draft-doi
-    """
-    pass
-
-    class Config(DataCiteBaseModel.Config):
-        extra = 'allow'
-
-
-class DataCiteRequiredAttributesModel(DataCiteAttributesBaseModel):
-    """
-    https://support.datacite.org/docs/api-create-dois#create-a-findable-doi
-    https://support.datacite.org/docs/schema-mandatory-properties-v43#
-    https://support.datacite.org/docs/schema-properties-overview-v43
-    """
-    doi: Optional[str]  # on condition that prefix exists
-    identifiers: List[DataCiteIdentifierModel]
-    creators: List[DataCiteCreatorModel]
-    titles: List[DataCiteTitleModel]
-    publisher: str
-    publication_year: conint(ge=2021, le=datetime.datetime.utcnow().year + 1)
-    types: DataCiteTypeModel
-    url: HttpUrl
-
-    @validator('doi', check_fields=False, allow_reuse=True)
-    def doi_should_contain_slash(cls, v, values, **kwargs):
-        if not v and 'prefix' not in values:
-            raise ValueError(
-                f"datacite should contain 'prefix' or 'doi': {values}"
-            )
-        elif v is not None:
-            if '/' not in v or len(v.split('/')) != 2:
-                raise ValueError(f'doi should contain a single "/": {v}')
-            return v.strip()
-
-        return v
-
-    @validator('url', check_fields=False, allow_reuse=True)
-    def url_to_string(cls, v, values, **kwargs):
-        """ cast to str instead of HttpUrl model instance """
-        return str(v)
-
-
-class DataCiteAttributesModel(DataCiteRequiredAttributesModel):
-    """
-    https://support.datacite.org/docs/schema-optional-properties-v43
-    https://support.datacite.org/docs/schema-properties-overview-v43
-    """
-    suffix: Optional[str]
-    event: Optional[EventEnum]
-    # TODO: add more optional properties
-
-
-class DataCiteDraftModel(DataCiteBaseModel):
-    id: Optional[str]
-    type: str
-    attributes: DataCiteAttributesBaseModel
-
-
-class DataCiteModel(DataCiteDraftModel):
-    attributes: DataCiteAttributesModel
-
-
 class RespositoryAuthModel(DataCiteBaseModel, BasePrefixModel):
     id: str
     password: str
@@ -175,63 +79,88 @@ class RespositoryAuthModel(DataCiteBaseModel, BasePrefixModel):
     # prefix: condecimal(ge=10, lt=11)
 
 
-class JSONPayloadBaseModel(BaseModel):
+# the payload models are the bulk of the model building cost and are not
+# needed to authenticate or read, so they live in schema43 and are only
+# built when first looked up here or used by a client
+_schema43 = (
+    'DataCiteIdentifierModel',
+    'DataCiteTitleModel',
+    'DataCiteNameIdentifierModel',
+    'DataCiteCreatorModel',
+    'DataCiteTypeModel',
+    'DataCiteAttributesBaseModel',
+    'DataCiteRequiredAttributesModel',
+    'DataCiteAttributesModel',
+    'DataCiteDraftModel',
+    'DataCiteModel',
+    'JSONPayloadBaseModel',
+    'JSONPayloadDraftModel',
+    'JSONPayloadModel',
+    'Schema43BaseModel',
+    'Schema43Model'
+)
 
-    class Config:
-        alias_generator = to_camel
-        allow_population_by_field_name = True
-        arbitrary_types_allowed = True
 
+def __getattr__(name: str):
+    if name not in _schema43:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    from . import schema43
+    return getattr(schema43, name)
 
-class JSONPayloadDraftModel(JSONPayloadBaseModel):
-    """ for minting draft dois """
-    data: DataCiteDraftModel
 
-    class Config:
-        alias_generator = to_camel
-        allow_population_by_field_name = True
-        arbitrary_types_allowed = True
+class StateEnum(str, Enum):
+    draft = 'draft'
+    registered = 'registered'
+    findable = 'findable'
 
 
-class JSONPayloadModel(JSONPayloadDraftModel):
-    """ for passing full models """
-    data: DataCiteModel
+def _query_alias(name: str) -> str:
+    """ page_size to page[size], the rest kebab-case """
+    if name.startswith('page_'):
+        return f'page[{name[5:]}]'
+    return to_kebab(name)
 
 
-class Schema43BaseModel(JSONPayloadDraftModel):
-    """
-    https://schema.datacite.org/meta/kernel-4.3/doc/DataCite-MetadataKernel_v4.3.pdf
+class DataCiteQueryParamsModel(BaseModel):
     """
-    pass
+    list() filters, https://support.datacite.org/docs/api-queries
 
-
-class Schema43Model(JSONPayloadModel):
-    """
-    https://schema.datacite.org/meta/kernel-4.3/doc/DataCite-MetadataKernel_v4.3.pdf
+    created, registered and published take a year or comma separated
+    years. facets are returned in meta unless disable_facets.
     """
-    pass
-
-
-# class DataCiteQueryParamsModel(BaseModel):
-#     query = Optional[str]
-#     created = Optional[float]
-#     registered = Optional[float]
-#     provider_id = Optional[str]
-#     client_id = Optional[str]
-#     person_id = Optional[str]
-#     resource_type_id = Optional[str]
-#     subject = Optional[str]
-#     schema_version = Optional[str]
-#     random = Optional[bool]
-#     sample_size = Optional[float]
-#     sample_group = Optional[str]
-#     page[number] = Optional[float]
-#     page[size] = Optional[float]
-#     page[cursor] = Optional[float]
-#     include = Optional[str]
-#     sort = Optional[str]
-
-#     class Config:
-#         alias_generator = to_kebab
-#         allow_population_by_field_name = True
-#         arbitrary_types_allowed = True
+    query: Optional[str]
+    created: Optional[str]
+    registered: Optional[str]
+    published: Optional[str]
+    state: Optional[StateEnum]
+    prefix: Optional[str]
+    provider_id: Optional[str]
+    client_id: Optional[str]
+    consortium_id: Optional[str]
+    person_id: Optional[str]
+    affiliation_id: Optional[str]
+    resource_type_id: Optional[str]
+    subject: Optional[str]
+    schema_version: Optional[str]
+    random: Optional[bool]
+    sample_size: Optional[conint(ge=1, le=1000)]
+    sample_group: Optional[str]
+    page_number: Optional[conint(ge=1)]
+    page_size: Optional[conint(ge=0, le=1000)]
+    page_cursor: Optional[str]
+    include: Optional[str]
+    sort: Optional[str]
+    disable_facets: Optional[bool]
+
+    class Config:
+        alias_generator = _query_alias
+        allow_population_by_field_name = True
+        use_enum_values = True
+        extra = Extra.forbid
+
+    def params(self) -> Dict[str, str]:
+        """ the query string params, booleans as true/false """
+        return {
+            k: str(v).lower() if isinstance(v, bool) else str(v)
+            for k, v in self.dict(by_alias=True, exclude_none=True).items()
+        }
@@ -0,0 +1,200 @@
+"""
+pool of pre-minted draft dois so reserving one is a local operation
+
+a background thread keeps the pool topped up with create_many() and every
+change is written to a json file, so reservations survive restarts and a
+doi is never handed out twice.
+
+    with DraftDOIPool(client, size=20, path='pool.json').start() as pool:
+        doi = pool.reserve()
+"""
+from typing import Callable, Dict, List, Optional
+from collections import deque
+import json
+import logging
+import os
+import secrets
+import threading
+
+from .exceptions import DataCiteRESTError
+
+log = logging.getLogger(__name__)
+
+# synchronous mints tried on a miss before a local suffix collision is raised
+_MAX_COLLISIONS = 5
+
+# crockford base32 without the ambiguous i, l, o, u, as DataCite uses
+_SUFFIX_ALPHABET = '0123456789abcdefghjkmnpqrstvwxyz'
+
+
+def random_suffix() -> str:
+    """ e.g. 'x3k9-7hq2' """
+    chars = ''.join(secrets.choice(_SUFFIX_ALPHABET) for _ in range(8))
+    return f'{chars[:4]}-{chars[4:]}'
+
+
+class DraftDOIPool:
+    """
+    keep size draft dois minted ahead of demand
+
+    by default DataCite picks the suffixes, with suffix (e.g. random_suffix)
+    they are generated locally and a doi that is already taken is detected
+    by the 422 from create and replaced with a fresh suffix.
+    """
+    def __init__(
+        self,
+        client,
+        size: int = 10,
+        path: Optional[str] = None,
+        suffix: Optional[Callable[[], str]] = None,
+        attributes: Optional[Dict] = None,
+        max_workers: int = 2,
+        retry_interval: float = 5.0
+    ):
+        self.client = client
+        self.size = size
+        self.path = path
+        self.suffix = suffix
+        self.attributes = attributes or {}
+        self.max_workers = max_workers
+        self.retry_interval = retry_interval
+        self.minted = 0
+        self.misses = 0
+        self.collisions = 0
+        self._dois = deque()
+        self._lock = threading.Condition()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        if path is not None and os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                self._dois.extend(json.load(f)['dois'])
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._dois)
+
+    def _count(self, counter: str, n: int = 1) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + n)
+
+    def _save(self) -> None:
+        """ called holding the lock """
+        if self.path is None:
+            return
+        tmp = f'{self.path}.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({'dois': list(self._dois)}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+
+    def _payload(self) -> Dict:
+        attributes = {'prefix': self.client._auth.prefix, **self.attributes}
+        if self.suffix is not None:
+            with self._lock:
+                taken = set(self._dois)
+            doi = f"{attributes['prefix']}/{self.suffix()}".lower()
+            while doi in taken:
+                self._count('collisions')
+                doi = f"{attributes['prefix']}/{self.suffix()}".lower()
+            attributes['doi'] = doi
+        return {'data': {'type': 'dois', 'attributes': attributes}}
+
+    def _mint(self, n: int) -> List[str]:
+        """ create n drafts, returning the dois that were created """
+        run = self.client.create_many(
+            (self._payload() for _ in range(n)),
+            draft=True,
+            max_workers=self.max_workers,
+            ordered=False
+        )
+        dois = []
+        for result in run:
+            if result.ok:
+                dois.append(result.data['data']['id'])
+            elif result.error.status_code == 422 and self.suffix is not None:
+                self._count('collisions')
+            else:
+                log.warning(f'{self}._mint - {result.error}')
+        self._count('minted', len(dois))
+        return dois
+
+    def refill(self) -> int:
+        """ top the pool up to size, returns the number added """
+        deficit = self.size - len(self)
+        if deficit <= 0:
+            return 0
+        dois = self._mint(deficit)
+        with self._lock:
+            self._dois.extend(dois)
+            self._save()
+            self._lock.notify_all()
+        return len(dois)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                added = self.refill()
+            except Exception as e:
+                log.warning(f'{self}._run - {e}')
+                added = 0
+            if len(self) >= self.size:
+                self._wake.wait()
+                self._wake.clear()
+            elif not added:
+                # failing, back off rather than hammer the api
+                self._stop.wait(self.retry_interval)
+
+    def start(self) -> 'DraftDOIPool':
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def close(self) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> 'DraftDOIPool':
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def reserve(self, timeout: float = 0) -> str:
+        """
+        hand out a pre-minted draft doi, waiting up to timeout for a refill
+        when the pool is empty, after which one is minted synchronously
+        (with a fresh local suffix on each collision, up to a few times)
+        """
+        with self._lock:
+            if not self._dois and timeout:
+                self._lock.wait_for(lambda: self._dois, timeout)
+            doi = self._dois.popleft() if self._dois else None
+            if doi is not None:
+                self._save()
+        self._wake.set()
+        if doi is not None:
+            return doi
+        self._count('misses')
+        for attempt in range(_MAX_COLLISIONS):
+            try:
+                res = self.client.create(self._payload(), draft=True)
+            except DataCiteRESTError as e:
+                if e.status_code != 422 or self.suffix is None or (
+                    attempt == _MAX_COLLISIONS - 1
+                ):
+                    raise
+                self._count('collisions')
+                continue
+            self._count('minted')
+            return res['data']['id']
+
+    def release(self, doi: str) -> None:
+        """ return an unused reservation to the pool """
+        with self._lock:
+            self._dois.appendleft(doi)
+            self._save()
+            self._lock.notify_all()
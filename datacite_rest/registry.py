@@ -0,0 +1,146 @@
+"""
+many repositories behind one connection pool, routed by doi prefix
+
+credentials are validated once when the registry is built, every
+repository gets its own DataCiteREST sharing a single session, with its
+own concurrency bound and rate limit.
+
+    registry = DataCiteRegistry.from_file('repositories.json')
+    registry.retrieve('10.5438/abcd-1234')
+"""
+from typing import Dict, Iterable, Iterator, List, Optional, Union
+import json
+
+from pydantic import BaseModel
+
+from .authentication import RespositoryAuth
+from .datacite_rest import DataCiteREST
+from .diff import UpdateResult
+from .models import RespositoryAuthModel
+
+# per repository settings accepted next to the credentials
+_QUOTAS = ('concurrency', 'rate_limit')
+
+
+class DataCiteRegistry:
+    """
+    repositories are RespositoryAuth instances or dicts of id, password,
+    url and prefix, all required as there is no env var fallback, optionally
+    with their own concurrency and rate_limit which default to the registry
+    wide values. other kwargs are passed to every DataCiteREST.
+    """
+    def __init__(
+        self,
+        repositories: Iterable[Union[Dict, RespositoryAuth]],
+        pool_connections: int = 10,
+        pool_maxsize: int = 10,
+        pool_block: bool = False,
+        concurrency: Optional[int] = None,
+        rate_limit: Optional[float] = None,
+        **kwargs
+    ):
+        self._session = DataCiteREST._create_session(
+            pool_connections, pool_maxsize, pool_block
+        )
+        self._clients: Dict[str, DataCiteREST] = {}
+        for repository in repositories:
+            quotas = {'concurrency': concurrency, 'rate_limit': rate_limit}
+            if isinstance(repository, RespositoryAuth):
+                auth = repository
+            else:
+                repository = dict(repository)
+                for key in _QUOTAS:
+                    if key in repository:
+                        quotas[key] = repository.pop(key)
+                # every field is required, a repository never falls back to
+                # another's DATACITE_REPOSITORY_* credentials
+                try:
+                    model = RespositoryAuthModel(**repository)
+                except ValueError:
+                    self.close()
+                    raise
+                auth = RespositoryAuth.from_model(model)
+            prefix = auth.prefix.lower()
+            if prefix in self._clients:
+                self.close()
+                raise ValueError(f'prefix {prefix} configured twice')
+            self._clients[prefix] = DataCiteREST(
+                auth=auth, session=self._session, **quotas, **kwargs
+            )
+
+    @classmethod
+    def from_file(cls, path: str, **kwargs) -> 'DataCiteRegistry':
+        """ from a json list of repository dicts """
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f), **kwargs)
+
+    @property
+    def prefixes(self) -> List[str]:
+        return list(self._clients)
+
+    def __iter__(self) -> Iterator[DataCiteREST]:
+        return iter(self._clients.values())
+
+    def client_for(self, doi: str) -> DataCiteREST:
+        """ the client for a doi or bare prefix """
+        prefix = doi.split('/', 1)[0].lower()
+        try:
+            return self._clients[prefix]
+        except KeyError:
+            raise KeyError(f'no repository configured for prefix {prefix}')
+
+    def _payload_doi(self, json_body: Union[Dict, BaseModel]) -> str:
+        if isinstance(json_body, BaseModel):
+            json_body = json_body.dict()
+        attributes = json_body['data']['attributes']
+        return attributes.get('doi') or attributes['prefix']
+
+    def create(
+        self,
+        json_body: Union[Dict, BaseModel, bytes],
+        draft=False,
+        prefix: Optional[str] = None
+    ) -> Dict:
+        """
+        routed by the doi or prefix attribute of json_body, pass prefix
+        for pre-serialized bytes
+        """
+        if prefix is None:
+            prefix = self._payload_doi(json_body)
+        return self.client_for(prefix).create(json_body, draft=draft)
+
+    def retrieve(self, doi: str) -> Dict:
+        return self.client_for(doi).retrieve(doi)
+
+    def update(
+        self,
+        doi: str,
+        json_body: Union[Dict, BaseModel, bytes],
+        partial=True
+    ) -> Dict:
+        return self.client_for(doi).update(doi, json_body, partial)
+
+    def update_diff(
+        self,
+        doi: str,
+        json_body: Union[Dict, BaseModel],
+        current: Optional[Dict] = None,
+        dry_run=False
+    ) -> UpdateResult:
+        return self.client_for(doi).update_diff(
+            doi, json_body, current, dry_run
+        )
+
+    def activities(self, doi: str) -> Dict:
+        return self.client_for(doi).activities(doi)
+
+    def close(self) -> None:
+        for client in self._clients.values():
+            client.close()
+        self._session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
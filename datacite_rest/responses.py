@@ -0,0 +1,215 @@
+"""
+compact, typed views of api responses
+
+records keep a handful of scalar fields in __slots__ and the rest of their
+attributes as compact json bytes, decoded on each access and never kept,
+e.g. looping over .titles does not grow the records it reads. a DOIRecord
+costs a few hundred bytes instead of the kilobytes of the nested dicts it
+was parsed from, so millions of them can be held at once.
+
+    for record in client.iter_records({'client_id': 'abc.xyz'}):
+        print(record.id, record.state, record.titles)
+"""
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional
+import json
+import sys
+
+from .utils import dumps
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    """ share the few distinct states, types and actions between records """
+    return sys.intern(value) if value is not None else None
+
+
+def _compact(attributes: Dict) -> bytes:
+    """ encoded attributes, copied as orjson output is over-allocated """
+    return bytes(memoryview(dumps(attributes)))
+
+
+class Creator(NamedTuple):
+    name: Optional[str]
+    given_name: Optional[str] = None
+    family_name: Optional[str] = None
+    name_type: Optional[str] = None
+
+
+class _LazyAttributes:
+    __slots__ = ('_raw',)
+
+    def __init__(self, raw: bytes):
+        self._raw = raw
+
+    @property
+    def attributes(self) -> Dict[str, Any]:
+        """ every attribute, parsed anew on each access """
+        return json.loads(self._raw)
+
+
+class DOIRecord(_LazyAttributes):
+    """ a single doi, as returned by retrieve() or in a list page """
+    __slots__ = ('id', 'state', 'url', 'created', 'updated')
+
+    def __init__(
+        self,
+        id_: str,
+        state: Optional[str] = None,
+        url: Optional[str] = None,
+        created: Optional[str] = None,
+        updated: Optional[str] = None,
+        raw: bytes = b'{}'
+    ):
+        super().__init__(raw)
+        self.id = id_
+        self.state = _intern(state)
+        self.url = url
+        self.created = created
+        self.updated = updated
+
+    @classmethod
+    def from_json(cls, record: Dict) -> 'DOIRecord':
+        """ from one {'id', 'type', 'attributes'} resource object """
+        attributes = record.get('attributes') or {}
+        return cls(
+            record.get('id') or attributes.get('doi'),
+            state=attributes.get('state'),
+            url=attributes.get('url'),
+            created=attributes.get('created'),
+            updated=attributes.get('updated'),
+            raw=_compact(attributes)
+        )
+
+    @classmethod
+    def from_response(cls, response: Dict) -> 'DOIRecord':
+        """ from a retrieve(), create() or update() response """
+        return cls.from_json(response['data'])
+
+    @property
+    def doi(self) -> str:
+        return self.id
+
+    @property
+    def titles(self) -> List[str]:
+        return [
+            t['title'] for t in self.attributes.get('titles') or []
+            if t.get('title')
+        ]
+
+    @property
+    def creators(self) -> List[Creator]:
+        return [
+            Creator(
+                c.get('name'),
+                c.get('givenName'),
+                c.get('familyName'),
+                c.get('nameType')
+            )
+            for c in self.attributes.get('creators') or []
+        ]
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, DOIRecord):
+            return NotImplemented
+        return (self.id, self._raw) == (other.id, other._raw)
+
+    def __hash__(self) -> int:
+        return hash(self.id)
+
+    def __repr__(self) -> str:
+        return f'DOIRecord({self.id!r}, state={self.state!r})'
+
+
+class Activity(_LazyAttributes):
+    """ one entry of activities(), the changes are parsed lazily """
+    __slots__ = ('id', 'action', 'generated_at')
+
+    def __init__(
+        self,
+        id_: str,
+        action: Optional[str] = None,
+        generated_at: Optional[str] = None,
+        raw: bytes = b'{}'
+    ):
+        super().__init__(raw)
+        self.id = id_
+        self.action = _intern(action)
+        self.generated_at = generated_at
+
+    @classmethod
+    def from_json(cls, activity: Dict) -> 'Activity':
+        attributes = activity.get('attributes') or {}
+        return cls(
+            activity.get('id'),
+            action=attributes.get('action'),
+            generated_at=attributes.get('prov:generatedAtTime'),
+            raw=_compact(attributes)
+        )
+
+    @classmethod
+    def from_response(cls, response: Dict) -> List['Activity']:
+        return [cls.from_json(a) for a in response.get('data') or []]
+
+    @property
+    def changes(self) -> Dict[str, Any]:
+        return self.attributes.get('changes') or {}
+
+    def __repr__(self) -> str:
+        return f'Activity({self.id!r}, action={self.action!r})'
+
+
+class Facets(NamedTuple):
+    """ the total and {facet: {id: count}} from the meta of a list page """
+    total: int
+    counts: Dict[str, Dict[str, int]]
+
+    @classmethod
+    def from_response(cls, response: Dict) -> 'Facets':
+        meta = response.get('meta') or {}
+        counts = {}
+        for name, values in meta.items():
+            # facets are lists of {'id', 'title', 'count'}
+            if isinstance(values, list) and all(
+                isinstance(v, dict) and 'count' in v for v in values
+            ):
+                counts[name] = {v.get('id'): v['count'] for v in values}
+        return cls(meta.get('total') or 0, counts)
+
+
+class ListPage:
+    """ one page of list(), records are DOIRecords """
+    __slots__ = ('records', 'meta', 'links')
+
+    def __init__(
+        self,
+        records: List[DOIRecord],
+        meta: Optional[Dict] = None,
+        links: Optional[Dict] = None
+    ):
+        self.records = records
+        self.meta = meta or {}
+        self.links = links or {}
+
+    @classmethod
+    def from_response(cls, response: Dict) -> 'ListPage':
+        return cls(
+            [DOIRecord.from_json(r) for r in response.get('data') or []],
+            response.get('meta'),
+            response.get('links')
+        )
+
+    @property
+    def total(self) -> Optional[int]:
+        return self.meta.get('total')
+
+    @property
+    def next_url(self) -> Optional[str]:
+        return self.links.get('next')
+
+    def __iter__(self) -> Iterator[DOIRecord]:
+        return iter(self.records)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __repr__(self) -> str:
+        return f'ListPage({len(self.records)} of {self.total})'
@@ -0,0 +1,148 @@
+"""
+datacite schema 4.3 payload models, import through models
+"""
+from typing import Optional, List
+import datetime
+
+from pydantic import BaseModel, HttpUrl, conint, validator
+
+from .models import (
+    BasePrefixModel,
+    DataCiteBaseModel,
+    EventEnum,
+    ResourceTypeGeneralEnum
+)
+from .utils import to_camel
+
+
+class DataCiteIdentifierModel(DataCiteBaseModel):
+    identifier: HttpUrl
+    identifier_type: str
+
+
+class DataCiteTitleModel(DataCiteBaseModel):
+    title: str
+    title_type: Optional[str]
+    lang: Optional[str]
+
+
+class DataCiteNameIdentifierModel(DataCiteBaseModel):
+    name_identifier: Optional[str]
+    name_identifier_scheme: Optional[str]
+    scheme_uri: Optional[HttpUrl]
+
+
+class DataCiteCreatorModel(DataCiteBaseModel):
+    name: Optional[str]
+    name_type: Optional[str]
+    given_name: Optional[str]
+    family_name: Optional[str]
+    affiliation: Optional[str]
+    name_identifiers: Optional[DataCiteNameIdentifierModel]
+
+
+class DataCiteTypeModel(DataCiteBaseModel):
+    resource_type: Optional[str]
+    resource_type_general: ResourceTypeGeneralEnum
+
+
+class DataCiteAttributesBaseModel(DataCiteBaseModel, BasePrefixModel):
+    """
+    this base class can be used for minting "state": "draft" dois.
+    https://support.datacite.org/docs/api-create-dois#create-a-draft-doi
+    """
+    pass
+
+    class Config(DataCiteBaseModel.Config):
+        extra = 'allow'
+
+
+class DataCiteRequiredAttributesModel(DataCiteAttributesBaseModel):
+    """
+    https://support.datacite.org/docs/api-create-dois#create-a-findable-doi
+    https://support.datacite.org/docs/schema-mandatory-properties-v43#
+    https://support.datacite.org/docs/schema-properties-overview-v43
+    """
+    doi: Optional[str]  # on condition that prefix exists
+    identifiers: List[DataCiteIdentifierModel]
+    creators: List[DataCiteCreatorModel]
+    titles: List[DataCiteTitleModel]
+    publisher: str
+    publication_year: conint(ge=2021, le=datetime.datetime.utcnow().year + 1)
+    types: DataCiteTypeModel
+    url: HttpUrl
+
+    @validator('doi', check_fields=False, allow_reuse=True)
+    def doi_should_contain_slash(cls, v, values, **kwargs):
+        if not v and 'prefix' not in values:
+            raise ValueError(
+                f"datacite should contain 'prefix' or 'doi': {values}"
+            )
+        elif v is not None:
+            if '/' not in v or len(v.split('/')) != 2:
+                raise ValueError(f'doi should contain a single "/": {v}')
+            return v.strip()
+
+        return v
+
+    @validator('url', check_fields=False, allow_reuse=True)
+    def url_to_string(cls, v, values, **kwargs):
+        """ cast to str instead of HttpUrl model instance """
+        return str(v)
+
+
+class DataCiteAttributesModel(DataCiteRequiredAttributesModel):
+    """
+    https://support.datacite.org/docs/schema-optional-properties-v43
+    https://support.datacite.org/docs/schema-properties-overview-v43
+    """
+    suffix: Optional[str]
+    event: Optional[EventEnum]
+    # TODO: add more optional properties
+
+
+class DataCiteDraftModel(DataCiteBaseModel):
+    id: Optional[str]
+    type: str
+    attributes: DataCiteAttributesBaseModel
+
+
+class DataCiteModel(DataCiteDraftModel):
+    attributes: DataCiteAttributesModel
+
+
+class JSONPayloadBaseModel(BaseModel):
+
+    class Config:
+        alias_generator = to_camel
+        allow_population_by_field_name = True
+        arbitrary_types_allowed = True
+
+
+class JSONPayloadDraftModel(JSONPayloadBaseModel):
+    """ for minting draft dois """
+    data: DataCiteDraftModel
+
+    class Config:
+        alias_generator = to_camel
+        allow_population_by_field_name = True
+        arbitrary_types_allowed = True
+
+
+class JSONPayloadModel(JSONPayloadDraftModel):
+    """ for passing full models """
+    data: DataCiteModel
+
+
+class Schema43BaseModel(JSONPayloadDraftModel):
+    """
+    https://schema.datacite.org/meta/kernel-4.3/doc/DataCite-MetadataKernel_v4.3.pdf
+    """
+    pass
+
+
+class Schema43Model(JSONPayloadModel):
+    """
+    https://schema.datacite.org/meta/kernel-4.3/doc/DataCite-MetadataKernel_v4.3.pdf
+    """
+    pass
@@ -0,0 +1,79 @@
+"""
+coalescing of concurrent identical calls
+
+while a call for a key is in flight, later callers with the same key wait
+for it and share its result (or exception) instead of making their own.
+nothing is remembered once the call completes, see cache for that.
+"""
+from typing import Any, Awaitable, Callable, Dict, Hashable
+import threading
+
+
+class _Call:
+    __slots__ = ('done', 'value', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class SingleFlight:
+    """ for threads, coalesced counts the calls that were shared """
+    def __init__(self):
+        self.coalesced = 0
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self.coalesced += 1
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value
+        try:
+            call.value = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.value
+
+
+class AsyncSingleFlight:
+    """
+    for asyncio tasks on one event loop, the shared call runs as its own
+    task so a waiter being cancelled does not cancel it for the others
+    """
+    def __init__(self):
+        self.coalesced = 0
+        self._calls: Dict[Hashable, Any] = {}
+
+    async def do(
+        self,
+        key: Hashable,
+        fn: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        import asyncio
+
+        def forget(done):
+            if self._calls.get(key) is done:
+                del self._calls[key]
+
+        task = self._calls.get(key)
+        if task is None:
+            task = self._calls[key] = asyncio.ensure_future(fn())
+            task.add_done_callback(forget)
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
@@ -0,0 +1,149 @@
+"""
+incremental decoding of json:api list responses
+
+a response like {"data": [{...}, {...}], "meta": {...}, "links": {...}} is
+fed to JSONArrayParser in chunks as it arrives from the socket, each item
+of the data array is decoded as soon as it is complete and dropped from the
+buffer, so peak memory is bounded by one record (plus one chunk) instead of
+the whole page. everything outside the array (meta, links) is kept and
+returned as the envelope once the body is exhausted.
+"""
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+import codecs
+import json
+
+_WHITESPACE = ' \t\r\n'
+
+
+class JSONArrayParser:
+    """ push parser yielding the items of one top-level array """
+    def __init__(self, key: str = 'data'):
+        self.key = key
+        self.bytes_received = 0
+        self._decoder = codecs.getincrementaldecoder('utf-8')()
+        self._raw_decode = json.JSONDecoder().raw_decode
+        self._buffer = ''
+        self._pos = 0
+        self._state = 'prefix'  # -> 'array' -> 'suffix'
+        self._prefix = ''
+        self._suffix = []
+        # prefix scanner state
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._last_string = None
+        self._pending_key = None
+
+    def feed(self, chunk: bytes, final: bool = False) -> List[Any]:
+        """ add a chunk, returning any array items it completed """
+        self.bytes_received += len(chunk)
+        self._buffer += self._decoder.decode(chunk, final)
+        items = []
+        if self._state == 'prefix':
+            self._scan_prefix()
+        if self._state == 'array':
+            self._decode_items(items, final)
+        if self._state == 'suffix' and self._buffer:
+            self._suffix.append(self._buffer)
+            self._buffer = ''
+        return items
+
+    def close(self) -> Dict:
+        """ flush and return the envelope, the body minus the array items """
+        if self._state == 'array':
+            raise ValueError(f'truncated json, {self.key} array not closed')
+        if self._state == 'prefix':
+            # key never seen, e.g. an error or detail body
+            return json.loads(self._buffer) if self._buffer.strip() else {}
+        return json.loads(f"{self._prefix}]{''.join(self._suffix)}")
+
+    def _scan_prefix(self) -> None:
+        """ walk the object until "<key>": [ at depth 1 """
+        buffer = self._buffer
+        for i in range(self._pos, len(buffer)):
+            c = buffer[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == '\\':
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    self._last_string = buffer[self._string_start + 1:i]
+                continue
+            if self._depth == 1:
+                if c == '[' and self._pending_key == self.key:
+                    self._state = 'array'
+                    self._prefix = buffer[:i + 1]
+                    self._buffer = buffer[i + 1:]
+                    self._pos = 0
+                    return
+                if c == ':':
+                    self._pending_key = self._last_string
+                elif c not in _WHITESPACE:
+                    self._pending_key = None
+            if c == '"':
+                self._in_string = True
+                self._string_start = i
+            elif c in '{[':
+                self._depth += 1
+            elif c in '}]':
+                self._depth -= 1
+        self._pos = len(buffer)
+
+    def _decode_items(self, items: List[Any], final: bool) -> None:
+        buffer = self._buffer
+        pos = 0
+        end = len(buffer)
+        while True:
+            while pos < end and (buffer[pos] in _WHITESPACE or
+                                 buffer[pos] == ','):
+                pos += 1
+            if pos >= end:
+                break
+            if buffer[pos] == ']':
+                self._state = 'suffix'
+                pos += 1
+                break
+            try:
+                item, item_end = self._raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if final:
+                    raise
+                break  # incomplete item, wait for more data
+            if item_end == end and not final and (
+                not isinstance(item, (dict, list))
+            ):
+                break  # a scalar may continue in the next chunk
+            items.append(item)
+            pos = item_end
+        self._buffer = buffer[pos:]
+
+
+class JSONArrayStream:
+    """
+    iterate the items of a streamed response, envelope (meta, links) is
+    available once iteration finishes
+    """
+    envelope = None
+
+    def __init__(
+        self,
+        chunks: Iterable[bytes],
+        key: str = 'data',
+        close: Optional[Callable[[], None]] = None
+    ):
+        self._chunks = chunks
+        self._close = close
+        self.parser = JSONArrayParser(key)
+
+    def __iter__(self) -> Iterator[Any]:
+        try:
+            for chunk in self._chunks:
+                yield from self.parser.feed(chunk)
+            yield from self.parser.feed(b'', final=True)
+            self.envelope = self.parser.close()
+        finally:
+            if self._close is not None:
+                self._close()
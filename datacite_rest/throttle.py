@@ -0,0 +1,172 @@
+from typing import Optional, Iterable
+from email.utils import parsedate_to_datetime
+import datetime
+import random
+import threading
+import time
+
+
+class RateLimiter:
+    """
+    token bucket shared across threads and asyncio tasks
+
+    rate is sustained requests per second, burst the bucket size. callers
+    reserve a token under a lock and then sleep outside it, so waiting
+    never blocks other threads or the event loop.
+    """
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        assert rate > 0, rate
+        self.rate = float(rate)
+        self.burst = float(burst if burst is not None else max(1, rate))
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """ take a token, returning how long to wait before using it """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.burst,
+                self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def acquire(self) -> float:
+        wait = self._reserve()
+        if wait:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self) -> float:
+        import asyncio  # only loaded by async users
+        wait = self._reserve()
+        if wait:
+            await asyncio.sleep(wait)
+        return wait
+
+
+class RetryStats:
+    """ thread-safe counters for tuning throughput against the limits """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.retries = 0
+        self.retry_wait = 0.0
+        self.throttle_wait = 0.0
+
+    def record_retry(self, delay: float) -> None:
+        with self._lock:
+            self.retries += 1
+            self.retry_wait += delay
+
+    def record_throttle(self, wait: float) -> None:
+        if wait:
+            with self._lock:
+                self.throttle_wait += wait
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                'retries': self.retries,
+                'retry_wait': self.retry_wait,
+                'throttle_wait': self.throttle_wait
+            }
+
+
+class RetryPolicy:
+    """
+    jittered exponential backoff honouring Retry-After
+
+    429 means the request was rejected unprocessed, so it is retried for
+    any method. 5xx responses are only retried for idempotent methods.
+    """
+    idempotent_methods = frozenset(['GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'])
+    server_error_statuses = frozenset([500, 502, 503, 504])
+
+    def __init__(
+        self,
+        max_retries: int = 3,
+        backoff_factor: float = 0.5,
+        backoff_max: float = 30.0,
+        methods: Optional[Iterable[str]] = None
+    ):
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.backoff_max = backoff_max
+        if methods is not None:
+            self.idempotent_methods = frozenset(m.upper() for m in methods)
+
+    def should_retry(
+        self,
+        method: str,
+        status_code: Optional[int],
+        attempt: int
+    ) -> bool:
+        if attempt >= self.max_retries or status_code is None:
+            return False
+        if status_code == 429:
+            return True
+        return (
+            status_code in self.server_error_statuses
+            and method.upper() in self.idempotent_methods
+        )
+
+    def _parse_retry_after(self, value: Optional[str]) -> Optional[float]:
+        """ Retry-After is either delta-seconds or an http date """
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            when = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        now = datetime.datetime.now(datetime.timezone.utc)
+        return max(0.0, (when - now).total_seconds())
+
+    def delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        server_delay = self._parse_retry_after(retry_after)
+        if server_delay is not None:
+            return min(server_delay, self.backoff_max)
+        # full jitter, https://aws.amazon.com/blogs/architecture/
+        # exponential-backoff-and-jitter/
+        cap = min(self.backoff_max, self.backoff_factor * (2 ** attempt))
+        return random.uniform(0, cap)
+
+
+class HedgePolicy:
+    """
+    when to send a second copy of a slow idempotent GET
+
+    after delay seconds when set, otherwise once the request has taken
+    longer than the quantile of its endpoint's latency so far, as seen by
+    the MetricsCollector in the client's hooks. nothing is hedged until
+    that endpoint has a latency history. min_delay keeps fast endpoints
+    from hedging everything.
+    """
+    def __init__(
+        self,
+        quantile: float = 0.95,
+        delay: Optional[float] = None,
+        min_delay: float = 0.05
+    ):
+        self.quantile = quantile
+        self.delay = delay
+        self.min_delay = min_delay
+
+    def hedge_delay(self, endpoint: str, metrics=None) -> Optional[float]:
+        """ seconds to wait before hedging, None to not hedge """
+        if self.delay is not None:
+            return self.delay
+        if metrics is None:
+            return None
+        latency = metrics.latency_quantile(endpoint, self.quantile)
+        if latency is None or latency == float('inf'):
+            return None
+        return max(latency, self.min_delay)
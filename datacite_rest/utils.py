@@ -1,6 +1,16 @@
+from functools import lru_cache
+from typing import Any
+import json
+
 from humps import camelize
 
+try:
+    import orjson
+except ImportError:  # optional, falls back to the stdlib encoder
+    orjson = None
+
 
+@lru_cache(maxsize=None)
 def to_camel(value: str) -> str:
     """
     abstracts pyhumps camelize()
@@ -19,3 +29,19 @@ def to_kebab(value: str) -> str:
         return value.replace('_', '-')
     except Exception as e:
         raise Exception(e)
+
+
+def _default(value: Any) -> str:
+    """ dates, urls and decimals are sent as strings """
+    return str(value)
+
+
+def dumps(value: Any) -> bytes:
+    """ compact json encoding, uses orjson when installed """
+    if orjson is not None:
+        return orjson.dumps(value, default=_default)
+    return json.dumps(
+        value,
+        separators=(',', ':'),
+        default=_default
+    ).encode('utf-8')
@@ -0,0 +1,200 @@
+"""
+offline validation of payload files against the schema 4.3 models
+
+records are streamed from .json, .ndjson and .jsonl files (optionally
+gzipped, e.g. the output of export) in batches to a process pool, with a
+bounded number of batches in flight so memory does not grow with the
+input. export records ({'id', 'type', 'attributes'}) are validated as the
+payload {'data': record}.
+
+    run = ValidationRun(['./deposit'], draft=False)
+    for error in run:
+        print(error)
+    print(run.summary)
+"""
+from typing import (
+    Any,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple
+)
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import gzip
+import json
+import os
+import time
+
+_EXTENSIONS = ('.json', '.ndjson', '.jsonl')
+
+
+class RecordError(NamedTuple):
+    source: str
+    record: int  # 1 based line of ndjson, position in a json list
+    path: str  # json path, e.g. $.data.attributes.titles[0].title
+    message: str
+
+
+class ValidationSummary(NamedTuple):
+    records: int
+    invalid: int
+    elapsed: float
+    records_per_second: float
+
+
+def json_path(loc: Iterable) -> str:
+    """ pydantic error loc to a json path """
+    path = '$'
+    for part in loc:
+        path += f'[{part}]' if isinstance(part, int) else f'.{part}'
+    return path
+
+
+def _without_gz(path: str) -> str:
+    return path[:-3] if path.endswith('.gz') else path
+
+
+def _open(path: str):
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8')
+    return open(path, 'r', encoding='utf-8')
+
+
+def find_files(paths: Iterable[str]) -> Iterator[str]:
+    """ files as given, directories walked for json and ndjson files """
+    for path in paths:
+        if not os.path.isdir(path):
+            yield path
+            continue
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for name in sorted(files):
+                if _without_gz(name).endswith(_EXTENSIONS):
+                    yield os.path.join(root, name)
+
+
+def iter_raw_records(paths: Iterable[str]) -> Iterator[Tuple[str, int, Any]]:
+    """
+    (source, record, body), ndjson lines are left undecoded for the
+    workers, a .json file is decoded here (so is held whole)
+    """
+    for path in find_files(paths):
+        with _open(path) as f:
+            if _without_gz(path).endswith('.json'):
+                body = json.load(f)
+                records = body if isinstance(body, list) else [body]
+                for i, record in enumerate(records, 1):
+                    yield path, i, record
+                continue
+            for i, line in enumerate(f, 1):
+                if line.strip():
+                    yield path, i, line
+
+
+def validate_batch(
+    batch: List[Tuple[str, int, Any]],
+    draft: bool
+) -> List[RecordError]:
+    """ runs in the worker processes """
+    from pydantic import ValidationError
+    from .models import Schema43BaseModel, Schema43Model
+    model = Schema43BaseModel if draft else Schema43Model
+    errors = []
+    for source, record, body in batch:
+        if isinstance(body, str):
+            try:
+                body = json.loads(body)
+            except ValueError as e:
+                errors.append(
+                    RecordError(source, record, '$', f'invalid json: {e}')
+                )
+                continue
+        if isinstance(body, dict) and 'data' not in body and (
+            'attributes' in body
+        ):
+            body = {'data': body}
+        try:
+            model(**body)
+        except ValidationError as e:
+            errors.extend(
+                RecordError(source, record, json_path(err['loc']), err['msg'])
+                for err in e.errors()
+            )
+        except Exception as e:
+            # e.g. a list where an object was expected
+            errors.append(RecordError(source, record, '$', str(e)))
+    return errors
+
+
+class ValidationRun:
+    """
+    validate every record under paths, iterate for RecordErrors (in input
+    order), summary is set once iteration completes
+
+    max_workers defaults to every core, 0 validates in this process.
+    """
+    summary: Optional[ValidationSummary] = None
+
+    def __init__(
+        self,
+        paths: Iterable[str],
+        draft: bool = False,
+        max_workers: Optional[int] = None,
+        batch_size: int = 1000
+    ):
+        self.paths = list(paths)
+        self.draft = draft
+        self.max_workers = (
+            os.cpu_count() or 1 if max_workers is None else max_workers
+        )
+        self.batch_size = batch_size
+
+    def _batches(self) -> Iterator[List[Tuple[str, int, Any]]]:
+        batch = []
+        for item in iter_raw_records(self.paths):
+            batch.append(item)
+            if len(batch) >= self.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def __iter__(self) -> Iterator[RecordError]:
+        start = time.perf_counter()
+        records = 0
+        invalid = 0
+        for batch_size, errors in self._results():
+            records += batch_size
+            invalid += len({(e.source, e.record) for e in errors})
+            yield from errors
+        elapsed = time.perf_counter() - start
+        self.summary = ValidationSummary(
+            records=records,
+            invalid=invalid,
+            elapsed=elapsed,
+            records_per_second=records / elapsed if elapsed else 0.0
+        )
+
+    def _results(self) -> Iterator[Tuple[int, List[RecordError]]]:
+        if not self.max_workers:
+            for batch in self._batches():
+                yield len(batch), validate_batch(batch, self.draft)
+            return
+        pending: deque = deque()
+        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            for batch in self._batches():
+                # bound the batches held in memory
+                if len(pending) >= self.max_workers * 2:
+                    yield self._pop(pending)
+                pending.append((len(batch), executor.submit(
+                    validate_batch, batch, self.draft
+                )))
+            while pending:
+                yield self._pop(pending)
+
+    def _pop(self, pending: deque) -> Tuple[int, List[RecordError]]:
+        size, future = pending.popleft()
+        return size, future.result()
@@ -0,0 +1,243 @@
+"""
+change feed over doi activities
+
+each poll lists only the dois updated since a persisted high-water mark,
+fetches their activities in parallel and hands on the ones not delivered
+before, so a poll costs the change rate rather than the repository size.
+
+    watcher = ActivityWatcher(client, 'watch.sqlite', {'client_id': 'a.b'})
+    watcher.run(lambda change: print(change.doi, change.activity.action))
+
+or, from asyncio
+
+    async for change in watcher.changes():
+        ...
+"""
+from typing import (
+    AsyncIterator,
+    Callable,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple
+)
+from concurrent.futures import ThreadPoolExecutor
+import datetime
+import json
+import logging
+import sqlite3
+import threading
+
+from .mirror import (
+    format_timestamp,
+    parse_timestamp,
+    updated_since_query
+)
+from .responses import Activity
+
+log = logging.getLogger(__name__)
+
+_SCHEMA = [
+    'CREATE TABLE IF NOT EXISTS watch_state ('
+    'key TEXT PRIMARY KEY, value TEXT)',
+    # the newest activity delivered per doi, and the ids at that time
+    'CREATE TABLE IF NOT EXISTS activity_marks ('
+    'doi TEXT PRIMARY KEY, generated_at TEXT NOT NULL, ids TEXT NOT NULL)',
+    'CREATE INDEX IF NOT EXISTS activity_marks_generated_at '
+    'ON activity_marks(generated_at)'
+]
+_parse = parse_timestamp
+_format = format_timestamp
+
+
+class Change(NamedTuple):
+    doi: str
+    activity: Activity
+
+
+class ActivityWatcher:
+    """
+    poll for new activities across the dois matching params
+
+    the first poll starts from the newest doi (or since), older history is
+    not delivered. overlap re-queries that many seconds before the mark to
+    allow for search index lag, activities already delivered are never
+    delivered again. marks are only saved once a poll's changes have been
+    handed on, so a crash redelivers rather than drops them.
+    """
+    def __init__(
+        self,
+        client,
+        path: str,
+        params: Optional[Dict] = None,
+        interval: float = 5.0,
+        overlap: float = 30.0,
+        page_size: int = 1000,
+        max_workers: int = 8,
+        since: Optional[str] = None
+    ):
+        self.client = client
+        self.path = path
+        self.params = dict(params or {})
+        self.interval = interval
+        self.overlap = datetime.timedelta(seconds=overlap)
+        self.page_size = page_size
+        self.max_workers = max_workers
+        self.since = since
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            for statement in _SCHEMA:
+                self._conn.execute(statement)
+
+    def close(self) -> None:
+        """ stop run() or changes() after the current poll """
+        self._stop.set()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+        self._conn.close()
+
+    @property
+    def high_water_mark(self) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM watch_state WHERE key = 'updated'"
+            ).fetchone()
+        return row[0] if row else None
+
+    def _newest(self) -> Optional[str]:
+        """ where a first poll starts, by the server's clock """
+        page = self.client.list('dois', {
+            **self.params, 'sort': '-updated', 'page[size]': 1
+        })
+        records = page.get('data') or []
+        return records[0]['attributes'].get('updated') if records else None
+
+    def _marks(self, dois: List[str]) -> Dict[str, Tuple[str, List[str]]]:
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT doi, generated_at, ids FROM activity_marks "
+                f"WHERE doi IN ({', '.join('?' * len(dois))})",
+                dois
+            ).fetchall()
+        return {doi: (at, json.loads(ids)) for doi, at, ids in rows}
+
+    def _collect(self) -> Tuple[List[Change], Callable[[], None]]:
+        """ the new changes, oldest first, and a commit for their marks """
+        mark = self.high_water_mark or self.since or self._newest()
+        if mark is None:
+            # nothing matches yet
+            return [], lambda: None
+        start = _parse(mark) - self.overlap
+        params = dict(self.params)
+        since = updated_since_query(_format(start))
+        query = params.get('query')
+        params['query'] = f'({query}) AND {since}' if query else since
+
+        updated = {}
+        for page in self.client.iter_pages('dois', params, self.page_size):
+            for record in page.get('data') or []:
+                updated[record['id'].lower()] = (
+                    record.get('attributes') or {}
+                ).get('updated')
+        if not updated:
+            return [], lambda: None
+        newest = max(filter(None, updated.values()), key=_parse, default=mark)
+        if _parse(newest) < _parse(mark):
+            newest = mark
+
+        dois = list(updated)
+        marks = self._marks(dois)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            responses = executor.map(self.client.activities, dois)
+            changes = []
+            new_marks = {}
+            for doi, response in zip(dois, responses):
+                since_at, seen = marks.get(doi, (_format(start), []))
+                threshold = _parse(since_at)
+                fresh = [
+                    a for a in Activity.from_response(response)
+                    if a.generated_at and a.id not in seen
+                    and _parse(a.generated_at) >= threshold
+                ]
+                if not fresh:
+                    continue
+                fresh.sort(key=lambda a: _parse(a.generated_at))
+                changes.extend(Change(doi, a) for a in fresh)
+                latest = fresh[-1].generated_at
+                ids = [
+                    a.id for a in fresh
+                    if _parse(a.generated_at) == _parse(latest)
+                ]
+                if _parse(latest) == threshold:
+                    ids = seen + ids
+                new_marks[doi] = (latest, ids)
+        changes.sort(key=lambda c: _parse(c.activity.generated_at))
+
+        def commit() -> None:
+            prune = _format(_parse(newest) - self.overlap)
+            with self._lock, self._conn:
+                self._conn.executemany(
+                    'INSERT OR REPLACE INTO activity_marks VALUES (?, ?, ?)',
+                    (
+                        (doi, _format(_parse(at)), json.dumps(ids))
+                        for doi, (at, ids) in new_marks.items()
+                    )
+                )
+                # older marks are below any future query, keep the table
+                # the size of the overlap window
+                self._conn.execute(
+                    'DELETE FROM activity_marks WHERE generated_at < ?',
+                    (prune,)
+                )
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO watch_state VALUES ('updated', ?)",
+                    (newest,)
+                )
+        return changes, commit
+
+    def poll(
+        self,
+        callback: Optional[Callable[[Change], None]] = None
+    ) -> List[Change]:
+        """
+        one round, the changes are passed to callback in the order they
+        happened and the marks saved only once it has taken them all
+        """
+        changes, commit = self._collect()
+        if callback is not None:
+            for change in changes:
+                callback(change)
+        commit()
+        return changes
+
+    def run(self, callback: Callable[[Change], None]) -> None:
+        """ poll every interval until close(), errors are logged """
+        while not self._stop.is_set():
+            try:
+                self.poll(callback)
+            except Exception as e:
+                log.warning(f'{self}.run - {e}')
+            self._stop.wait(self.interval)
+
+    async def changes(self) -> AsyncIterator[Change]:
+        """
+        run() as an async iterator, polls run on the default executor and a
+        poll's marks are saved once all of its changes have been consumed
+        """
+        import asyncio
+
+        loop = asyncio.get_event_loop()
+        while not self._stop.is_set():
+            changes, commit = await loop.run_in_executor(None, self._collect)
+            for change in changes:
+                yield change
+            await loop.run_in_executor(None, commit)
+            await asyncio.sleep(self.interval)
@@ -11,6 +11,11 @@ install_requires = [
     'requests>=2.25.1,<2.26'
 ]
 
+extras_require = {
+    'async': ['aiohttp>=3.7,<4'],
+    'fast': ['orjson>=3'],
+}
+
 tests_require = install_requires + ['pytest']
 
 setuptools.setup(
@@ -27,12 +32,16 @@ setuptools.setup(
         'Bug Tracker': 'https://github.com/pypa/sampleproject/issues',
     },
     install_requires=install_requires,
+    extras_require=extras_require,
     tests_require=tests_require,
     classifiers=[
         'Programming Language :: Python :: 3',
         'License :: OSI Approved :: MIT License',
         'Operating System :: OS Independent',
     ],
-    packages=setuptools.find_packages(),
-    python_requires='>=3.6',
+    packages=setuptools.find_packages(exclude=['benchmarks']),
+    entry_points={
+        'console_scripts': ['datacite-rest=datacite_rest.cli:main'],
+    },
+    python_requires='>=3.7',
 )
@@ -0,0 +1,182 @@
+from unittest import TestCase
+import asyncio
+import copy
+import json
+
+from datacite_rest import AsyncDataCiteREST
+from datacite_rest.hooks import MetricsCollector
+from datacite_rest.throttle import HedgePolicy
+
+from .constants import VALID_AUTH_FMT, VALID_DRAFT_FMT
+
+
+class _FakeResponse:
+    status = 200
+
+    def __init__(self, json_body: dict):
+        self._json_body = json_body
+        self.headers = {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        pass
+
+    def raise_for_status(self):
+        pass
+
+    async def read(self):
+        return json.dumps(self._json_body).encode()
+
+
+class _FakeSession:
+    """ records calls and tracks peak concurrency """
+    def __init__(self, delay: float = 0):
+        self.calls = []
+        self.in_flight = 0
+        self.peak = 0
+        self._delay = delay
+
+    def request(self, **kwargs):
+        self.calls.append(kwargs)
+        session = self
+
+        class _Ctx(_FakeResponse):
+            async def __aenter__(self):
+                session.in_flight += 1
+                session.peak = max(session.peak, session.in_flight)
+                await asyncio.sleep(session._delay)
+                session.in_flight -= 1
+                return self
+        return _Ctx({'data': {'id': kwargs['url'].rsplit('/', 1)[-1]}})
+
+
+class TestAsyncDataCiteREST(TestCase):
+    def _get_obj(self, **kwargs) -> AsyncDataCiteREST:
+        args = copy.deepcopy(VALID_AUTH_FMT)
+        args['id_'] = args.pop('id')
+        return AsyncDataCiteREST(**args, **kwargs)
+
+    def test_retrieve(self):
+        session = _FakeSession()
+        x = self._get_obj(session=session)
+        res = asyncio.run(x.retrieve('10.5438/abc'))
+        self.assertEqual(res['data']['id'], 'abc')
+        self.assertEqual(session.calls[0]['method'], 'GET')
+        self.assertIn('Authorization', session.calls[0]['headers'])
+
+    def test_create_validates(self):
+        x = self._get_obj(session=_FakeSession())
+        json_body = copy.deepcopy(VALID_DRAFT_FMT)
+        with self.assertRaises(Exception):
+            asyncio.run(x.create(json_body=json_body))
+        asyncio.run(x.create(json_body=json_body, draft=True))
+
+    def test_list_params_kebab_case(self):
+        session = _FakeSession()
+        x = self._get_obj(session=session)
+        asyncio.run(x.list('dois', {'client_id': 'abc'}))
+        self.assertEqual(session.calls[0]['params'], {'client-id': 'abc'})
+        self.assertTrue(session.calls[0]['url'].endswith('/dois/'))
+
+    def test_count_requests_an_empty_page(self):
+        session = _FakeSession()
+        x = self._get_obj(session=session)
+        total = asyncio.run(
+            x.count('dois', {'client_id': 'abc', 'disable_facets': 'true'})
+        )
+        self.assertEqual(total, 0)
+        self.assertEqual(
+            session.calls[0]['params'], {'client-id': 'abc', 'page[size]': 0}
+        )
+
+    def test_concurrency_is_bounded(self):
+        session = _FakeSession(delay=0.01)
+        x = self._get_obj(session=session, concurrency=3)
+
+        async def run():
+            await asyncio.gather(
+                *(x.retrieve(f'10.5438/{i}') for i in range(20))
+            )
+        asyncio.run(run())
+        self.assertEqual(len(session.calls), 20)
+        self.assertEqual(session.peak, 3)
+
+    def test_update_diff(self):
+        session = _FakeSession()
+        x = self._get_obj(session=session)
+        json_body = copy.deepcopy(VALID_DRAFT_FMT)
+        current = copy.deepcopy(json_body['data']['attributes'])
+        res = asyncio.run(x.update_diff('10.5438/abc', json_body, current))
+        self.assertEqual(res.status, 'unchanged')
+        self.assertEqual(session.calls, [])
+
+        current['url'] = 'https://example.org/old'
+        json_body['data']['attributes']['url'] = 'https://example.org/new'
+        res = asyncio.run(x.update_diff('10.5438/abc', json_body, current))
+        self.assertEqual(res.status, 'changed')
+        self.assertEqual(session.calls[0]['method'], 'PUT')
+        self.assertEqual(
+            json.loads(session.calls[0]['data']),
+            {'data': {'type': 'dois', 'attributes': {
+                'url': 'https://example.org/new'
+            }}}
+        )
+
+    def test_coalesce(self):
+        session = _FakeSession(delay=0.01)
+        x = self._get_obj(session=session, coalesce=True)
+
+        async def run():
+            return await asyncio.gather(
+                *(x.retrieve('10.5438/abc') for _ in range(10)),
+                x.list('dois', {'query': 'a'}),
+                x.list('dois', {'query': 'a'})
+            )
+        asyncio.run(run())
+        self.assertEqual(len(session.calls), 2)
+        self.assertEqual(x.coalesced, 10)
+
+    def test_timeouts(self):
+        session = _FakeSession()
+        x = self._get_obj(session=session)
+        asyncio.run(x.retrieve('10.5438/abc'))
+        asyncio.run(x.retrieve('10.5438/abc', timeout=2, deadline=5))
+        default, call = [c['timeout'] for c in session.calls]
+        self.assertEqual((default.sock_connect, default.sock_read), (10, 60))
+        self.assertIsNone(default.total)
+        self.assertEqual((call.sock_connect, call.sock_read), (2, 2))
+        self.assertLessEqual(call.total, 5)
+
+    def test_hedge_cancels_the_loser(self):
+        metrics = MetricsCollector()
+        session = _FakeSession()
+        x = self._get_obj(
+            session=session, hooks=[metrics], hedge=HedgePolicy(delay=0.05)
+        )
+        send = x._send
+        cancelled = []
+
+        async def slow_first(*args, **kwargs):
+            if not cancelled:
+                cancelled.append(False)
+                try:
+                    await asyncio.sleep(1)
+                except asyncio.CancelledError:
+                    cancelled[0] = True
+                    raise
+            return await send(*args, **kwargs)
+
+        async def run():
+            res = await x.retrieve('10.5438/abc')
+            await asyncio.sleep(0)
+            return res
+
+        x._send = slow_first
+        self.assertEqual(asyncio.run(run())['data']['id'], 'abc')
+        self.assertEqual(cancelled, [True])
+        self.assertEqual(
+            [c[0] for c in metrics.snapshot()['counters']],
+            ['hedge_wins', 'hedged_requests']
+        )
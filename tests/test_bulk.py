@@ -0,0 +1,68 @@
+from unittest import TestCase
+import threading
+import time
+
+from datacite_rest.bulk import BulkRun
+
+
+class TestBulkRun(TestCase):
+    def _prepare(self, item):
+        if item < 0:
+            raise ValueError('negative')
+        return item
+
+    def _send(self, item):
+        if item == 13:
+            raise Exception('unlucky')
+        time.sleep(0.001 * (item % 3))
+        return {'data': {'id': item}}
+
+    def test_ordered_results(self):
+        run = BulkRun(range(50), self._prepare, self._send, max_workers=4)
+        results = list(run)
+        self.assertEqual([r.index for r in results], list(range(50)))
+        self.assertEqual(run.summary.total, 50)
+        self.assertEqual(run.summary.succeeded, 49)
+        self.assertEqual(run.summary.errors, {'request': 1})
+        self.assertFalse(results[13].ok)
+        self.assertEqual(results[13].error.message, 'unlucky')
+
+    def test_validation_errors_do_not_abort(self):
+        items = [1, -1, 2, -2, 3]
+        run = BulkRun(items, self._prepare, self._send, max_workers=2)
+        results = list(run)
+        self.assertEqual([r.ok for r in results], [1, 0, 1, 0, 1])
+        self.assertEqual(results[1].error.kind, 'validation')
+        self.assertEqual(run.summary.errors, {'validation': 2})
+
+    def test_unordered_results(self):
+        run = BulkRun(
+            range(30), self._prepare, self._send, max_workers=4, ordered=False
+        )
+        results = list(run)
+        self.assertEqual(sorted(r.index for r in results), list(range(30)))
+        self.assertEqual(run.summary.failed, 1)
+
+    def test_in_flight_is_bounded(self):
+        lock = threading.Lock()
+        state = {'in_flight': 0, 'peak': 0}
+
+        def send(item):
+            with lock:
+                state['in_flight'] += 1
+                state['peak'] = max(state['peak'], state['in_flight'])
+            time.sleep(0.002)
+            with lock:
+                state['in_flight'] -= 1
+            return {}
+
+        run = BulkRun(range(40), self._prepare, send, max_workers=3)
+        list(run)
+        self.assertLessEqual(state['peak'], 3)
+
+    def test_keys(self):
+        items = [('10.5438/a', 1), ('10.5438/b', 2)]
+        run = BulkRun(
+            items, lambda x: x[1], self._send, key=lambda x: x[0]
+        )
+        self.assertEqual([r.key for r in run], ['10.5438/a', '10.5438/b'])
@@ -0,0 +1,61 @@
+from unittest import TestCase
+import os
+import tempfile
+import time
+
+from datacite_rest.cache import MemoryCache, DiskCache
+
+
+class _CacheTestMixin:
+    def _get_obj(self, **kwargs):
+        raise NotImplementedError
+
+    def test_set_get_delete(self):
+        x = self._get_obj()
+        x.set('a', x.entry({'data': 1}, etag='"v1"'))
+        entry = x.get('a')
+        self.assertEqual(entry.value, {'data': 1})
+        self.assertEqual(entry.etag, '"v1"')
+        self.assertTrue(entry.fresh)
+        x.delete('a')
+        self.assertIsNone(x.get('a'))
+
+    def test_ttl(self):
+        x = self._get_obj(ttl=0)
+        x.set('a', x.entry({'data': 1}))
+        time.sleep(0.001)
+        self.assertFalse(x.get('a').fresh)
+
+    def test_lru_eviction(self):
+        x = self._get_obj(maxsize=2)
+        x.set('a', x.entry({}))
+        x.set('b', x.entry({}))
+        time.sleep(0.001)
+        x.get('a')  # b is now least recently used
+        x.set('c', x.entry({}))
+        self.assertIsNone(x.get('b'))
+        self.assertIsNotNone(x.get('a'))
+        self.assertEqual(x.stats.evictions, 1)
+        self.assertEqual(len(x), 2)
+
+
+class TestMemoryCache(_CacheTestMixin, TestCase):
+    def _get_obj(self, **kwargs):
+        return MemoryCache(**kwargs)
+
+
+class TestDiskCache(_CacheTestMixin, TestCase):
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self._dir.cleanup()
+
+    def _get_obj(self, **kwargs):
+        return DiskCache(os.path.join(self._dir.name, 'cache.db'), **kwargs)
+
+    def test_persists(self):
+        x = self._get_obj()
+        x.set('a', x.entry({'data': 1}))
+        x.close()
+        self.assertEqual(self._get_obj().get('a').value, {'data': 1})
@@ -0,0 +1,181 @@
+from unittest import TestCase
+import copy
+
+from datacite_rest.diff import UpdateStatus, attribute_changes
+from datacite_rest.exceptions import InvalidTransitionError
+
+from .constants import VALID_DOI_FMT, VALID_DRAFT_FMT
+from .test_mock_server import MockServerTestCase
+
+
+class TestAttributeChanges(TestCase):
+    def test_changes(self):
+        current = {'url': 'a', 'titles': [{'title': 'x'}], 'state': 'draft'}
+        self.assertEqual(attribute_changes({'url': 'a'}, current), {})
+        self.assertEqual(
+            attribute_changes({'titles': [{'title': 'y'}]}, current),
+            {'titles': [{'title': 'y'}]}
+        )
+        self.assertEqual(
+            attribute_changes({'publisher': 'p'}, current), {'publisher': 'p'}
+        )
+
+    def test_enriched_current(self):
+        desired = {
+            'doi': '10.5438/ABC',
+            'types': {'resourceTypeGeneral': 'Dataset'},
+            'creators': [{'name': 'Doe, Jane', 'affiliation': []}],
+        }
+        current = {
+            'doi': '10.5438/abc',
+            'types': {
+                'resourceTypeGeneral': 'Dataset',
+                'ris': 'DATA',
+                'bibtex': 'misc',
+                'citeproc': 'dataset',
+                'schemaOrg': 'Dataset'
+            },
+            'creators': [{'name': 'Doe, Jane', 'nameIdentifiers': []}],
+        }
+        self.assertEqual(attribute_changes(desired, current), {})
+        desired['types']['resourceTypeGeneral'] = 'Software'
+        desired['creators'].append({'name': 'Roe, Richard'})
+        self.assertEqual(
+            set(attribute_changes(desired, current)), {'types', 'creators'}
+        )
+
+    def test_event_against_state(self):
+        self.assertEqual(
+            attribute_changes({'event': 'publish'}, {'state': 'findable'}), {}
+        )
+        self.assertEqual(
+            attribute_changes({'event': 'hide'}, {'state': 'findable'}),
+            {'event': 'hide'}
+        )
+
+    def test_invalid_transition(self):
+        with self.assertRaises(InvalidTransitionError):
+            attribute_changes({'event': 'hide'}, {'state': 'draft'})
+        with self.assertRaises(InvalidTransitionError):
+            attribute_changes({'event': 'register'}, {'state': 'findable'})
+        with self.assertRaisesRegex(InvalidTransitionError, '^10.5438/a:'):
+            attribute_changes(
+                {'event': 'hide'}, {'state': 'draft'}, '10.5438/a'
+            )
+        # unknown state is left to the api
+        self.assertEqual(
+            attribute_changes({'event': 'register'}, {}),
+            {'event': 'register'}
+        )
+
+
+class TestUpdateDiff(MockServerTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = self._get_client()
+        self.json_body = copy.deepcopy(VALID_DRAFT_FMT)
+        self.json_body['data']['attributes']['url'] = 'https://example.org/a'
+        res = self.client.create(copy.deepcopy(self.json_body), draft=True)
+        self.doi = res['data']['id']
+
+    def test_snake_case_payload_unchanged(self):
+        json_body = copy.deepcopy(VALID_DOI_FMT)
+        doi = self.client.create(copy.deepcopy(json_body))['data']['id']
+        requests = self.server.requests
+        result = self.client.update_diff(doi, json_body)
+        self.assertEqual(result.status, UpdateStatus.unchanged)
+        self.assertEqual(result.changes, {})
+        # only the retrieve
+        self.assertEqual(self.server.requests, requests + 1)
+
+    def test_unchanged_sends_nothing(self):
+        requests = self.server.requests
+        result = self.client.update_diff(
+            self.doi, self.json_body, current=self.client.retrieve(self.doi)
+        )
+        self.assertEqual(result.status, UpdateStatus.unchanged)
+        self.assertEqual(result.changes, {})
+        self.assertIsNone(result.response)
+        # only the retrieve
+        self.assertEqual(self.server.requests, requests + 1)
+
+    def test_changed_sends_only_changes(self):
+        self.json_body['data']['attributes']['url'] = 'https://example.org/b'
+        result = self.client.update_diff(self.doi, self.json_body)
+        self.assertEqual(result.status, UpdateStatus.changed)
+        self.assertEqual(result.changes, {'url': 'https://example.org/b'})
+        activity = self.server.store.activities[self.doi][-1]
+        self.assertEqual(
+            activity['attributes']['changes'],
+            {'url': 'https://example.org/b'}
+        )
+        self.assertEqual(
+            result.response['data']['attributes']['url'],
+            'https://example.org/b'
+        )
+
+    def test_dry_run_skips(self):
+        self.json_body['data']['attributes']['url'] = 'https://example.org/b'
+        result = self.client.update_diff(
+            self.doi, self.json_body, dry_run=True
+        )
+        self.assertEqual(result.status, UpdateStatus.skipped)
+        self.assertEqual(
+            self.server.store.get(self.doi)['url'], 'https://example.org/a'
+        )
+
+    def test_update_diff_many(self):
+        changed = copy.deepcopy(self.json_body)
+        changed['data']['attributes']['url'] = 'https://example.org/b'
+        record = self.client.retrieve(self.doi)['data']['attributes']
+        run = self.client.update_diff_many(
+            [(self.doi, self.json_body), (self.doi, changed), ('x', {})],
+            current=lambda doi: record,
+            max_workers=1
+        )
+        results = list(run)
+        self.assertEqual(
+            [r.data.status for r in results[:2]],
+            [UpdateStatus.unchanged, UpdateStatus.changed]
+        )
+        self.assertEqual(results[2].error.kind, 'validation')
+        self.assertEqual(run.summary.succeeded, 2)
+
+    def test_transition_many(self):
+        dois = [self.doi] + [
+            self.client.create(copy.deepcopy(self.json_body), True)
+            ['data']['id'] for _ in range(3)
+        ]
+        self.server.store.update(dois[1], {'event': 'publish'})
+        progress = []
+        run = self.client.transition_many(
+            dois, 'register', max_workers=2,
+            progress=lambda *counts: progress.append(counts)
+        )
+        results = list(run)
+        self.assertEqual(
+            [r.data.status if r.ok else r.error.kind for r in results],
+            ['changed', 'validation', 'changed', 'changed']
+        )
+        self.assertEqual(progress[-1], (4, 1))
+        activity = self.server.store.activities[dois[0]][-1]
+        self.assertEqual(activity['attributes']['changes'], {})
+        self.assertEqual(
+            [self.server.store.get(doi)['state'] for doi in dois],
+            ['registered', 'findable', 'registered', 'registered']
+        )
+
+        requests = self.server.requests
+        run = self.client.transition_many(dois, 'publish', dry_run=True)
+        self.assertEqual(
+            [r.data.status for r in run],
+            ['skipped', 'unchanged', 'skipped', 'skipped']
+        )
+        # only the retrieves
+        self.assertEqual(self.server.requests, requests + 4)
+
+        # state-only current, the error still names the doi
+        result, = self.client.transition_many(
+            [dois[0]], 'hide', current=lambda doi: {'state': 'draft'}
+        )
+        self.assertTrue(result.error.message.startswith(f'{dois[0]}:'))
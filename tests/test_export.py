@@ -0,0 +1,111 @@
+from unittest import mock
+import copy
+import os
+import tempfile
+
+from datacite_rest.export import (
+    DOIExporter,
+    read_export,
+    shards_by_resource_type,
+    shards_by_year
+)
+
+from datacite_rest.exceptions import ExportCoverageError
+
+from .constants import NOW, VALID_DRAFT_FMT, VALID_DOI_FMT
+from .test_mock_server import MockServerTestCase
+
+
+class TestDOIExporter(MockServerTestCase):
+    def setUp(self):
+        super().setUp()
+        self._dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._dir.cleanup)
+        self.client = self._get_client()
+        for _ in range(11):
+            self.client.create(copy.deepcopy(VALID_DRAFT_FMT), draft=True)
+        for _ in range(3):
+            self.client.create(copy.deepcopy(VALID_DOI_FMT))
+
+    def _exported_ids(self, exporter: DOIExporter):
+        ids = []
+        for shard in exporter.shards:
+            path = exporter.shard_path(shard)
+            if os.path.exists(path):
+                ids.extend(r['id'] for r in read_export(path))
+        return ids
+
+    def test_export_by_year(self):
+        shards = shards_by_year(NOW.year - 1, NOW.year)
+        x = DOIExporter(self.client, self._dir.name, shards, page_size=4)
+        summary = x.run()
+        self.assertEqual(summary.records[f'created-{NOW.year}'], 14)
+        self.assertEqual(summary.records[f'created-{NOW.year - 1}'], 0)
+        self.assertEqual(len(set(self._exported_ids(x))), 14)
+
+    def test_export_by_resource_type(self):
+        shards = shards_by_resource_type(['text', 'dataset'])
+        x = DOIExporter(self.client, self._dir.name, shards, page_size=2)
+        # the drafts have no resource type
+        self.assertEqual(x.coverage(), (14, 3))
+        x = DOIExporter(
+            self.client, self._dir.name, shards, page_size=2,
+            check_coverage=False
+        )
+        summary = x.run()
+        self.assertEqual(summary.records['resource-type-text'], 3)
+        self.assertEqual(summary.records['resource-type-dataset'], 0)
+
+    def test_uncovered_records_fail_loudly(self):
+        shards = shards_by_year(NOW.year - 2, NOW.year - 1)
+        x = DOIExporter(self.client, self._dir.name, shards)
+        with self.assertRaises(ExportCoverageError) as ctx:
+            x.run()
+        self.assertEqual((ctx.exception.total, ctx.exception.covered), (14, 0))
+        self.assertFalse(os.path.exists(x.shard_path(shards[0])))
+
+    def test_resume_after_last_page(self):
+        shards = shards_by_year(NOW.year, NOW.year)
+        x = DOIExporter(self.client, self._dir.name, shards, page_size=5)
+        x.run()
+        state = x.checkpoint.get(shards[0].name)
+        self.assertEqual((state['cursor'], state['done']), (None, True))
+        # a checkpoint from before done was saved with the last page
+        x.checkpoint.save(shards[0].name, {**state, 'done': False})
+        resumed = DOIExporter(
+            self.client, self._dir.name, shards, page_size=5
+        )
+        self.assertEqual(resumed.run().records[shards[0].name], 14)
+        self.assertEqual(len(self._exported_ids(resumed)), 14)
+
+    def test_resume_after_interruption(self):
+        shards = shards_by_year(NOW.year, NOW.year)
+        x = DOIExporter(self.client, self._dir.name, shards, page_size=3)
+        original = x.checkpoint.save
+        calls = []
+
+        def crash_on_third_page(shard, state):
+            calls.append(state['records'])
+            if len(calls) == 3:
+                # the page is on disk but the checkpoint never lands
+                raise KeyboardInterrupt
+            original(shard, state)
+
+        with mock.patch.object(
+            x.checkpoint, 'save', side_effect=crash_on_third_page
+        ):
+            with self.assertRaises(KeyboardInterrupt):
+                x.run()
+
+        resumed = DOIExporter(
+            self.client, self._dir.name, shards, page_size=3
+        )
+        self.assertEqual(resumed.checkpoint.get(shards[0].name)['records'], 6)
+        summary = resumed.run()
+        ids = self._exported_ids(resumed)
+        self.assertEqual(summary.records[shards[0].name], 14)
+        self.assertEqual(len(ids), 14)
+        self.assertEqual(len(set(ids)), 14)
+
+        # a finished export is a no-op
+        self.assertEqual(resumed.run().records[shards[0].name], 14)
@@ -0,0 +1,105 @@
+from unittest import TestCase
+import copy
+import logging
+
+from datacite_rest.exceptions import DataCiteRESTError
+from datacite_rest.hooks import (
+    Histogram,
+    MetricsCollector,
+    RequestHook,
+    endpoint_name
+)
+
+from .constants import PREFIX, VALID_DRAFT_FMT
+from .test_mock_server import MockServerTestCase
+
+
+class TestHookHelpers(TestCase):
+    def test_endpoint_name(self):
+        self.assertEqual(endpoint_name('dois/'), 'dois')
+        self.assertEqual(endpoint_name('dois/10.5438/abc'), 'dois/{id}')
+        self.assertEqual(
+            endpoint_name('dois/10.5438/abc/activities'),
+            'dois/{id}/activities'
+        )
+
+    def test_histogram_quantile(self):
+        x = Histogram((0.1, 0.5, 1.0))
+        self.assertIsNone(x.quantile(0.5))
+        for value in (0.05, 0.05, 0.3, 2.0):
+            x.observe(value)
+        self.assertEqual(x.quantile(0.5), 0.1)
+        self.assertEqual(x.quantile(0.75), 0.5)
+        self.assertEqual(x.quantile(1.0), float('inf'))
+
+
+class _RecordingHook(RequestHook):
+    def __init__(self):
+        self.events = []
+
+    def before_request(self, info):
+        self.events.append(('before', info.endpoint))
+
+    def after_response(self, info):
+        self.events.append(('after', info.status_code))
+
+    def on_error(self, info, exc):
+        self.events.append(('error', info.status_code))
+
+
+class _BrokenHook(RequestHook):
+    def before_request(self, info):
+        raise RuntimeError('hooks must not break requests')
+
+
+class TestRequestHooks(MockServerTestCase):
+    def test_callbacks(self):
+        hook = _RecordingHook()
+        x = self._get_client(hooks=[hook, _BrokenHook()])
+        res = x.create(copy.deepcopy(VALID_DRAFT_FMT), draft=True)
+        with self.assertRaises(DataCiteRESTError):
+            x.retrieve(f'{PREFIX}/missing')
+        self.assertEqual(hook.events, [
+            ('before', 'dois'),
+            ('after', 201),
+            ('before', 'dois/{id}'),
+            ('after', 404),
+            ('error', 404)
+        ])
+        self.assertTrue(res['data']['id'])
+
+    def test_metrics_collector(self):
+        metrics = MetricsCollector()
+        x = self._get_client(hooks=[metrics])
+        res = x.create(copy.deepcopy(VALID_DRAFT_FMT), draft=True)
+        doi = res['data']['id']
+        for _ in range(3):
+            x.retrieve(doi)
+        snapshot = metrics.snapshot()
+        self.assertIn(('dois/{id}', 'GET', 200, 3), snapshot['requests'])
+        self.assertEqual(snapshot['latency']['dois/{id}']['count'], 3)
+        # one new connection, then keep-alive reuse
+        self.assertEqual(snapshot['connect']['dois']['count'], 1)
+        self.assertNotIn('dois/{id}', snapshot['connect'])
+        self.assertIsNotNone(metrics.latency_quantile('dois/{id}', 0.99))
+        text = metrics.render()
+        self.assertIn(
+            'datacite_rest_requests_total{endpoint="dois/{id}",'
+            'method="GET",status="200"} 3',
+            text
+        )
+        self.assertIn('datacite_rest_latency_seconds_count', text)
+
+    def test_body_logging_is_opt_in(self):
+        logger = 'datacite_rest.datacite_rest'
+        x = self._get_client()
+        with self.assertLogs(logger, logging.DEBUG) as logs:
+            x.create(copy.deepcopy(VALID_DRAFT_FMT), draft=True)
+        self.assertFalse(any('res.text' in m for m in logs.output))
+
+        x = self._get_client(log_body=10)
+        with self.assertLogs(logger, logging.DEBUG) as logs:
+            x.create(copy.deepcopy(VALID_DRAFT_FMT), draft=True)
+        bodies = [m for m in logs.output if 'res.text' in m]
+        self.assertEqual(len(bodies), 1)
+        self.assertTrue(bodies[0].endswith('res.text: {"data": {'))
@@ -0,0 +1,28 @@
+from unittest import TestCase
+import subprocess
+import sys
+
+import datacite_rest
+from datacite_rest import models
+
+
+class TestLazyImports(TestCase):
+    def test_cold_import_defers_heavy_modules(self):
+        script = (
+            'import sys, datacite_rest\n'
+            "assert 'requests' not in sys.modules\n"
+            'from datacite_rest import DataCiteREST\n'
+            "for name in ('aiohttp', 'asyncio', 'datacite_rest.schema43'):\n"
+            '    assert name not in sys.modules, name\n'
+        )
+        subprocess.run([sys.executable, '-c', script], check=True)
+
+    def test_lazy_names_resolve(self):
+        from datacite_rest.datacite_rest import DataCiteREST
+        self.assertIs(datacite_rest.DataCiteREST, DataCiteREST)
+        self.assertIn('DataCiteREST', dir(datacite_rest))
+        self.assertEqual(models.Schema43Model.__name__, 'Schema43Model')
+        with self.assertRaises(AttributeError):
+            datacite_rest.Missing
+        with self.assertRaises(AttributeError):
+            models.Missing
@@ -0,0 +1,116 @@
+import copy
+import os
+import tempfile
+
+from datacite_rest.journal import JobState, MintJournal
+
+from .constants import PREFIX, VALID_DOI_FMT, VALID_DRAFT_FMT
+from .test_mock_server import MockServerTestCase
+
+
+def _drafts(n: int):
+    for i in range(n):
+        json_body = copy.deepcopy(VALID_DRAFT_FMT)
+        json_body['data']['attributes']['url'] = f'https://example.org/{i}'
+        yield json_body
+
+
+class TestMintJournal(MockServerTestCase):
+    def setUp(self):
+        super().setUp()
+        self._dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._dir.cleanup)
+        self.path = os.path.join(self._dir.name, 'journal.sqlite')
+        self.client = self._get_client()
+
+    def _journal(self) -> MintJournal:
+        journal = MintJournal(self.path, self.client)
+        self.addCleanup(journal.close)
+        return journal
+
+    def test_add_assigns_dois_and_is_idempotent_by_key(self):
+        journal = self._journal()
+        bodies = [copy.deepcopy(VALID_DRAFT_FMT) for _ in range(3)]
+        keys = iter(['a', 'b', 'c', 'a', 'b', 'c'])
+        self.assertEqual(
+            journal.add(bodies, draft=True, key=lambda _: next(keys)), 3
+        )
+        self.assertEqual(
+            journal.add(bodies, draft=True, key=lambda _: next(keys)), 0
+        )
+        jobs = list(journal.jobs())
+        self.assertEqual([job.key for job in jobs], ['a', 'b', 'c'])
+        self.assertTrue(all(job.doi.startswith(f'{PREFIX}/') for job in jobs))
+        # the caller's payloads are not modified
+        self.assertNotIn('doi', bodies[0]['data']['attributes'])
+        self.assertEqual(self.server.requests, 0)
+
+    def test_add_without_key_is_idempotent(self):
+        journal = self._journal()
+        self.assertEqual(journal.add(_drafts(3), draft=True), 3)
+        self.assertEqual(len(list(journal.run())), 3)
+        # an import script re-run after a crash
+        self.assertEqual(journal.add(_drafts(3), draft=True), 0)
+        self.assertEqual(list(journal.run()), [])
+        self.assertEqual(len(self.server.store.list()), 3)
+
+    def test_identical_payloads_are_separate_jobs(self):
+        journal = self._journal()
+        placeholders = [copy.deepcopy(VALID_DRAFT_FMT) for _ in range(3)]
+        self.assertEqual(journal.add(placeholders, draft=True), 3)
+        self.assertEqual(journal.add(placeholders, draft=True), 0)
+        self.assertEqual(len(list(journal.run())), 3)
+        self.assertEqual(len(self.server.store.list()), 3)
+
+    def test_validation_failures_are_never_sent(self):
+        journal = self._journal()
+        invalid = copy.deepcopy(VALID_DOI_FMT)
+        del invalid['data']['attributes']['titles']
+        journal.add([VALID_DOI_FMT, invalid])
+        self.assertEqual(journal.counts()['failed'], 1)
+        results = list(journal.run())
+        self.assertEqual(len(results), 1)
+        self.assertTrue(results[0].ok)
+        self.assertEqual(journal.counts(), {
+            'pending': 0, 'in_flight': 0, 'done': 1, 'failed': 1
+        })
+
+    def test_resume_after_crash(self):
+        journal = self._journal()
+        journal.add(_drafts(4), draft=True)
+        # a crash mid-run: one minted but not marked done, one never sent
+        jobs = list(journal.jobs())
+        for job in jobs[:2]:
+            journal._send(journal._start((job.id, job.doi)))
+        minted, unsent = jobs[2:]
+        self.client.create(journal._start((minted.id, minted.doi))[1])
+        journal._start((unsent.id, unsent.doi))
+        self.assertEqual(journal.counts()['in_flight'], 2)
+        requests = self.server.requests
+        journal.close()
+
+        journal = self._journal()
+        results = list(journal.run(max_workers=2))
+        self.assertEqual([r.key for r in results], [unsent.doi])
+        self.assertEqual(journal.counts()['done'], 4)
+        self.assertEqual(len(self.server.store.list()), 4)
+        # two lookups to settle the in_flight jobs, one create
+        self.assertEqual(self.server.requests, requests + 3)
+        self.assertEqual(list(journal.run()), [])
+
+    def test_client_errors_fail_and_can_be_retried(self):
+        journal = self._journal()
+        taken = self.client.create(copy.deepcopy(VALID_DRAFT_FMT), True)
+        json_body = copy.deepcopy(VALID_DRAFT_FMT)
+        json_body['data']['attributes']['doi'] = taken['data']['id']
+        journal.add([json_body], draft=True)
+        result, = journal.run()
+        self.assertFalse(result.ok)
+        job, = journal.jobs(JobState.failed)
+        self.assertEqual((job.status_code, job.attempts), (422, 1))
+
+        del self.server.store.dois[job.doi]
+        result, = journal.run(retry_failed=True)
+        self.assertTrue(result.ok)
+        job, = journal.jobs()
+        self.assertEqual((job.state, job.attempts), (JobState.done, 2))
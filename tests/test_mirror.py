@@ -0,0 +1,126 @@
+from unittest import TestCase
+import copy
+import datetime
+import os
+import tempfile
+
+from datacite_rest.mirror import (
+    DOIMirror,
+    format_timestamp,
+    parse_timestamp,
+    updated_since_query
+)
+
+from .constants import VALID_DRAFT_FMT, VALID_DOI_FMT
+from .test_mock_server import MockServerTestCase
+
+
+class TestUpdatedSinceQuery(TestCase):
+    def test_escapes_colons(self):
+        self.assertEqual(
+            updated_since_query('2021-01-02T03:04:05Z'),
+            r'updated:[2021-01-02T03\:04\:05Z TO *]'
+        )
+
+
+class TestDOIMirror(MockServerTestCase):
+    def setUp(self):
+        super().setUp()
+        self._dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._dir.cleanup)
+        self.client = self._get_client()
+        for _ in range(5):
+            self.client.create(copy.deepcopy(VALID_DRAFT_FMT), draft=True)
+        json_body = copy.deepcopy(VALID_DOI_FMT)
+        json_body['data']['attributes']['url'] = 'https://example.org/x'
+        json_body['data']['attributes']['creators'] = [{'name': 'Doe, Jane'}]
+        json_body['data']['attributes']['event'] = 'publish'
+        res = self.client.create(json_body)
+        self.findable = res['data']['id']
+        # spread the timestamps so the high-water mark is deterministic
+        for i, record in enumerate(self.server.store.list()):
+            record['updated'] = f'2020-01-01T00:00:{i:02d}Z'
+        self.mirror = DOIMirror(
+            os.path.join(self._dir.name, 'dois.sqlite'), self.client
+        )
+        self.addCleanup(self.mirror.close)
+
+    def test_full_then_incremental_sync(self):
+        result = self.mirror.sync(page_size=2)
+        self.assertEqual(result.fetched, 6)
+        self.assertEqual(result.high_water_mark, '2020-01-01T00:00:05Z')
+        self.assertEqual(self.mirror.count(), 6)
+
+        # the oldest record, so it is not also the boundary record
+        doi = self.server.store.list()[0]['doi']
+        json_body = copy.deepcopy(VALID_DRAFT_FMT)
+        json_body['data']['attributes']['url'] = 'https://example.org/changed'
+        self.client.update(doi, json_body)
+        self.server.store.get(doi)['updated'] = '2020-01-02T00:00:00Z'
+        result = self.mirror.sync(page_size=2)
+        # the changed record plus the inclusive boundary record
+        self.assertEqual(result.fetched, 2)
+        self.assertEqual(result.high_water_mark, '2020-01-02T00:00:00Z')
+        self.assertEqual(self.mirror.count(), 6)
+        self.assertEqual(
+            self.mirror.get(doi)['url'], 'https://example.org/changed'
+        )
+
+    def test_lookups(self):
+        self.mirror.sync()
+        self.assertTrue(self.mirror.exists(self.findable.upper()))
+        self.assertFalse(self.mirror.exists('10.0000/missing'))
+        self.assertIsNone(self.mirror.get('10.0000/missing'))
+        self.assertEqual(self.mirror.get(self.findable)['state'], 'findable')
+        by_url = self.mirror.by_url('https://example.org/x')
+        self.assertEqual([r['doi'] for r in by_url], [self.findable])
+        self.assertEqual(len(self.mirror.by_state('draft')), 5)
+        self.assertEqual(self.mirror.count('findable'), 1)
+        by_creator = self.mirror.by_creator('doe, JANE')
+        self.assertEqual([r['doi'] for r in by_creator], [self.findable])
+
+    def test_reupsert_replaces_creators(self):
+        record = {'id': 'A/1', 'attributes': {'creators': [{'name': 'X'}]}}
+        self.mirror.upsert([record])
+        record['attributes']['creators'] = [{'name': 'Y'}]
+        self.mirror.upsert([record])
+        self.assertEqual(self.mirror.by_creator('x'), [])
+        self.assertEqual(len(self.mirror.by_creator('y')), 1)
+
+    def test_interrupted_sync_resumes(self):
+        # listings come in doi order, make the last doi the oldest update
+        records = self.server.store.list()
+        for i, record in enumerate(reversed(records)):
+            record['updated'] = f'2020-01-01T00:00:{i:02d}Z'
+        iter_pages = self.client.iter_pages
+
+        def interrupted(*args, **kwargs):
+            pages = iter_pages(*args, **kwargs)
+            yield next(pages)
+            raise ConnectionError('interrupted')
+
+        self.client.iter_pages = interrupted
+        with self.assertRaises(ConnectionError):
+            self.mirror.sync(page_size=1)
+        self.assertEqual(self.mirror.count(), 1)
+        self.assertIsNone(self.mirror.high_water_mark)
+
+        del self.client.iter_pages
+        result = self.mirror.sync(page_size=1)
+        self.assertEqual(result.fetched, 6)
+        self.assertTrue(self.mirror.exists(records[-1]['doi']))
+        self.assertEqual(self.mirror.count(), 6)
+
+    def test_mark_stays_overlap_before_sync_start(self):
+        # updated while the sync runs, or not yet visible to search
+        record = self.server.store.list()[0]
+        record['updated'] = format_timestamp(datetime.datetime.now(
+            datetime.timezone.utc
+        ))
+        before = datetime.datetime.now(datetime.timezone.utc)
+        result = self.mirror.sync()
+        mark = parse_timestamp(result.high_water_mark)
+        self.assertLessEqual(mark, before - self.mirror.overlap)
+        self.assertEqual(self.mirror.high_water_mark, result.high_water_mark)
+        # so the next sync fetches that record again
+        self.assertEqual(self.mirror.sync().fetched, 1)
@@ -0,0 +1,194 @@
+from unittest import TestCase, mock
+from concurrent.futures import ThreadPoolExecutor
+import copy
+import time
+
+from datacite_rest import DataCiteREST
+from datacite_rest.exceptions import DataCiteRESTError
+from datacite_rest.hooks import MetricsCollector
+from datacite_rest.models import DataCiteQueryParamsModel
+from datacite_rest.mock_server import MockDataCiteServer
+from datacite_rest.throttle import HedgePolicy, RetryPolicy
+
+from .constants import PREFIX, VALID_DRAFT_FMT, VALID_DOI_FMT
+
+
+class MockServerTestCase(TestCase):
+    """ runs DataCiteREST end to end against a local MockDataCiteServer """
+    server_kwargs = {}
+
+    def setUp(self):
+        self.server = MockDataCiteServer(**self.server_kwargs).start()
+        self.addCleanup(self.server.stop)
+
+    def _get_client(self, **kwargs) -> DataCiteREST:
+        client = DataCiteREST(
+            'abc123', 'secret', self.server.url, PREFIX, **kwargs
+        )
+        self.addCleanup(client.close)
+        return client
+
+
+class TestMockDataCiteServer(MockServerTestCase):
+    def test_create_retrieve_update(self):
+        x = self._get_client()
+        res = x.create(copy.deepcopy(VALID_DRAFT_FMT), draft=True)
+        doi = res['data']['id']
+        self.assertEqual(doi.split('/')[0], PREFIX)
+        self.assertEqual(res['data']['attributes']['state'], 'draft')
+
+        self.assertEqual(x.retrieve(doi)['data']['id'], doi)
+
+        json_body = copy.deepcopy(VALID_DOI_FMT)
+        json_body['data']['attributes']['event'] = 'publish'
+        res = x.update(doi, json_body, partial=False)
+        self.assertEqual(res['data']['attributes']['state'], 'findable')
+
+        actions = [
+            a['attributes']['action'] for a in x.activities(doi)['data']
+        ]
+        self.assertEqual(actions, ['create', 'update'])
+
+    def test_retrieve_missing(self):
+        x = self._get_client()
+        with self.assertRaises(DataCiteRESTError) as ctx:
+            x.retrieve(f'{PREFIX}/missing')
+        self.assertEqual(ctx.exception.status_code, 404)
+
+    def test_iter_list(self):
+        x = self._get_client()
+        for _ in range(7):
+            x.create(copy.deepcopy(VALID_DRAFT_FMT), draft=True)
+        records = list(x.iter_list('dois', {}, page_size=3))
+        self.assertEqual(len(records), 7)
+        self.assertEqual(len({r['id'] for r in records}), 7)
+
+    def test_retrieve_many(self):
+        x = self._get_client()
+        x._lookup_max_dois = 4
+        dois = [
+            x.create(copy.deepcopy(VALID_DRAFT_FMT), draft=True)['data']['id']
+            for _ in range(10)
+        ]
+        requests = self.server.requests
+        candidates = [d.upper() for d in dois] + [f'{PREFIX}/missing']
+        found = x.retrieve_many(candidates)
+        # 11 candidates in chunks of 4
+        self.assertEqual(self.server.requests - requests, 3)
+        self.assertEqual(list(found), candidates)
+        self.assertEqual(found[dois[0].upper()]['id'], dois[0])
+        self.assertIsNone(found[f'{PREFIX}/missing'])
+        exists = x.exists_many([dois[1], f'{PREFIX}/missing'])
+        self.assertEqual(exists, {dois[1]: True, f'{PREFIX}/missing': False})
+
+    def test_facets(self):
+        x = self._get_client()
+        for _ in range(3):
+            x.create(copy.deepcopy(VALID_DRAFT_FMT), draft=True)
+        json_body = copy.deepcopy(VALID_DOI_FMT)
+        json_body['data']['attributes']['event'] = 'publish'
+        x.create(json_body)
+        requests = self.server.requests
+        facets = x.facets('dois', {'prefix': PREFIX})
+        self.assertEqual(facets.total, 4)
+        self.assertEqual(
+            facets.counts['states'], {'draft': 3, 'findable': 1}
+        )
+        self.assertEqual(facets.counts['resourceTypes'], {'text': 1})
+        self.assertEqual(
+            x.count(params=DataCiteQueryParamsModel(state='draft')), 3
+        )
+        self.assertEqual(self.server.requests - requests, 2)
+        # no records were sent for either
+        page = x.list('dois', {'page[size]': 0})
+        self.assertEqual((page['data'], page['meta']['total']), ([], 4))
+
+
+class TestMockDataCiteServerRateLimit(MockServerTestCase):
+    server_kwargs = {'rate_limit_rate': 0.3}
+
+    def test_retries_through_injected_429s(self):
+        x = self._get_client(retry=RetryPolicy(max_retries=20))
+        for _ in range(10):
+            x.create(copy.deepcopy(VALID_DRAFT_FMT), draft=True)
+        self.assertEqual(len(self.server.store.dois), 10)
+        self.assertEqual(x.retry_stats.retries, self.server.injected_429)
+
+
+class TestMockDataCiteServerTimeouts(MockServerTestCase):
+    server_kwargs = {'latency': 0.3}
+
+    def test_timeout(self):
+        x = self._get_client(timeout=(1, 5))
+        start = time.monotonic()
+        with self.assertRaises(DataCiteRESTError):
+            x.retrieve(f'{PREFIX}/missing', timeout=0.05)
+        self.assertLess(time.monotonic() - start, 0.25)
+
+    def test_deadline_covers_retries(self):
+        self.server.error_rate = 1.0
+        x = self._get_client(retry=RetryPolicy(backoff_factor=0.01))
+        start = time.monotonic()
+        with self.assertRaises(DataCiteRESTError):
+            x.list('dois', {}, deadline=0.5)
+        self.assertLess(time.monotonic() - start, 0.7)
+        # retried, until the second attempt ran out of time
+        self.assertGreaterEqual(self.server.requests, 2)
+
+    def test_hedged_get(self):
+        metrics = MetricsCollector()
+        x = self._get_client(hooks=[metrics], hedge=HedgePolicy(delay=0.1))
+        send = x._send
+        calls = []
+
+        def slow_first(*args, **kwargs):
+            calls.append(time.monotonic())
+            if len(calls) == 1:
+                time.sleep(1)
+            return send(*args, **kwargs)
+
+        with mock.patch.object(x, '_send', side_effect=slow_first):
+            start = time.monotonic()
+            res = x.list('dois', {})
+        self.assertEqual(res['data'], [])
+        self.assertLess(time.monotonic() - start, 0.9)
+        self.assertEqual(len(calls), 2)
+        counters = {
+            name: n for name, _, n in metrics.snapshot()['counters']
+        }
+        self.assertEqual(counters, {'hedged_requests': 1, 'hedge_wins': 1})
+        # let the losing copy finish before the server stops
+        x._hedge_executor.shutdown(wait=True)
+
+    def test_saturated_client_does_not_hedge(self):
+        metrics = MetricsCollector()
+        x = self._get_client(
+            hooks=[metrics], hedge=HedgePolicy(delay=0.1), pool_maxsize=2
+        )
+        doi = x.create(copy.deepcopy(VALID_DRAFT_FMT), True)['data']['id']
+        self.server.latency = 0.05
+        requests = self.server.requests
+        with ThreadPoolExecutor(max_workers=40) as executor:
+            results = list(executor.map(lambda _: x.retrieve(doi), range(40)))
+        self.assertEqual({r['data']['id'] for r in results}, {doi})
+        # no response was slow, queueing for a worker is not a reason
+        self.assertEqual(self.server.requests - requests, 40)
+        self.assertEqual(metrics.snapshot()['counters'], [])
+
+    def test_write_timeout(self):
+        x = self._get_client()
+        self.server.latency = 0.5
+        start = time.monotonic()
+        with self.assertRaises(DataCiteRESTError):
+            x.create(copy.deepcopy(VALID_DRAFT_FMT), True, timeout=0.05)
+        self.assertLess(time.monotonic() - start, 0.4)
+
+    def test_writes_are_not_hedged(self):
+        x = self._get_client(hedge=HedgePolicy(delay=0.01))
+        x.create(copy.deepcopy(VALID_DRAFT_FMT), draft=True)
+        self.assertEqual(len(self.server.store.dois), 1)
+        self.assertEqual(self.server.requests, 1)
+
+    def test_quantile_hedging_needs_metrics(self):
+        with self.assertRaises(ValueError):
+            self._get_client(hedge=HedgePolicy())
@@ -79,6 +79,34 @@ class TestDataCiteModel(TestCase):
             _ = self.model(**data)
 
 
+class TestDataCiteQueryParamsModel(TestCase):
+    model = models.DataCiteQueryParamsModel
+
+    def test_params(self):
+        params = self.model(
+            client_id='abc.xyz',
+            state='findable',
+            created=2020,
+            page_size=0,
+            disable_facets=False
+        ).params()
+        self.assertEqual(params, {
+            'client-id': 'abc.xyz',
+            'state': 'findable',
+            'created': '2020',
+            'page[size]': '0',
+            'disable-facets': 'false'
+        })
+        self.assertEqual(
+            self.model(**{'page[cursor]': '1'}).params(), {'page[cursor]': '1'}
+        )
+
+    def test_invalid(self):
+        for kwargs in ({'state': 'x'}, {'page_size': 1001}, {'clientid': 1}):
+            with self.assertRaises(Exception):
+                self.model(**kwargs)
+
+
 # # TODO: rewrite TestJSONPayloadModel for new data: types
 # class TestJSONPayloadModel(TestCase):
 #     model = models.JSONPayloadModel
@@ -0,0 +1,78 @@
+from unittest import mock
+import itertools
+import os
+import tempfile
+import time
+
+from datacite_rest.pool import DraftDOIPool, random_suffix
+
+from .constants import PREFIX
+from .test_mock_server import MockServerTestCase
+
+
+class TestDraftDOIPool(MockServerTestCase):
+    def setUp(self):
+        super().setUp()
+        self._dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._dir.cleanup)
+        self.path = os.path.join(self._dir.name, 'pool.json')
+        self.client = self._get_client()
+
+    def _wait_for(self, pool: DraftDOIPool, n: int):
+        deadline = time.monotonic() + 5
+        while len(pool) < n and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(len(pool), n)
+
+    def test_reserve_is_local_and_refills(self):
+        with DraftDOIPool(self.client, size=3, path=self.path).start() as pool:
+            self._wait_for(pool, 3)
+            requests = self.server.requests
+            with mock.patch.object(self.client, 'create') as create:
+                doi = pool.reserve()
+            create.assert_not_called()
+            self.assertEqual(self.server.store.get(doi)['state'], 'draft')
+            self._wait_for(pool, 3)
+            self.assertEqual(self.server.requests, requests + 1)
+        self.assertEqual(pool.misses, 0)
+        self.assertEqual(pool.minted, 4)
+
+    def test_persists_across_restarts(self):
+        pool = DraftDOIPool(self.client, size=2, path=self.path)
+        pool.refill()
+        reserved = pool.reserve()
+        restored = DraftDOIPool(self.client, size=2, path=self.path)
+        self.assertEqual(len(restored), 1)
+        self.assertNotEqual(restored.reserve(), reserved)
+        restored.release(reserved)
+        self.assertEqual(
+            DraftDOIPool(self.client, path=self.path).reserve(), reserved
+        )
+
+    def test_empty_pool_mints_synchronously(self):
+        pool = DraftDOIPool(self.client, size=2)
+        doi = pool.reserve()
+        self.assertTrue(doi.startswith(f'{PREFIX}/'))
+        self.assertEqual(pool.misses, 1)
+
+    def test_local_suffix_collisions(self):
+        taken = self.client.create({'data': {'type': 'dois', 'attributes': {
+            'prefix': PREFIX, 'doi': f'{PREFIX}/aaaa-aaaa'
+        }}}, draft=True)['data']['id']
+        suffixes = itertools.chain(['aaaa-aaaa'], iter(random_suffix, None))
+        pool = DraftDOIPool(
+            self.client, size=3, suffix=lambda: next(suffixes)
+        )
+        while len(pool) < 3:
+            pool.refill()
+        self.assertEqual(pool.collisions, 1)
+        self.assertNotIn(taken, [pool.reserve() for _ in range(3)])
+
+    def test_empty_pool_retries_collisions(self):
+        self.client.create({'data': {'type': 'dois', 'attributes': {
+            'prefix': PREFIX, 'doi': f'{PREFIX}/aaaa-aaaa'
+        }}}, draft=True)
+        suffixes = iter(['aaaa-aaaa', 'bbbb-bbbb'])
+        pool = DraftDOIPool(self.client, size=0, suffix=lambda: next(suffixes))
+        self.assertEqual(pool.reserve(), f'{PREFIX}/bbbb-bbbb')
+        self.assertEqual((pool.collisions, pool.misses), (1, 1))
@@ -0,0 +1,105 @@
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+import copy
+import json
+import os
+import tempfile
+import threading
+import time
+
+from datacite_rest.registry import DataCiteRegistry
+
+from .constants import PREFIX, VALID_DRAFT_FMT
+from .test_mock_server import MockServerTestCase
+
+OTHER_PREFIX = '10.1234'
+
+
+class TestDataCiteRegistry(MockServerTestCase):
+    def setUp(self):
+        super().setUp()
+        self.repositories = [
+            {
+                'id': 'abc.one',
+                'password': 'secret',
+                'url': self.server.url,
+                'prefix': PREFIX
+            },
+            {
+                'id': 'abc.two',
+                'password': 'secret',
+                'url': self.server.url,
+                'prefix': OTHER_PREFIX,
+                'concurrency': 2
+            }
+        ]
+        self.registry = DataCiteRegistry(self.repositories)
+        self.addCleanup(self.registry.close)
+
+    def _draft(self, prefix: str) -> dict:
+        json_body = copy.deepcopy(VALID_DRAFT_FMT)
+        json_body['data']['attributes']['prefix'] = prefix
+        return json_body
+
+    def test_routes_by_prefix(self):
+        one = self.registry.client_for(PREFIX)
+        two = self.registry.client_for(f'{OTHER_PREFIX}/x')
+        self.assertIsNot(one, two)
+        self.assertIs(one._session, two._session)
+        self.assertEqual(two._auth.id, 'abc.two')
+
+        res = self.registry.create(self._draft(OTHER_PREFIX), draft=True)
+        doi = res['data']['id']
+        self.assertTrue(doi.startswith(f'{OTHER_PREFIX}/'))
+        with mock.patch.object(
+            two, 'retrieve', wraps=two.retrieve
+        ) as retrieve:
+            self.assertEqual(self.registry.retrieve(doi)['data']['id'], doi)
+        retrieve.assert_called_once_with(doi)
+        with self.assertRaises(KeyError):
+            self.registry.retrieve('10.9999/missing')
+
+    def test_per_repository_concurrency(self):
+        two = self.registry.client_for(OTHER_PREFIX)
+        lock = threading.Lock()
+        state = {'in_flight': 0, 'peak': 0}
+        request = two._session.request
+
+        def tracked(**kwargs):
+            with lock:
+                state['in_flight'] += 1
+                state['peak'] = max(state['peak'], state['in_flight'])
+            time.sleep(0.01)
+            try:
+                return request(**kwargs)
+            finally:
+                with lock:
+                    state['in_flight'] -= 1
+
+        res = self.registry.create(self._draft(OTHER_PREFIX), draft=True)
+        doi = res['data']['id']
+        with mock.patch.object(two._session, 'request', side_effect=tracked):
+            with ThreadPoolExecutor(max_workers=6) as executor:
+                list(executor.map(
+                    lambda _: self.registry.activities(doi), range(12)
+                ))
+        self.assertEqual(state['peak'], 2)
+
+    def test_from_file_and_duplicates(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'repositories.json')
+            with open(path, 'w') as f:
+                json.dump(self.repositories, f)
+            with DataCiteRegistry.from_file(path) as registry:
+                self.assertEqual(registry.prefixes, [PREFIX, OTHER_PREFIX])
+        with self.assertRaises(ValueError):
+            DataCiteRegistry(self.repositories + self.repositories[:1])
+
+    def test_missing_credentials_do_not_fall_back_to_env(self):
+        env = {
+            'DATACITE_REPOSITORY_PASSWORD': 'default-secret',
+            'DATACITE_REPOSITORY_URL': 'https://api.test.datacite.org',
+        }
+        with mock.patch.dict(os.environ, env):
+            with self.assertRaises(ValueError):
+                DataCiteRegistry([{'id': 'other.repo', 'prefix': '10.9999'}])
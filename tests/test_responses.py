@@ -0,0 +1,90 @@
+from unittest import TestCase
+import copy
+import gc
+import sys
+
+from datacite_rest.responses import Activity, Creator, DOIRecord, ListPage
+
+from .constants import VALID_DRAFT_FMT
+from .test_mock_server import MockServerTestCase
+
+RECORD = {
+    'id': '10.5438/abcd-1234',
+    'type': 'dois',
+    'attributes': {
+        'doi': '10.5438/abcd-1234',
+        'state': 'findable',
+        'url': 'https://example.org/x',
+        'titles': [{'title': 'a'}, {'title': 'b', 'lang': 'en'}],
+        'creators': [
+            {'name': 'Doe, Jane', 'givenName': 'Jane', 'familyName': 'Doe'}
+        ],
+        'updated': '2021-01-01T00:00:00Z'
+    }
+}
+
+
+class TestResponses(TestCase):
+    def test_doi_record(self):
+        record = DOIRecord.from_response({'data': RECORD})
+        self.assertEqual(record.doi, '10.5438/abcd-1234')
+        self.assertEqual(record.state, 'findable')
+        self.assertEqual(record.url, 'https://example.org/x')
+        self.assertEqual(record.titles, ['a', 'b'])
+        # the parse is not kept next to the bytes
+        self.assertFalse(any(
+            isinstance(r, dict) for r in gc.get_referents(record)
+        ))
+        self.assertEqual(
+            record.creators, [Creator('Doe, Jane', 'Jane', 'Doe')]
+        )
+        self.assertEqual(record.attributes, RECORD['attributes'])
+        self.assertFalse(hasattr(record, '__dict__'))
+        self.assertEqual(record, DOIRecord.from_json(RECORD))
+
+    def test_states_are_shared(self):
+        a = DOIRecord.from_json(copy.deepcopy(RECORD))
+        b = DOIRecord.from_json(copy.deepcopy(RECORD))
+        self.assertIs(a.state, b.state)
+
+    def test_smaller_than_dicts(self):
+        record = DOIRecord.from_json(RECORD)
+        compact = sys.getsizeof(record) + sys.getsizeof(record._raw)
+        nested = sum(
+            sys.getsizeof(v) for v in RECORD['attributes'].values()
+        ) + sys.getsizeof(RECORD['attributes'])
+        self.assertLess(compact, nested)
+
+    def test_list_page_and_activities(self):
+        page = ListPage.from_response({
+            'data': [RECORD, RECORD],
+            'meta': {'total': 10},
+            'links': {'next': 'https://x/dois?page[cursor]=abc'}
+        })
+        self.assertEqual(len(page), 2)
+        self.assertEqual(page.total, 10)
+        self.assertEqual([r.id for r in page], [RECORD['id']] * 2)
+        self.assertTrue(page.next_url.endswith('abc'))
+
+        activities = Activity.from_response({'data': [{
+            'id': '1',
+            'attributes': {
+                'action': 'update',
+                'prov:generatedAtTime': '2021-01-01T00:00:00Z',
+                'changes': {'url': 'https://example.org/y'}
+            }
+        }]})
+        self.assertEqual(activities[0].action, 'update')
+        self.assertEqual(activities[0].changes['url'], 'https://example.org/y')
+
+
+class TestIterRecords(MockServerTestCase):
+    def test_iter_records(self):
+        x = self._get_client()
+        for _ in range(5):
+            x.create(copy.deepcopy(VALID_DRAFT_FMT), draft=True)
+        for stream in (False, True):
+            records = list(x.iter_records(page_size=2, stream=stream))
+            self.assertEqual(len(records), 5)
+            self.assertTrue(all(isinstance(r, DOIRecord) for r in records))
+            self.assertEqual({r.state for r in records}, {'draft'})
@@ -0,0 +1,75 @@
+from concurrent.futures import ThreadPoolExecutor
+from unittest import TestCase
+import asyncio
+import copy
+import threading
+
+from datacite_rest.singleflight import AsyncSingleFlight, SingleFlight
+
+from .constants import VALID_DRAFT_FMT
+from .test_mock_server import MockServerTestCase
+
+
+class TestSingleFlight(TestCase):
+    def test_concurrent_calls_share_one(self):
+        flight = SingleFlight()
+        release = threading.Event()
+        calls = []
+
+        def fn():
+            calls.append(1)
+            release.wait()
+            return {'n': len(calls)}
+
+        with ThreadPoolExecutor(max_workers=5) as executor:
+            futures = [executor.submit(flight.do, 'k', fn) for _ in range(5)]
+            while flight.coalesced < 4:
+                pass
+            release.set()
+            results = [f.result() for f in futures]
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(all(r is results[0] for r in results))
+        # nothing is remembered afterwards
+        flight.do('k', fn)
+        self.assertEqual(len(calls), 2)
+
+    def test_errors_are_shared(self):
+        flight = SingleFlight()
+        with self.assertRaises(ValueError):
+            flight.do('k', lambda: int('x'))
+        self.assertEqual(flight._calls, {})
+
+    def test_async(self):
+        flight = AsyncSingleFlight()
+        calls = []
+
+        async def fn():
+            calls.append(1)
+            n = len(calls)
+            await asyncio.sleep(0.01)
+            return n
+
+        async def run():
+            return await asyncio.gather(
+                *(flight.do('k', fn) for _ in range(5)),
+                flight.do('other', fn)
+            )
+        self.assertEqual(sorted(asyncio.run(run())), [1, 1, 1, 1, 1, 2])
+        self.assertEqual(flight.coalesced, 4)
+        self.assertEqual(flight._calls, {})
+
+
+class TestCoalescedRetrieve(MockServerTestCase):
+    server_kwargs = {'latency': 0.05}
+
+    def test_retrieve_and_activities(self):
+        x = self._get_client(coalesce=True, pool_maxsize=8)
+        res = x.create(copy.deepcopy(VALID_DRAFT_FMT), draft=True)
+        doi = res['data']['id']
+        requests = self.server.requests
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(lambda _: x.retrieve(doi), range(8)))
+            list(executor.map(lambda _: x.activities(doi), range(8)))
+        self.assertEqual({r['data']['id'] for r in results}, {doi})
+        self.assertLess(self.server.requests - requests, 16)
+        self.assertEqual(x.coalesced, 16 - (self.server.requests - requests))
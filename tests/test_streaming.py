@@ -0,0 +1,84 @@
+from unittest import TestCase
+import copy
+import json
+
+from datacite_rest.streaming import JSONArrayParser, JSONArrayStream
+
+from .constants import VALID_DRAFT_FMT
+from .test_mock_server import MockServerTestCase
+
+
+def _chunked(body: bytes, size: int):
+    return (body[i:i + size] for i in range(0, len(body), size))
+
+
+class TestJSONArrayParser(TestCase):
+    body = {
+        'included': [{'id': 'x', 'note': 'not "data": [ this'}],
+        'data': [
+            {'id': '10.5438/a', 'titles': [{'title': 'brackets ] } ['}]},
+            {'id': '10.5438/b', 'title': 'café ☃ "quoted" \\'},
+            {'id': '10.5438/c', 'attributes': {'data': [1, 2]}}
+        ],
+        'meta': {'total': 3},
+        'links': {'next': None}
+    }
+
+    def _parse(self, body: bytes, chunk_size: int, key: str = 'data'):
+        stream = JSONArrayStream(_chunked(body, chunk_size), key=key)
+        return list(stream), stream.envelope
+
+    def test_any_chunking(self):
+        raw = json.dumps(self.body, ensure_ascii=False).encode('utf-8')
+        for chunk_size in (1, 2, 3, 7, 64, len(raw)):
+            items, envelope = self._parse(raw, chunk_size)
+            self.assertEqual(items, self.body['data'], chunk_size)
+            self.assertEqual(envelope['meta'], {'total': 3})
+            self.assertEqual(envelope['data'], [])
+            self.assertEqual(envelope['included'], self.body['included'])
+
+    def test_scalars_split_across_chunks(self):
+        raw = b'{"data": [12345, true, "ab", null]}'
+        for chunk_size in (1, 2, 5):
+            items, _ = self._parse(raw, chunk_size)
+            self.assertEqual(items, [12345, True, 'ab', None])
+
+    def test_other_key(self):
+        raw = json.dumps({'reports': [{'id': 1}], 'data': []}).encode()
+        items, envelope = self._parse(raw, 4, key='reports')
+        self.assertEqual(items, [{'id': 1}])
+        self.assertEqual(envelope, {'reports': [], 'data': []})
+
+    def test_missing_key(self):
+        items, envelope = self._parse(b'{"errors": [{"status": "404"}]}', 3)
+        self.assertEqual(items, [])
+        self.assertEqual(envelope, {'errors': [{'status': '404'}]})
+
+    def test_truncated(self):
+        with self.assertRaises(ValueError):
+            self._parse(b'{"data": [{"id": 1}, {"id"', 4)
+
+    def test_buffer_is_bounded_by_a_record(self):
+        record = {'id': 'x' * 100, 'attributes': {'title': 'y' * 400}}
+        size = len(json.dumps(record))
+        parser = JSONArrayParser()
+        parser.feed(b'{"data": [')
+        peak = 0
+        for _ in range(2000):
+            parser.feed(json.dumps(record).encode() + b', ')
+            peak = max(peak, len(parser._buffer))
+        self.assertLess(peak, 2 * size)
+
+
+class TestStreamList(MockServerTestCase):
+    def test_stream_list(self):
+        x = self._get_client()
+        for _ in range(5):
+            x.create(copy.deepcopy(VALID_DRAFT_FMT), draft=True)
+        page = x.stream_list('dois', {'page[size]': 3}, chunk_size=16)
+        items = list(page)
+        self.assertEqual(len(items), 3)
+        self.assertEqual(page.envelope['meta']['total'], 5)
+
+        records = list(x.iter_list('dois', {}, page_size=2, stream=True))
+        self.assertEqual(len({r['id'] for r in records}), 5)
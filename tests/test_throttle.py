@@ -0,0 +1,95 @@
+from unittest import TestCase
+import asyncio
+import time
+
+from datacite_rest.hooks import MetricsCollector, RequestInfo
+from datacite_rest.throttle import (
+    HedgePolicy,
+    RateLimiter,
+    RetryPolicy,
+    RetryStats
+)
+
+
+class TestRateLimiter(TestCase):
+    def test_burst_is_free(self):
+        x = RateLimiter(rate=10, burst=5)
+        waits = [x.acquire() for _ in range(5)]
+        self.assertEqual(waits, [0.0] * 5)
+
+    def test_sustained_rate(self):
+        x = RateLimiter(rate=200, burst=1)
+        start = time.monotonic()
+        for _ in range(21):
+            x.acquire()
+        elapsed = time.monotonic() - start
+        self.assertGreaterEqual(elapsed, 0.09)
+
+    def test_async(self):
+        x = RateLimiter(rate=200, burst=1)
+
+        async def run():
+            return await asyncio.gather(
+                *(x.acquire_async() for _ in range(5))
+            )
+        waits = asyncio.run(run())
+        self.assertEqual(waits[0], 0.0)
+        self.assertGreater(max(waits), 0)
+
+
+class TestRetryPolicy(TestCase):
+    obj = RetryPolicy
+
+    def test_should_retry(self):
+        x = self.obj(max_retries=2)
+        self.assertTrue(x.should_retry('GET', 503, 0))
+        self.assertTrue(x.should_retry('PUT', 500, 1))
+        self.assertTrue(x.should_retry('POST', 429, 0))
+        self.assertFalse(x.should_retry('POST', 503, 0))
+        self.assertFalse(x.should_retry('GET', 404, 0))
+        self.assertFalse(x.should_retry('GET', None, 0))
+        self.assertFalse(x.should_retry('GET', 503, 2))
+
+    def test_delay_honours_retry_after(self):
+        x = self.obj(backoff_max=10)
+        self.assertEqual(x.delay(0, '3'), 3.0)
+        self.assertEqual(x.delay(0, '120'), 10)
+        self.assertEqual(x.delay(0, 'Wed, 21 Oct 2015 07:28:00 GMT'), 0.0)
+
+    def test_delay_is_jittered_exponential(self):
+        x = self.obj(backoff_factor=1, backoff_max=100)
+        for attempt in range(5):
+            delay = x.delay(attempt)
+            self.assertGreaterEqual(delay, 0)
+            self.assertLessEqual(delay, 2 ** attempt)
+
+
+class TestRetryStats(TestCase):
+    def test_snapshot(self):
+        x = RetryStats()
+        x.record_retry(1.5)
+        x.record_throttle(0.25)
+        x.record_throttle(0)
+        self.assertEqual(
+            x.snapshot(),
+            {'retries': 1, 'retry_wait': 1.5, 'throttle_wait': 0.25}
+        )
+
+
+class TestHedgePolicy(TestCase):
+    def test_fixed_delay(self):
+        self.assertEqual(HedgePolicy(delay=0.2).hedge_delay('dois'), 0.2)
+
+    def test_quantile_delay(self):
+        metrics = MetricsCollector()
+        x = HedgePolicy(quantile=0.9, min_delay=0.05)
+        # no history, no hedging
+        self.assertIsNone(x.hedge_delay('dois/{id}', metrics))
+        for total in [0.001] * 9 + [2.0]:
+            info = RequestInfo('GET', 'dois/10.5438/abc')
+            info.total = total
+            metrics.after_response(info)
+        self.assertEqual(x.hedge_delay('dois/{id}', metrics), 0.05)
+        self.assertEqual(
+            HedgePolicy(quantile=0.99).hedge_delay('dois/{id}', metrics), 2.5
+        )
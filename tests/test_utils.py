@@ -0,0 +1,25 @@
+from unittest import TestCase, mock
+import datetime
+import json
+
+from datacite_rest import utils
+
+
+class TestUtils(TestCase):
+    def test_to_camel_is_memoized(self):
+        utils.to_camel.cache_clear()
+        self.assertEqual(utils.to_camel('resource_type_general'),
+                         'resourceTypeGeneral')
+        utils.to_camel('resource_type_general')
+        self.assertEqual(utils.to_camel.cache_info().hits, 1)
+
+    def test_dumps(self):
+        value = {'a': [1, 'b'], 'c': datetime.date(2021, 1, 1)}
+        self.assertEqual(
+            json.loads(utils.dumps(value)),
+            {'a': [1, 'b'], 'c': '2021-01-01'}
+        )
+
+    def test_dumps_without_orjson(self):
+        with mock.patch.object(utils, 'orjson', None):
+            self.assertEqual(utils.dumps({'a': None}), b'{"a":null}')
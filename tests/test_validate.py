@@ -0,0 +1,72 @@
+from unittest import TestCase
+import copy
+import gzip
+import json
+import os
+import tempfile
+
+from datacite_rest.validate import ValidationRun, json_path
+
+from .constants import VALID_DOI_FMT, VALID_DRAFT_FMT
+
+
+def _untitled():
+    json_body = copy.deepcopy(VALID_DOI_FMT)
+    json_body['data']['attributes']['titles'] = [{'lang': 'en'}]
+    return json_body
+
+
+class TestJsonPath(TestCase):
+    def test_indexes(self):
+        self.assertEqual(
+            json_path(('data', 'attributes', 'titles', 0, 'title')),
+            '$.data.attributes.titles[0].title'
+        )
+        self.assertEqual(json_path(()), '$')
+
+
+class TestValidationRun(TestCase):
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._dir.cleanup)
+        self.dir = self._dir.name
+        lines = [VALID_DOI_FMT, _untitled(), VALID_DOI_FMT]
+        with open(os.path.join(self.dir, 'a.ndjson'), 'w') as f:
+            f.write('\n'.join(json.dumps(x) for x in lines))
+            f.write('\n\nnot json\n')
+        with gzip.open(os.path.join(self.dir, 'b.jsonl.gz'), 'wt') as f:
+            f.write(json.dumps(VALID_DOI_FMT['data']) + '\n')
+        with open(os.path.join(self.dir, 'c.json'), 'w') as f:
+            json.dump([VALID_DOI_FMT, [], VALID_DRAFT_FMT], f)
+        with open(os.path.join(self.dir, 'ignored.txt'), 'w') as f:
+            f.write('{}')
+
+    def _validate(self, **kwargs):
+        run = ValidationRun([self.dir], **kwargs)
+        return run, [(os.path.basename(e.source), e.record, e.path)
+                     for e in run]
+
+    def test_in_process(self):
+        run, errors = self._validate(max_workers=0, batch_size=2)
+        self.assertEqual(errors[:2], [
+            ('a.ndjson', 2, '$.data.attributes.titles[0].title'),
+            ('a.ndjson', 5, '$'),
+        ])
+        self.assertEqual(errors[2], ('c.json', 2, '$'))
+        # the draft is missing every required attribute
+        self.assertTrue(all(e[:2] == ('c.json', 3) for e in errors[3:]))
+        self.assertEqual(run.summary.records, 8)
+        self.assertEqual(run.summary.invalid, 4)
+
+    def test_process_pool_matches(self):
+        _, expected = self._validate(max_workers=0)
+        run, errors = self._validate(max_workers=2, batch_size=1)
+        self.assertEqual(errors, expected)
+        self.assertEqual(run.summary.records, 8)
+
+    def test_draft(self):
+        path = os.path.join(self.dir, 'c.json')
+        run = ValidationRun([path], draft=True, max_workers=0)
+        errors = list(run)
+        self.assertEqual([e.record for e in errors], [2])
+        self.assertEqual(run.summary.invalid, 1)
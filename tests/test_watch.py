@@ -0,0 +1,97 @@
+import asyncio
+import copy
+import os
+import tempfile
+
+from datacite_rest.watch import ActivityWatcher
+
+from .constants import VALID_DRAFT_FMT
+from .test_mock_server import MockServerTestCase
+
+
+class TestActivityWatcher(MockServerTestCase):
+    def setUp(self):
+        super().setUp()
+        self._dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._dir.cleanup)
+        self.path = os.path.join(self._dir.name, 'watch.sqlite')
+        self.client = self._get_client()
+        self.dois = [
+            self.client.create(copy.deepcopy(VALID_DRAFT_FMT), True)
+            ['data']['id'] for _ in range(3)
+        ]
+        # spread the timestamps so the marks are deterministic
+        for i, doi in enumerate(self.dois):
+            at = f'2020-01-01T00:00:0{i}Z'
+            self.server.store.get(doi)['updated'] = at
+            for activity in self.server.store.activities[doi]:
+                activity['attributes']['prov:generatedAtTime'] = at
+
+    def _watcher(self, **kwargs) -> ActivityWatcher:
+        kwargs.setdefault('since', '2020-01-01T00:00:00Z')
+        watcher = ActivityWatcher(
+            self.client, self.path, overlap=0, interval=0, **kwargs
+        )
+        self.addCleanup(watcher.__exit__)
+        return watcher
+
+    def _update(self, doi: str) -> None:
+        json_body = copy.deepcopy(VALID_DRAFT_FMT)
+        json_body['data']['attributes']['url'] = 'https://example.org/x'
+        self.client.update(doi, json_body)
+
+    def test_only_new_activities(self):
+        watcher = self._watcher()
+        changes = watcher.poll()
+        self.assertEqual([c.doi for c in changes], self.dois)
+        self.assertEqual({c.activity.action for c in changes}, {'create'})
+        self.assertEqual(watcher.high_water_mark, '2020-01-01T00:00:02Z')
+        self.assertEqual(watcher.poll(), [])
+
+        self._update(self.dois[0])
+        requests = self.server.requests
+        changes = watcher.poll()
+        self.assertEqual(
+            [(c.doi, c.activity.action) for c in changes],
+            [(self.dois[0], 'update')]
+        )
+        # one list page and the activities of the two dois at or after the
+        # mark, not the whole repository
+        self.assertEqual(self.server.requests - requests, 3)
+
+        # the marks are persisted
+        self.assertEqual(self._watcher().poll(), [])
+
+    def test_failed_callback_redelivers(self):
+        watcher = self._watcher()
+
+        def fail(change):
+            raise RuntimeError('audit sink down')
+
+        with self.assertRaises(RuntimeError):
+            watcher.poll(fail)
+        self.assertIsNone(watcher.high_water_mark)
+        delivered = []
+        watcher.poll(delivered.append)
+        self.assertEqual(len(delivered), 3)
+
+    def test_first_poll_starts_at_newest(self):
+        watcher = self._watcher(since=None)
+        self.assertEqual([c.doi for c in watcher.poll()], self.dois[-1:])
+
+    def test_async_changes(self):
+        watcher = self._watcher()
+
+        async def consume():
+            changes = []
+            async for change in watcher.changes():
+                changes.append(change)
+                if len(changes) == 3:
+                    self._update(self.dois[1])
+                if len(changes) == 4:
+                    watcher.close()
+            return changes
+
+        changes = asyncio.run(consume())
+        self.assertEqual(changes[-1].doi, self.dois[1])
+        self.assertEqual(changes[-1].activity.action, 'update')